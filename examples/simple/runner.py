@@ -10,6 +10,8 @@ from trasmapy import (
     SignalColor,
     TLPhase,
     TLProgram,
+    Tariff,
+    TariffToll,
 )
 
 import traci
@@ -34,6 +36,13 @@ def run(traSMAPy: TraSMAPy):
 
     e10 = traSMAPy.network.getDetector("e1_0")
     e10.listen(lambda x: print(x))
+    e20 = traSMAPy.network.getLaneAreaDetector("e2_0")
+    e20.listen(lambda x: print(x), 60)
+    e30 = traSMAPy.network.getMultiEntryExitDetector("e3_0")
+    e30.listen(lambda x: print(x, x.flow), 100)
+    traSMAPy.control.registerToll(
+        TariffToll("toll0", [e10], Tariff(1.0, {VehicleClass.BUS: 2.5}))
+    )
 
     busType = traSMAPy.users.getVehicleType("Bus")
     carType = traSMAPy.users.getVehicleType("Car")
@@ -55,7 +64,7 @@ def run(traSMAPy: TraSMAPy):
             lane.allowAll()
         traSMAPy.doSimulationStep()
 
-        print(traSMAPy.collectedStatistics)
+        print(traSMAPy.statisticsSince(traSMAPy.step))
         #print(traSMAPy.query("users/vehicles/vehicleType/length"))
         #print(
         #    traSMAPy.query(
@@ -64,6 +73,7 @@ def run(traSMAPy: TraSMAPy):
         #        ],
         #    )
         #)
+    print(traSMAPy.control.ledger.revenue, traSMAPy.control.ledger.classTotals)
     traSMAPy.closeSimulation()
 
 
@@ -0,0 +1,145 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Union
+
+from trasmapy import _Backend
+from trasmapy.TraSMAPy import TraSMAPy
+
+
+def _runVariant(
+    sumoCfg: str,
+    backend: str,
+    sumoArgs: list[str],
+    setup: Callable[[TraSMAPy], Any],
+    kpis: Union[Callable[[TraSMAPy], dict], None],
+    maxSteps: Union[int, None],
+    stepChunk: int,
+    networkCacheDir: Union[str, None],
+    statisticsRetention: Union[int, None],
+    checkpoint: Union[str, None],
+) -> dict:
+    params = {
+        "useGui": False,
+        "backend": backend,
+        "sumoArgs": sumoArgs,
+        "networkCacheDir": networkCacheDir,
+        "statisticsRetention": statisticsRetention,
+    }
+    traSMAPy = (
+        TraSMAPy(sumoCfg, **params)
+        if checkpoint is None
+        else TraSMAPy.fromCheckpoint(sumoCfg, checkpoint, **params)
+    )
+    try:
+        setup(traSMAPy)
+        while traSMAPy.minExpectedNumber > 0 and (
+            maxSteps is None or traSMAPy.step < maxSteps
+        ):
+            traSMAPy.doSimulationSteps(
+                stepChunk if maxSteps is None else min(stepChunk, maxSteps - traSMAPy.step)
+            )
+        # the kpis and the statistics see the pending concurrent results and the last windows
+        traSMAPy.waitForQueries()
+        traSMAPy.flushAggregations()
+        return {
+            "collectedStatistics": {
+                step: statistics
+                for (step, statistics) in traSMAPy.collectedStatistics.items()
+                if len(statistics) > 0
+            },
+            "kpis": {} if kpis is None else kpis(traSMAPy),
+        }
+    finally:
+        traSMAPy.closeSimulation()
+
+
+class ScenarioRunner:
+    """Runs several variants of the same scenario in parallel, one SUMO per worker process.
+    Each variant is a setup callable that receives the (headless) TraSMAPy instance of its run
+    and configures it (registers queries, tolls, fleets, ...). The run then steps until there
+    are no more vehicles expected (or maxSteps is reached), stepChunk steps at a time (see
+    TraSMAPy.doSimulationSteps), so the stretches where nothing is due are fast-forwarded.
+    The run may go on for up to stepChunk - 1 steps after the last vehicle leaves.
+    The setup and kpis callables, as well as the query results, are sent between processes,
+    so they must be picklable (e.g., module level functions returning plain data)."""
+
+    def __init__(
+        self,
+        sumoCfg: str,
+        workers: Union[int, None] = None,
+        backend: str = _Backend.TRACI,
+        maxSteps: Union[int, None] = None,
+        kpis: Union[Callable[[TraSMAPy], dict], None] = None,
+        networkCacheDir: Union[str, None] = None,
+        checkpoint: Union[str, None] = None,
+        statisticsRetention: Union[int, None] = None,
+        stepChunk: int = 100,
+    ) -> None:
+        """The workers param limits the number of simulations running at the same time
+        (defaults to the number of processors).
+        The kpis callable is called at the end of each run (after the pending concurrent queries
+        finish and the last aggregation windows are stored) and its result is stored with the
+        run's collected statistics.
+        The networkCacheDir is shared by all runs (see TraSMAPy), so the network is only parsed once.
+        If a checkpoint is given (see TraSMAPy.saveCheckpoint), all variants start from it
+        (e.g., a warmed-up state) instead of the beginning of the simulation.
+        The statisticsRetention is given to each run (see TraSMAPy), e.g., to bound the memory of the
+        workers when the results go to statistics sinks or only the kpis are needed.
+        Raises ValueError if the number of workers or the stepChunk isn't positive."""
+        if workers is not None and workers < 1:
+            raise ValueError(f"The number of workers must be positive: [workers={workers}].")
+        if stepChunk < 1:
+            raise ValueError(f"The step chunk must be positive: [stepChunk={stepChunk}].")
+        self._sumoCfg = sumoCfg
+        self._workers = workers
+        self._backend = backend
+        self._maxSteps = maxSteps
+        self._kpis = kpis
+        self._networkCacheDir = networkCacheDir
+        self._checkpoint = checkpoint
+        self._statisticsRetention = statisticsRetention
+        self._stepChunk = stepChunk
+        self._variants: dict[str, tuple[Callable[[TraSMAPy], Any], list[str]]] = {}
+
+    @property
+    def variants(self) -> list[str]:
+        """The names of the registered variants."""
+        return list(self._variants.keys())
+
+    def addVariant(
+        self,
+        name: str,
+        setup: Callable[[TraSMAPy], Any],
+        sumoArgs: Union[list[str], None] = None,
+    ) -> None:
+        """Registers a variant of the scenario.
+        The sumoArgs are extra command line arguments given to the variant's SUMO (e.g., ["--seed", "42"])."""
+        if name in self._variants:
+            raise KeyError(
+                f"There's a variant with that name already registered: [name={name}]."
+            )
+        self._variants[name] = (setup, [] if sumoArgs is None else list(sumoArgs))
+
+    def run(self) -> dict[str, dict]:
+        """Runs all the registered variants and returns their merged results:
+        {variantName: {"collectedStatistics": ..., "kpis": ...}}.
+        Only the (retained) steps with results are part of the collected statistics.
+        The variants are queued on the process pool, so all workers stay busy until the queue is empty.
+        If a variant fails, its exception is raised after the remaining runs finish."""
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            futures = {
+                name: executor.submit(
+                    _runVariant,
+                    self._sumoCfg,
+                    self._backend,
+                    sumoArgs,
+                    setup,
+                    self._kpis,
+                    self._maxSteps,
+                    self._stepChunk,
+                    self._networkCacheDir,
+                    self._statisticsRetention,
+                    self._checkpoint,
+                )
+                for name, (setup, sumoArgs) in self._variants.items()
+            }
+        return {name: future.result() for name, future in futures.items()}
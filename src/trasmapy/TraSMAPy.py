@@ -1,5 +1,11 @@
+import functools
+import io
+import math
+import pickle
+from concurrent.futures import Executor, Future
 import os
 import sys
+from itertools import count
 from typing import Union, Callable
 
 # we need to import python modules from the $SUMO_HOME/tools directory
@@ -10,29 +16,118 @@ else:
     exit("Please declare environment variable 'SUMO_HOME'.")
 
 from sumolib import checkBinary
-import traci
 import pyflwor
 
+from trasmapy import _Backend
+from trasmapy._Checkpoint import (
+    _CHECKPOINT_VERSION,
+    CheckpointPickler,
+    CheckpointUnpickler,
+    sidecarPath,
+)
 from trasmapy._Query import Query
+from trasmapy._QueryOptimizer import QueryOptimizer
+from trasmapy._QueryScheduler import QueryScheduler
+from trasmapy._Snapshot import Snapshot
 from trasmapy.network._Network import Network
+from trasmapy.network._Edge import Edge
+from trasmapy.network._Lane import Lane
+from trasmapy.network._NetworkIndex import NetworkIndex
 from trasmapy.users._Users import Users
+from trasmapy.users._Vehicle import Vehicle
 from trasmapy.publicservices._PublicServices import PublicServices
 from trasmapy.control._Control import Control
+from trasmapy.statistics.StatisticsSink import StatisticsSink
+from trasmapy.statistics.Aggregation import Aggregation
+from trasmapy.statistics._WindowAggregator import WindowAggregator
 
 
 class TraSMAPy:
-    def __init__(self, sumoCfg: str, useGui: bool = True) -> None:
+    _labelCounter = count()
+    _queryCacheSize: int = 256
+
+    def __init__(
+        self,
+        sumoCfg: str,
+        useGui: bool = True,
+        backend: str = _Backend.TRACI,
+        label: Union[str, None] = None,
+        sumoArgs: Union[list[str], None] = None,
+        networkCacheDir: Union[str, None] = None,
+        queryExecutor: Union[Executor, None] = None,
+        statisticsRetention: Union[int, None] = None,
+    ) -> None:
+        """Starts the simulation described by the given sumo configuration file.
+        The backend can be "traci" (SUMO runs as a subprocess controlled through a socket) or
+        "libsumo" (SUMO runs in-process, without socket serialization). libsumo can't be used with the GUI.
+        Each instance owns its own TraCI connection, identified by the given label (a unique label is
+        generated if None), so several simulations can run side by side in the same process (traci backend only:
+        a ValueError is raised when starting a libsumo simulation while another one is running).
+        The sumoArgs are extra command line arguments given to SUMO (e.g., ["--seed", "42"]).
+        If a networkCacheDir is given, the network index is cached there (keyed by the content hash
+        of the net and additional files), so later runs of the same network skip parsing them.
+        The queryExecutor (e.g., a ThreadPoolExecutor or ProcessPoolExecutor) runs the concurrent
+        queries (see registerQuery) while the simulation moves on.
+        The statisticsRetention is the number of (most recent) steps whose statistics are kept in memory
+        (None keeps all of them, 0 keeps none). Use it with statistics sinks (see addStatisticsSink)
+        to keep the memory bounded on long simulations."""
+        sumoArgs = [] if sumoArgs is None else sumoArgs
+        if statisticsRetention is not None and statisticsRetention < 0:
+            raise ValueError(
+                f"The statistics retention can't be negative: [statisticsRetention={statisticsRetention}]."
+            )
+        self._label: str = (
+            f"trasmapy{next(TraSMAPy._labelCounter)}" if label is None else label
+        )
         self._step: int = 0
         self._collectedStatistics: dict[int, dict] = {}
+        self._statisticsRetention = statisticsRetention
+        self._statisticsSinks: list[StatisticsSink] = []
         self._queries: dict[str, Query] = {}
+        self._aggregators: dict[str, WindowAggregator] = {}
+        self._queryScheduler = QueryScheduler()
+        self._queryExecutor = queryExecutor
+        # the running concurrent queries: (step, queryName, future)
+        self._pendingQueries: list[tuple[int, str, Future]] = []
 
-        self._startSimulation(sumoCfg, useGui)
-        self._network: Network = Network()
-        self._users: Users = Users()
+        self._connection = self._startSimulation(sumoCfg, useGui, backend, sumoArgs)
+        # the network structure is streamed from the net file (TraCI indexing is the fallback)
+        self._network: Network = Network(
+            self._connection,
+            NetworkIndex.fromSumoConfig(sumoCfg, sumoArgs, networkCacheDir),
+        )
+        self._users: Users = Users(self._connection, self._network)
         self._publicServices: PublicServices = PublicServices(self._users)
-        self._control: Control = Control()
+        self._control: Control = Control(self._connection)
 
+        # the query namespace is built once (the objects in it are stable)
         self._queryMap = self._genQueryMap()
+        # ID predicates on these collections are served by direct lookups (see QueryOptimizer)
+        self._queryOptimizer = QueryOptimizer(
+            {
+                ("network", "edges"): self._network._lookupEdges,
+                ("network", "lanes"): self._network._lookupLanes,
+                ("network", "stops"): self._network._lookupStops,
+                ("users", "vehicles"): self._users._lookupVehicles,
+            },
+        )
+        # compiled (and optimized) pyflwor plans, keyed by the query text
+        self._compileQuery = functools.lru_cache(maxsize=TraSMAPy._queryCacheSize)(
+            lambda query: self._queryOptimizer.compile(query, pyflwor.compile)
+        )
+
+    @classmethod
+    def fromCheckpoint(cls, sumoCfg: str, path: str, **kwargs) -> "TraSMAPy":
+        """Starts the simulation described by the given sumo configuration file (the other params are
+        the same as the constructor's, e.g., useGui) and restores the checkpoint saved to the given path
+        (see saveCheckpoint), so the simulation continues from there."""
+        traSMAPy = cls(sumoCfg, **kwargs)
+        try:
+            traSMAPy._loadCheckpoint(path)
+        except BaseException:
+            traSMAPy.closeSimulation()
+            raise
+        return traSMAPy
 
     @property
     def network(self) -> Network:
@@ -50,6 +145,11 @@ class TraSMAPy:
     def control(self) -> Control:
         return self._control
 
+    @property
+    def label(self) -> str:
+        """The label of this simulation's TraCI connection."""
+        return self._label
+
     @property
     def step(self) -> int:
         return self._step
@@ -57,48 +157,108 @@ class TraSMAPy:
     @property
     def stepLength(self) -> float:
         """The length of one simulation step (s)."""
-        return traci.simulation.getDeltaT()  # type: ignore
+        return self._connection.simulation.getDeltaT()  # type: ignore
 
     @property
     def time(self) -> float:
         """The current simulation time (s)."""
-        return traci.simulation.getTime()  # type: ignore
+        return self._connection.simulation.getTime()  # type: ignore
 
     @property
     def minExpectedNumber(self) -> int:
         """The minimum number of vehicles expected to be in the simulation."""
-        return traci.simulation.getMinExpectedNumber()  # type: ignore
+        return self._connection.simulation.getMinExpectedNumber()  # type: ignore
 
     @property
     def collectedStatistics(self) -> dict[int, dict]:
-        """The accumulated statistics of the queries."""
+        """The accumulated statistics of the queries (only of the retained steps, see statisticsRetention)."""
         return self._collectedStatistics.copy()
 
+    def statisticsSince(self, step: int) -> dict[int, dict]:
+        """The statistics of the retained steps since the given one (inclusive).
+        Unlike collectedStatistics, the cost only depends on the number of returned steps,
+        so it can be polled every step (e.g., statisticsSince(traSMAPy.step))."""
+        ret: dict[int, dict] = {}
+        for collectedStep in reversed(self._collectedStatistics):
+            if collectedStep < step:
+                break
+            ret[collectedStep] = self._collectedStatistics[collectedStep]
+        return dict(reversed(ret.items()))
+
+    def addStatisticsSink(self, sink: StatisticsSink) -> None:
+        """Adds a sink that receives the result of each query run (e.g., a JsonLinesSink).
+        The sinks are closed when the simulation is closed."""
+        self._statisticsSinks.append(sink)
+
+    @property
+    def queryCacheInfo(self) -> functools._CacheInfo:
+        """The hits, misses, maxsize and currsize of the compiled (string) query cache."""
+        return self._compileQuery.cache_info()
+
     def query(self, query: Union[str, Callable]) -> dict:
-        """Run a query once and get its current result."""
+        """Run a query once and get its current result.
+        String queries are compiled once and the compiled plan is reused by later calls.
+        Paths filtered by an ID predicate (e.g., network/edges[self.id == '1to2']) are evaluated
+        through direct lookups instead of going through the whole collection."""
         if isinstance(query, str):
-            return pyflwor.execute(query, self._genQueryMap())
+            return self._compileQuery(query)(self._queryMap)
         else:
-            return query(self._genQueryMap())
+            return query(self._queryMap)
 
     def registerQuery(
-        self, queryName: str, query: Union[str, Callable], tickInterval: int = 1
+        self,
+        queryName: str,
+        query: Union[str, Callable],
+        tickInterval: int = 1,
+        tickOffset: int = 0,
+        autoBalance: bool = False,
+        concurrent: bool = False,
+        aggregation: Union[Aggregation, None] = None,
     ) -> None:
         """Register query to be run every tick (by default).
         The tickInterval param can be customized to change the frequency of the statistics collection.
-        Results are accumulated and can be obtained through the collectedStatistics property."""
+        The tickOffset param delays the first run by the given number of ticks (in [0, tickInterval[),
+        so queries with the same interval can run on different steps.
+        With autoBalance, the offset is picked (and periodically adjusted) by a scheduler that spreads
+        the queries over the steps of their interval using their measured run time.
+        Concurrent queries (callables only) run on the queryExecutor and receive an immutable Snapshot
+        of the step (with the subscribed attributes) instead of the query map. Their results are added
+        to the step's statistics when they complete (see waitForQueries).
+        With an aggregation, the results are reduced incrementally over windows of steps and only the
+        reduced value of each window is stored, on its last step (see Aggregation). The last (incomplete)
+        window is stored when the simulation is closed.
+        Results are accumulated and can be obtained through the collectedStatistics property
+        (and are written to the statistics sinks, see addStatisticsSink)."""
         if queryName in self._queries:
             raise KeyError(
                 f"There's a query with that name already registered: [queryName={queryName}]."
             )
-        self._queries[queryName] = Query(
-            pyflwor.compile(query) if isinstance(query, str) else query,
+        if autoBalance and tickOffset != 0:
+            raise ValueError(
+                f"The tick offset of auto balanced queries is picked by the scheduler: [tickOffset={tickOffset}]."
+            )
+        if concurrent and (isinstance(query, str) or self._queryExecutor is None):
+            raise ValueError(
+                "Concurrent queries must be callables and need a queryExecutor (see TraSMAPy)."
+            )
+        if concurrent and aggregation is not None:
+            raise ValueError("Concurrent queries can't be aggregated.")
+        newQuery = Query(
+            self._compileQuery(query) if isinstance(query, str) else query,
             tickInterval,
+            tickOffset,
+            autoBalance,
+            concurrent,
         )
+        self._queries[queryName] = newQuery
+        if aggregation is not None:
+            self._aggregators[queryName] = WindowAggregator(aggregation)
+        if autoBalance:
+            self._queryScheduler.place(newQuery, self._queries)
 
     def doSimulationStep(self) -> None:
         self._step += 1
-        traci.simulationStep()
+        self._connection.simulationStep()
 
         time = self.time
         self._network._doSimulationStep(step=self._step, time=time)
@@ -106,18 +266,220 @@ class TraSMAPy:
         self._publicServices._doSimulationStep(step=self._step, time=time)
         self._control._doSimulationStep(step=self._step, time=time)
 
-        self._collectedStatistics[self._step] = {}
+        self._retainStatistics()
+        snapshot: Union[Snapshot, None] = None
         for (queryName, query) in self._queries.items():
             if not query.tick():
                 continue
-            self._collectedStatistics[self._step][queryName] = query(
-                self._genQueryMap()
+            if query.concurrent:
+                if snapshot is None:
+                    snapshot = self._takeSnapshot(time)
+                self._pendingQueries.append(
+                    (self._step, queryName, query._submit(self._queryExecutor, snapshot))  # type: ignore
+                )
+                continue
+            result = query(self._queryMap)
+            aggregator = self._aggregators.get(queryName)
+            if aggregator is None:
+                self._storeResult(self._step, queryName, result)
+            else:
+                aggregator.add(result)
+        for (queryName, aggregator) in self._aggregators.items():
+            if aggregator.isWindowEnd(self._step):
+                self._emitAggregate(queryName, aggregator)
+        self._queryScheduler.update(self._queries, self._step)
+        self._collectQueries(wait=False)
+
+    def doSimulationSteps(self, steps: int) -> None:
+        """Runs the given number of simulation steps.
+        The stretches of steps where nothing is due (no query runs, aggregation window ends, fleet spawns
+        or listened detectors, which includes the tolls) are run at once by SUMO, without the per-step
+        work. The step counter, the query schedules, the running vehicles and the collected statistics
+        (an empty entry per step without results) are the same as running the steps one by one."""
+        if steps < 0:
+            raise ValueError(f"The number of steps can't be negative: [steps={steps}].")
+        remaining = steps
+        while remaining > 0:
+            skippable = min(remaining, self._stepsUntilDue()) - 1
+            if skippable > 0:
+                self._fastForward(int(skippable))
+                remaining -= int(skippable)
+            self.doSimulationStep()
+            remaining -= 1
+
+    def runUntil(self, time: float) -> None:
+        """Runs the simulation until the given simulation time (s) is reached (see doSimulationSteps)."""
+        self.doSimulationSteps(max(0, math.ceil((time - self.time) / self.stepLength - 1e-6)))
+
+    def saveCheckpoint(self, path: str) -> None:
+        """Saves the state of the simulation to the given path (see traci's simulation.saveState) and the
+        TraSMAPy state to a sidecar file (the same path with the .trasmapy suffix): the step counter, the
+        fleets (and their spawn counters), the registered tolls (and their ledger), the detector listeners and
+        the tracked vehicles. See fromCheckpoint.
+        The queries, the collected statistics, the statistics sinks and the readings of the current detector
+        intervals aren't part of the checkpoint.
+        Raises ValueError if a listener or toll can't be pickled (e.g., a lambda)."""
+        state = {
+            "step": self._step,
+            "fleets": self._publicServices._fleets,
+            "tolls": self._control._tolls,
+            "ledger": self._control._ledger,
+            "listeners": {
+                detectorId: detector._listeners
+                for (detectorId, detector) in self._network._detectors.items()
+                if len(detector._listeners) > 0
+            },
+            # interval -> listeners (the readings of the current intervals aren't kept)
+            "laneAreaListeners": {
+                detectorId: detector._listeners
+                for (detectorId, detector) in self._network._laneAreaDetectors.items()
+                if len(detector._listeners) > 0
+            },
+            "multiEntryExitListeners": {
+                detectorId: detector._listeners
+                for (detectorId, detector) in self._network._multiEntryExitDetectors.items()
+                if len(detector._listeners) > 0
+            },
+            "vehicles": list(self._users._vehicles.values()),
+        }
+        sidecar = io.BytesIO()
+        pickle.dump(_CHECKPOINT_VERSION, sidecar)
+        try:
+            CheckpointPickler(sidecar, self).dump(state)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise ValueError(
+                f"The TraSMAPy state can't be pickled (listeners and tolls must be picklable): [error={e}]."
             )
+        self._connection.simulation.saveState(path)
+        with open(sidecarPath(path), "wb") as f:
+            f.write(sidecar.getvalue())
+
+    def waitForQueries(self) -> None:
+        """Waits for the running concurrent queries and adds their results to the collected statistics."""
+        self._collectQueries(wait=True)
+
+    def flushAggregations(self) -> None:
+        """Stores the reduced values of the current (incomplete) aggregation windows on the current step
+        and starts new windows (see registerQuery). closeSimulation does it for the last windows."""
+        for (queryName, aggregator) in self._aggregators.items():
+            self._emitAggregate(queryName, aggregator)
 
     def closeSimulation(self) -> None:
-        traci.close()
+        self.waitForQueries()
+        self.flushAggregations()
+        for sink in self._statisticsSinks:
+            sink.close()
+        self._control._close()
+        self._connection.close()
         sys.stdout.flush()
 
+    def _loadCheckpoint(self, path: str) -> None:
+        with open(sidecarPath(path), "rb") as f:
+            version = pickle.load(f)
+            if version != _CHECKPOINT_VERSION:
+                raise ValueError(
+                    f"The checkpoint was saved by an incompatible version: [version={version}]."
+                )
+            # the references to the simulation's objects are resolved against the loaded state
+            self._connection.simulation.loadState(path)
+            self._users._stateLoaded()
+            state = CheckpointUnpickler(f, self).load()
+
+        self._step = state["step"]
+        self._publicServices._fleets = state["fleets"]
+        self._control._tolls = state["tolls"]
+        self._control._ledger = state.get("ledger", self._control._ledger)
+        for (detectorId, listeners) in state["listeners"].items():
+            detector = self._network.getDetector(detectorId)
+            for listener in listeners:
+                detector.listen(listener)
+        for (getDetector, key) in (
+            (self._network.getLaneAreaDetector, "laneAreaListeners"),
+            (self._network.getMultiEntryExitDetector, "multiEntryExitListeners"),
+        ):
+            for (detectorId, intervalListeners) in state.get(key, {}).items():
+                intervalDetector = getDetector(detectorId)
+                for (interval, listeners) in intervalListeners.items():
+                    for listener in listeners:
+                        intervalDetector.listen(listener, interval)
+
+    def _stepsUntilDue(self) -> float:
+        """The number of steps until one that needs the per-step work (1 means the next one)."""
+        if self._network._hasListeners():
+            return 1
+        due = min(
+            (query.ticksUntilCall for query in self._queries.values()), default=math.inf
+        )
+        for aggregator in self._aggregators.values():
+            if aggregator.hasValues():
+                window = aggregator.aggregation.window
+                due = min(due, window - self._step % window)
+        return min(due, self._publicServices._stepsUntilDue(self.time, self.stepLength))
+
+    def _fastForward(self, steps: int) -> None:
+        """Runs the given number of steps at once (nothing can be due on them)."""
+        self._connection.simulationStep(self.time + steps * self.stepLength)
+        self._step += steps
+        # the skipped steps are collected too (without results), like the stepped ones
+        self._retainStatistics(steps)
+        for query in self._queries.values():
+            query._skip(steps)
+        self._users._fastForwarded()
+
+    def _takeSnapshot(self, time: float) -> Snapshot:
+        return Snapshot._fromCaches(
+            self._step,
+            time,
+            (self._network._edgeIds, Edge.subscribableAttributes, self._network._edgeCache),
+            (self._network._laneIds, Lane.subscribableAttributes, self._network._laneCache),
+            (
+                self._users.getAllVehicleIds(),
+                Vehicle.subscribableAttributes,
+                self._users._vehicleCache,
+            ),
+        )
+
+    def _collectQueries(self, wait: bool) -> None:
+        """Stores the results of the finished concurrent queries (of all of them, if wait).
+        Exceptions raised by the queries are raised here."""
+        pending: list[tuple[int, str, Future]] = []
+        for step, queryName, future in self._pendingQueries:
+            if wait or future.done():
+                self._storeResult(step, queryName, future.result())
+            else:
+                pending.append((step, queryName, future))
+        self._pendingQueries = pending
+
+    def _retainStatistics(self, steps: int = 1) -> None:
+        """Adds the last steps (up to the current one) to the collected statistics and evicts the steps
+        beyond the retention."""
+        retention = self._statisticsRetention
+        if retention == 0:
+            return
+        firstStep = self._step - steps + 1
+        if retention is not None:
+            firstStep = max(firstStep, self._step - retention + 1)
+        for step in range(firstStep, self._step + 1):
+            self._collectedStatistics[step] = {}
+        if retention is None:
+            return
+        oldestRetained = self._step - retention + 1
+        # the steps are inserted in order, so the oldest is the first one
+        while next(iter(self._collectedStatistics)) < oldestRetained:
+            del self._collectedStatistics[next(iter(self._collectedStatistics))]
+
+    def _storeResult(self, step: int, queryName: str, result) -> None:
+        for sink in self._statisticsSinks:
+            sink.write(step, queryName, result)
+        # the step may have been evicted already (late concurrent results)
+        stepStatistics = self._collectedStatistics.get(step)
+        if stepStatistics is not None:
+            stepStatistics[queryName] = result
+
+    def _emitAggregate(self, queryName: str, aggregator: WindowAggregator) -> None:
+        if aggregator.hasValues():
+            self._storeResult(self._step, queryName, aggregator.emit())
+
     def _genQueryMap(self) -> dict:
         ret = {
             "network": self._network,
@@ -128,13 +490,20 @@ class TraSMAPy:
         ret.update(__builtins__)
         return ret
 
-    def _startSimulation(self, sumoCfg: str, useGui: bool) -> None:
+    def _startSimulation(
+        self, sumoCfg: str, useGui: bool, backend: str, sumoArgs: list[str]
+    ):
         # script has been called from the command line. It will start sumo as a
         # server, then connect and run
         if useGui:
+            if backend == _Backend.LIBSUMO:
+                raise ValueError("The libsumo backend doesn't support the GUI.")
             sumoBinary = checkBinary("sumo-gui")
         else:
             sumoBinary = checkBinary("sumo")
 
-        # sumo is started as a subprocess and then the python script connects and runs
-        traci.start([sumoBinary, "-c", sumoCfg])
+        # with traci, sumo is started as a subprocess and then the python script connects and runs
+        # with libsumo, sumo runs inside this process
+        return _Backend.startSimulation(
+            backend, [sumoBinary, "-c", sumoCfg, *sumoArgs], self._label
+        )
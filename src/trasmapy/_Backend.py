@@ -0,0 +1,42 @@
+from typing import Any
+
+import traci
+
+TRACI = "traci"
+"""SUMO runs as a subprocess and is controlled through the TraCI socket."""
+LIBSUMO = "libsumo"
+"""SUMO runs in-process (no socket serialization). Headless only."""
+
+traciExceptions: tuple = (traci.TraCIException,)
+"""The exception types raised by the started backends when a command fails."""
+
+
+def startSimulation(backend: str, cmd: list[str], label: str) -> Any:
+    """Starts SUMO with the given command line using the given backend.
+    Returns the connection used to control the simulation: an object exposing the
+    TraCI domains (edge, lane, vehicle, simulation, ...), simulationStep and close.
+    With traci, each simulation gets its own connection (identified by the given label), so
+    several simulations can be driven from the same process. libsumo only supports one
+    simulation per process (the label is ignored): raises ValueError if one is already running."""
+    global traciExceptions
+
+    if backend == TRACI:
+        traci.start(cmd, label=label)
+        return traci.getConnection(label)
+    elif backend == LIBSUMO:
+        try:
+            import libsumo
+        except ImportError:
+            raise ValueError(
+                "The libsumo backend requires the libsumo python package (e.g., pip install libsumo)."
+            )
+        if libsumo.isLoaded():
+            raise ValueError(
+                "libsumo only supports one simulation per process and one is already running (close it first)."
+            )
+        libsumo.start(cmd)
+        traciExceptions = (traci.TraCIException, libsumo.TraCIException)
+        return libsumo
+    raise ValueError(
+        f"Unknown simulation backend: [backend={backend}], expected one of {[TRACI, LIBSUMO]}."
+    )
@@ -0,0 +1,35 @@
+from typing import Any, Callable, Union
+
+
+class CachedAttributes:
+    """Caches the attributes of an object that only change through TraSMAPy's own setters
+    (e.g., a lane's length). The first read of each attribute does a TraCI call and later reads
+    are served locally. Setters write the new value through to the cache (or drop it, when it
+    can't be derived locally).
+    Call refresh() after changing the simulation outside TraSMAPy (e.g., through traci directly)."""
+
+    def __init__(self, initialValues: Union[dict[str, Any], None] = None) -> None:
+        self._cachedAttributes: dict[str, Any] = (
+            {} if initialValues is None else initialValues.copy()
+        )
+
+    def refresh(self) -> None:
+        """Drops the cached attribute values, so they are read from the simulation again."""
+        self._cachedAttributes.clear()
+
+    def _getCached(self, name: str, fallback: Callable[[str], Any]) -> Any:
+        """Returns the cached value of the attribute.
+        If it isn't cached, it's obtained by calling the fallback with the object ID."""
+        try:
+            return self._cachedAttributes[name]
+        except KeyError:
+            value = fallback(self.id)  # type: ignore
+            self._cachedAttributes[name] = value
+            return value
+
+    def _setCached(self, name: str, value: Any) -> None:
+        self._cachedAttributes[name] = value
+
+    def _invalidateCached(self, *names: str) -> None:
+        for name in names:
+            self._cachedAttributes.pop(name, None)
@@ -0,0 +1,113 @@
+import pickle
+from typing import Any
+
+from trasmapy.network._Network import Network
+from trasmapy.network._Edge import Edge
+from trasmapy.network._Lane import Lane
+from trasmapy.network._StopLocation import StopLocation
+from trasmapy.network._Detector import Detector
+from trasmapy.network._LaneAreaDetector import LaneAreaDetector
+from trasmapy.network._MultiEntryExitDetector import MultiEntryExitDetector
+from trasmapy.users._Users import Users
+from trasmapy.users._Vehicle import Vehicle
+from trasmapy.users._VehicleType import VehicleType
+from trasmapy.users._Route import Route
+from trasmapy.publicservices._PublicServices import PublicServices
+from trasmapy.control._Control import Control
+from trasmapy.control._TrafficLight import TrafficLight
+
+# version of the sidecar's layout (checkpoints with another version can't be loaded)
+_CHECKPOINT_VERSION = 1
+
+
+def sidecarPath(path: str) -> str:
+    """The path of the file holding the TraSMAPy side of the checkpoint saved to the given path."""
+    return f"{path}.trasmapy"
+
+
+class CheckpointPickler(pickle.Pickler):
+    """Pickles the TraSMAPy side of a checkpoint (fleets, tolls, listeners, ...).
+    The objects bound to the simulation (edges, vehicles, ...) are stored as references (their kind
+    and ID), which are resolved against the simulation that loads the checkpoint."""
+
+    def __init__(self, file, traSMAPy) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._traSMAPy = traSMAPy
+
+    def persistent_id(self, obj: Any) -> Any:
+        if obj is self._traSMAPy:
+            return ("traSMAPy",)
+        if isinstance(obj, Network):
+            return ("network",)
+        if isinstance(obj, Users):
+            return ("users",)
+        if isinstance(obj, PublicServices):
+            return ("publicServices",)
+        if isinstance(obj, Control):
+            return ("control",)
+        if isinstance(obj, Edge):
+            return ("edge", obj.id)
+        if isinstance(obj, Lane):
+            return ("lane", obj.id)
+        if isinstance(obj, StopLocation):
+            return ("stop", obj.id)
+        if isinstance(obj, Detector):
+            return ("detector", obj.id)
+        if isinstance(obj, LaneAreaDetector):
+            return ("laneAreaDetector", obj.id)
+        if isinstance(obj, MultiEntryExitDetector):
+            return ("multiEntryExitDetector", obj.id)
+        if isinstance(obj, Vehicle):
+            return ("vehicle", obj.id, obj.isDead())
+        if isinstance(obj, VehicleType):
+            return ("vehicleType", obj.id)
+        if isinstance(obj, Route):
+            return ("route", obj.id)
+        if isinstance(obj, TrafficLight):
+            return ("trafficLight", obj.id)
+        if obj is self._traSMAPy._connection:
+            return ("connection",)
+        return None
+
+
+class CheckpointUnpickler(pickle.Unpickler):
+    def __init__(self, file, traSMAPy) -> None:
+        super().__init__(file)
+        self._traSMAPy = traSMAPy
+
+    def persistent_load(self, pid: Any) -> Any:
+        traSMAPy = self._traSMAPy
+        kind, *args = pid
+        if kind == "traSMAPy":
+            return traSMAPy
+        if kind == "network":
+            return traSMAPy.network
+        if kind == "users":
+            return traSMAPy.users
+        if kind == "publicServices":
+            return traSMAPy.publicServices
+        if kind == "control":
+            return traSMAPy.control
+        if kind == "edge":
+            return traSMAPy.network.getEdge(args[0])
+        if kind == "lane":
+            return traSMAPy.network.getLane(args[0])
+        if kind == "stop":
+            return traSMAPy.network.getStop(args[0])
+        if kind == "detector":
+            return traSMAPy.network.getDetector(args[0])
+        if kind == "laneAreaDetector":
+            return traSMAPy.network.getLaneAreaDetector(args[0])
+        if kind == "multiEntryExitDetector":
+            return traSMAPy.network.getMultiEntryExitDetector(args[0])
+        if kind == "vehicle":
+            return traSMAPy.users._restoreVehicle(*args)
+        if kind == "vehicleType":
+            return traSMAPy.users.getVehicleType(args[0])
+        if kind == "route":
+            return Route(args[0], traSMAPy._connection)
+        if kind == "trafficLight":
+            return TrafficLight(args[0], traSMAPy._connection)
+        if kind == "connection":
+            return traSMAPy._connection
+        raise pickle.UnpicklingError(f"Unknown checkpoint reference: [reference={pid}].")
@@ -0,0 +1,81 @@
+from math import nan
+from typing import Any
+
+import numpy as np
+
+
+class Frame:
+    """Columnar snapshot of some attributes of a set of objects.
+    Row i of values holds the attributes of the object with ID ids[i], in the order given by attributes.
+    Numeric attributes produce a float array; if any attribute isn't numeric (e.g., vehicleIds),
+    the array has dtype object."""
+
+    def __init__(
+        self, ids: list[str], attributes: list[str], values: np.ndarray
+    ) -> None:
+        self._ids = ids
+        self._attributes = attributes
+        self._values = values
+        self._rowIndex: dict[str, int] = {id: i for i, id in enumerate(ids)}
+
+    @classmethod
+    def fromSubscriptionResults(
+        cls,
+        ids: list[str],
+        attributes: list[str],
+        variables: list[int],
+        results: dict[str, dict[int, Any]],
+    ):
+        """Builds a frame from bulk subscription results.
+        Missing values (e.g., objects without subscription results) are NaN."""
+        rows = [
+            [results.get(id, {}).get(variable, nan) for variable in variables]
+            for id in ids
+        ]
+        try:
+            values = np.array(rows, dtype=float).reshape(len(ids), len(variables))
+        except (TypeError, ValueError):
+            values = np.empty((len(ids), len(variables)), dtype=object)
+            for i, row in enumerate(rows):
+                for j, value in enumerate(row):
+                    values[i, j] = value
+        return cls(ids, attributes, values)
+
+    @property
+    def ids(self) -> list[str]:
+        """The IDs of the objects (row index)."""
+        return self._ids
+
+    @property
+    def attributes(self) -> list[str]:
+        """The names of the attributes (column index)."""
+        return self._attributes
+
+    @property
+    def values(self) -> np.ndarray:
+        """2D array with one row per object and one column per attribute."""
+        return self._values
+
+    def column(self, attribute: str) -> np.ndarray:
+        """Returns the values of the given attribute for all objects.
+        Raises KeyError if the frame doesn't have the given attribute."""
+        try:
+            return self._values[:, self._attributes.index(attribute)]
+        except ValueError:
+            raise KeyError(
+                f"The frame doesn't have the given attribute: [attribute={attribute}]."
+            )
+
+    def row(self, id: str) -> np.ndarray:
+        """Returns the values of all attributes for the object with the given ID.
+        Raises KeyError if the frame doesn't have the given object."""
+        return self._values[self._rowIndex[id]]
+
+    def __getitem__(self, attribute: str) -> np.ndarray:
+        return self.column(attribute)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __repr__(self) -> str:
+        return f"Frame(objects={len(self._ids)}, attributes={self._attributes})"
@@ -1,17 +1,83 @@
-from typing import Any, Callable
+from concurrent.futures import Executor, Future
+from time import perf_counter
+from typing import Any, Callable, Union
 
 
 class Query:
-    def __init__(self, queryFunc: Callable, tickInterval: int = 1) -> None:
+    # weight of the last measurement in the cost estimate (exponential moving average)
+    _costSmoothing: float = 0.2
+
+    def __init__(
+        self,
+        queryFunc: Callable,
+        tickInterval: int = 1,
+        tickOffset: int = 0,
+        autoBalance: bool = False,
+        concurrent: bool = False,
+    ) -> None:
+        if tickInterval < 1:
+            raise ValueError(
+                f"The tick interval must be positive: [tickInterval={tickInterval}]."
+            )
+        if not 0 <= tickOffset < tickInterval:
+            raise ValueError(
+                f"The tick offset must be in [0, tickInterval[: [tickOffset={tickOffset}]."
+            )
         self._queryFunc: Callable = queryFunc
         self._tickInterval: int = tickInterval
-        self._nextCall: int = 0  # ticks until next call
+        self._nextCall: int = tickOffset + 1  # ticks until next call
+        self._autoBalance: bool = autoBalance
+        self._concurrent: bool = concurrent
+        # estimated run time (s); concurrent queries don't run on the simulation's thread
+        self._cost: Union[float, None] = 0.0 if concurrent else None
+
+    @property
+    def tickInterval(self) -> int:
+        return self._tickInterval
+
+    @property
+    def autoBalance(self) -> bool:
+        """Whether the scheduler picks the step (within the interval) on which the query runs."""
+        return self._autoBalance
+
+    @property
+    def concurrent(self) -> bool:
+        """Whether the query runs on an executor, against a Snapshot of the step."""
+        return self._concurrent
+
+    @property
+    def cost(self) -> Union[float, None]:
+        """The estimated run time of the query (s). None if it hasn't run yet."""
+        return self._cost
+
+    @property
+    def ticksUntilCall(self) -> int:
+        """The number of ticks until the query runs again (1 means on the next tick)."""
+        return max(self._nextCall, 1)
 
     def tick(self) -> bool:
         """Ticks the counter. Returns True if it is time to call the query."""
         self._nextCall -= 1
         return self._nextCall <= 0
 
+    def _reschedule(self, ticksUntilCall: int) -> None:
+        self._nextCall = ticksUntilCall
+
+    def _skip(self, ticks: int) -> None:
+        """Ticks the counter the given number of times (less than ticksUntilCall), without calling the query."""
+        self._nextCall -= ticks
+
+    def _submit(self, executor: Executor, snapshot) -> Future:
+        self._nextCall = self._tickInterval
+        return executor.submit(self._queryFunc, snapshot)
+
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         self._nextCall = self._tickInterval
-        return self._queryFunc(*args, **kwds)
+        start = perf_counter()
+        ret = self._queryFunc(*args, **kwds)
+        elapsed = perf_counter() - start
+        if self._cost is None:
+            self._cost = elapsed
+        else:
+            self._cost += Query._costSmoothing * (elapsed - self._cost)
+        return ret
@@ -0,0 +1,132 @@
+import ast
+import re
+from typing import Any, Callable, Union
+
+# a path root followed by a predicate, e.g., network/edges[...
+_rootPattern = re.compile(r"(?<![\w./])(network|users)/(edges|lanes|stops|vehicles)\[")
+# the ID predicates that can be served by a lookup (only as the first conjunct of the predicate)
+_idEqualityPattern = re.compile(
+    r"""\s*(?:self\.id\s*==\s*(?P<lhs>'[^'\\]*'|"[^"\\]*")|(?P<rhs>'[^'\\]*'|"[^"\\]*")\s*==\s*self\.id)\s*(?P<rest>and\s.*)?$""",
+    re.DOTALL,
+)
+_idMembershipPattern = re.compile(
+    r"""\s*self\.id\s+in\s+(?P<ids>\[[^\[\]]*\]|\([^()]*\)|\{[^{}]*\})\s*(?P<rest>and\s.*)?$""",
+    re.DOTALL,
+)
+_orPattern = re.compile(r"\bor\b")
+
+
+class IndexedLookup:
+    """Stands in for the root of a rewritten query path (e.g., network in network/edges[...]).
+    Its collection attribute only holds the objects with the IDs matched by the predicate,
+    obtained through direct (O(1)) lookups."""
+
+    def __init__(
+        self, collection: str, lookup: Callable[[list[str]], list], ids: list[str]
+    ) -> None:
+        self._collection = collection
+        self._lookup = lookup
+        self._ids = ids
+
+    def __getattr__(self, name: str) -> Any:
+        if name == self.__dict__.get("_collection"):
+            return self._lookup(self._ids)
+        raise AttributeError(name)
+
+
+class QueryOptimizer:
+    """Rewrites pyflwor queries, so the paths filtered by an ID predicate (e.g.,
+    network/edges[self.id == '1to2']) are rooted on an IndexedLookup bound in the query namespace,
+    instead of going through the whole collection. The predicate is kept, so the result is the same."""
+
+    def __init__(
+        self, lookups: dict[tuple[str, str], Callable[[list[str]], list]]
+    ) -> None:
+        """The lookups map each (root, collection) pair (e.g., ("network", "edges")) to a function
+        returning the objects with the given IDs that exist (in the collection's order)."""
+        self._lookups = lookups
+
+    def compile(self, query: str, compiler: Callable[[str], Callable]) -> Callable:
+        """Returns the plan of the rewritten query (compiled by the given compiler).
+        The lookups bound by the rewrite are owned by the plan (they're added to the namespace it's
+        evaluated with), so they're released with it (e.g., when it leaves the query cache)."""
+        rewrittenQuery, bindings = self.rewrite(query)
+        plan = compiler(rewrittenQuery)
+        if len(bindings) == 0:
+            return plan
+        return lambda queryMap: plan({**queryMap, **bindings})
+
+    def rewrite(self, query: str) -> tuple[str, dict[str, IndexedLookup]]:
+        """Returns the rewritten query (the query itself, if there's nothing to rewrite) and the
+        lookups it refers to (by name). Each rewritten path gets its own name (trasmapyLookupN).
+        Only the (root, collection) pairs with a lookup are rewritten."""
+        parts: list[str] = []
+        bindings: dict[str, IndexedLookup] = {}
+        pos = 0
+        for match in _rootPattern.finditer(query):
+            root, collection = match.group(1), match.group(2)
+            lookup = self._lookups.get((root, collection))
+            if lookup is None:
+                # e.g., users/edges (left to pyflwor)
+                continue
+            predicateEnd = _closingBracket(query, match.end() - 1)
+            if predicateEnd is None:
+                break
+            ids = _predicateIds(query[match.end() : predicateEnd])
+            if ids is None:
+                continue
+            name = f"trasmapyLookup{len(bindings)}"
+            bindings[name] = IndexedLookup(collection, lookup, ids)
+            parts.append(query[pos : match.start()])
+            parts.append(f"{name}/{collection}[")
+            pos = match.end()
+        parts.append(query[pos:])
+        return "".join(parts), bindings
+
+
+def _closingBracket(query: str, openPos: int) -> Union[int, None]:
+    """Returns the position of the bracket closing the one at openPos (skipping string literals)."""
+    depth = 0
+    quote: Union[str, None] = None
+    i = openPos
+    while i < len(query):
+        c = query[i]
+        if quote is not None:
+            if c == "\\":
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in "'\"":
+            quote = c
+        elif c == "[":
+            depth += 1
+        elif c == "]":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return None
+
+
+def _predicateIds(predicate: str) -> Union[list[str], None]:
+    """Returns the IDs selected by an ID equality/membership predicate (None for other predicates)."""
+    match = _idEqualityPattern.match(predicate)
+    if match is not None:
+        rest = match.group("rest")
+        if rest is not None and _orPattern.search(rest):
+            return None
+        return [ast.literal_eval(match.group("lhs") or match.group("rhs"))]
+
+    match = _idMembershipPattern.match(predicate)
+    if match is not None:
+        rest = match.group("rest")
+        if rest is not None and _orPattern.search(rest):
+            return None
+        try:
+            ids = ast.literal_eval(match.group("ids"))
+        except (ValueError, SyntaxError):
+            return None
+        if not all(isinstance(id, str) for id in ids):
+            return None
+        return list(dict.fromkeys(ids))
+    return None
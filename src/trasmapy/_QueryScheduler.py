@@ -0,0 +1,94 @@
+from math import lcm
+from statistics import fmean
+
+from trasmapy._Query import Query
+
+
+class QueryScheduler:
+    """Spreads the auto-balanced queries over the ticks of their interval, using their measured cost,
+    so the per-step query time stays flat (instead of all queries with the same interval running
+    on the same steps). The other queries keep their schedule and are accounted as fixed load."""
+
+    # steps between rebalances (queries are also rebalanced when their first cost is measured)
+    rebalancePeriod: int = 100
+    # longest horizon (steps) used to compute the load of each step
+    maxHorizon: int = 3600
+    # minimum relative reduction of the peak load for a rebalance to move queries
+    minImprovement: float = 0.1
+
+    def __init__(self) -> None:
+        self._lastRebalance: int = 0
+        # the auto-balanced queries without a measured cost on the last rebalance
+        self._unmeasured: set[int] = set()
+
+    def place(self, query: Query, queries: dict[str, Query]) -> None:
+        """Picks the first tick of a new auto-balanced query (the least loaded in its interval)."""
+        others = [q for q in queries.values() if q is not query]
+        loads = self._loads(others, self._horizon([*others, query]))
+        self._placeOn(loads, query, self._estimatedCost(query, others))
+        self._unmeasured.add(id(query))
+
+    def update(self, queries: dict[str, Query], step: int) -> None:
+        """Called after the queries of a step run. Rebalances the auto-balanced queries periodically."""
+        balanced = [q for q in queries.values() if q.autoBalance]
+        if len(balanced) == 0:
+            return
+        newlyMeasured = any(
+            id(q) in self._unmeasured and q.cost is not None for q in balanced
+        )
+        if not newlyMeasured and step - self._lastRebalance < self.rebalancePeriod:
+            return
+        self._lastRebalance = step
+        self._unmeasured = {id(q) for q in balanced if q.cost is None}
+        self._rebalance(list(queries.values()))
+
+    def _rebalance(self, queries: list[Query]) -> None:
+        horizon = self._horizon(queries)
+        fixed = [q for q in queries if not q.autoBalance]
+        balanced = [q for q in queries if q.autoBalance]
+        currentPeak = max(self._loads(queries, horizon), default=0.0)
+
+        # longest processing time first: place the most expensive queries first
+        loads = self._loads(fixed, horizon)
+        costs = {id(q): self._estimatedCost(q, queries) for q in balanced}
+        balanced.sort(key=lambda q: costs[id(q)], reverse=True)
+        schedule = [(q, self._placeOn(loads, q, costs[id(q)], apply=False)) for q in balanced]
+        if max(loads, default=0.0) <= currentPeak * (1 - self.minImprovement):
+            for query, ticksUntilCall in schedule:
+                query._reschedule(ticksUntilCall)
+
+    def _placeOn(
+        self, loads: list[float], query: Query, cost: float, apply: bool = True
+    ) -> int:
+        """Adds the query's cost to the least loaded ticks of its interval (in the loads) and
+        returns the corresponding number of ticks until its next call."""
+        interval = query.tickInterval
+        bestStart = min(
+            range(min(interval, len(loads))),
+            key=lambda start: max(loads[start::interval]),
+        )
+        for i in range(bestStart, len(loads), interval):
+            loads[i] += cost
+        if apply:
+            query._reschedule(bestStart + 1)
+        return bestStart + 1
+
+    def _loads(self, queries: list[Query], horizon: int) -> list[float]:
+        """The estimated query time of each of the next steps (index 0 is the next step)."""
+        loads = [0.0] * horizon
+        for query in queries:
+            cost = self._estimatedCost(query, queries)
+            for i in range(query.ticksUntilCall - 1, horizon, query.tickInterval):
+                loads[i] += cost
+        return loads
+
+    def _horizon(self, queries: list[Query]) -> int:
+        intervals = [q.tickInterval for q in queries]
+        return max(1, min(lcm(*intervals), self.maxHorizon)) if intervals else 1
+
+    def _estimatedCost(self, query: Query, queries: list[Query]) -> float:
+        if query.cost is not None:
+            return query.cost
+        # until it runs, a query is assumed to cost as much as the average query
+        measured = [q.cost for q in queries if q.cost is not None and not q.concurrent]
+        return fmean(measured) if measured else 1.0
@@ -0,0 +1,124 @@
+from typing import Any
+
+from trasmapy._Frame import Frame
+
+
+class _Table:
+    def __init__(
+        self,
+        ids: list[str],
+        attributes: dict[str, int],
+        results: dict[str, dict[int, Any]],
+    ) -> None:
+        self.ids = ids
+        # the subscribed attributes (name -> TraCI variable)
+        self.attributes = attributes
+        self.results = results
+
+    def frame(self, kind: str, attributes: list[str]) -> Frame:
+        try:
+            variables = [self.attributes[attribute] for attribute in attributes]
+        except KeyError as e:
+            raise ValueError(
+                f"The given {kind} attribute isn't subscribed: [attribute={e}]."
+            )
+        return Frame.fromSubscriptionResults(self.ids, attributes, variables, self.results)
+
+
+class Snapshot:
+    """Immutable view of the state of the simulation on one step, given to concurrent queries.
+    It holds the subscribed edge, lane and vehicle attributes of that step (see
+    Network.subscribeEdgeAttributes, Network.subscribeLaneAttributes and Users.subscribeVehicleAttributes),
+    so it can be read from other threads/processes while the simulation moves on.
+    Snapshots only hold plain data, so they can be sent to process pools."""
+
+    def __init__(
+        self,
+        step: int,
+        time: float,
+        edges: _Table,
+        lanes: _Table,
+        vehicles: _Table,
+    ) -> None:
+        self._step = step
+        self._time = time
+        self._edges = edges
+        self._lanes = lanes
+        self._vehicles = vehicles
+
+    @classmethod
+    def _fromCaches(
+        cls,
+        step: int,
+        time: float,
+        edges: tuple[list[str], dict[str, int], Any],
+        lanes: tuple[list[str], dict[str, int], Any],
+        vehicles: tuple[list[str], dict[str, int], Any],
+    ):
+        """Builds a snapshot from (ids, subscribableAttributes, SubscriptionCache) triples.
+        The results are copied (the caches are updated in place on the next step)."""
+        tables = []
+        for ids, subscribableAttributes, cache in (edges, lanes, vehicles):
+            subscribed = set(cache.variables)
+            attributes = {
+                name: variable
+                for name, variable in subscribableAttributes.items()
+                if variable in subscribed
+            }
+            tables.append(_Table(ids, attributes, dict(cache.results)))
+        return cls(step, time, *tables)
+
+    @property
+    def step(self) -> int:
+        return self._step
+
+    @property
+    def time(self) -> float:
+        """The simulation time of the snapshot (s)."""
+        return self._time
+
+    @property
+    def edgeIds(self) -> list[str]:
+        return self._edges.ids
+
+    @property
+    def laneIds(self) -> list[str]:
+        return self._lanes.ids
+
+    @property
+    def vehicleIds(self) -> list[str]:
+        """The IDs of the vehicles running in the simulation on the snapshot's step."""
+        return self._vehicles.ids
+
+    @property
+    def edgeAttributes(self) -> list[str]:
+        """The edge attributes available in the snapshot (the subscribed ones)."""
+        return list(self._edges.attributes)
+
+    @property
+    def laneAttributes(self) -> list[str]:
+        """The lane attributes available in the snapshot (the subscribed ones)."""
+        return list(self._lanes.attributes)
+
+    @property
+    def vehicleAttributes(self) -> list[str]:
+        """The vehicle attributes available in the snapshot (the subscribed ones)."""
+        return list(self._vehicles.attributes)
+
+    def edgeFrame(self, attributes: list[str]) -> Frame:
+        """Returns the given (subscribed) attributes of all edges as a Frame (see Network.edgeFrame).
+        Raises ValueError if an attribute isn't subscribed."""
+        return self._edges.frame("edge", attributes)
+
+    def laneFrame(self, attributes: list[str]) -> Frame:
+        """Returns the given (subscribed) attributes of all lanes as a Frame (see Network.laneFrame).
+        Raises ValueError if an attribute isn't subscribed."""
+        return self._lanes.frame("lane", attributes)
+
+    def vehicleFrame(self, attributes: list[str]) -> Frame:
+        """Returns the given (subscribed) attributes of the running vehicles as a Frame
+        (see Users.vehicleFrame). Raises ValueError if an attribute isn't subscribed."""
+        return self._vehicles.frame("vehicle", attributes)
+
+    def __repr__(self) -> str:
+        return f"Snapshot(step={self._step}, time={self._time})"
@@ -0,0 +1,87 @@
+from typing import Any, Callable, Iterable, Union
+
+
+class SubscriptionCache:
+    """Per-step snapshot of the variables subscribed for every object of a TraCI domain.
+    Objects read their values from the snapshot when the variable is subscribed and
+    fall back to a live TraCI call otherwise."""
+
+    def __init__(self, domain) -> None:
+        self._domain = domain
+        self._variables: list[int] = []
+        self._results: dict[str, dict[int, Any]] = {}
+        # the objects subscribed to the current variables
+        self._subscribed: set[str] = set()
+
+    @property
+    def variables(self) -> list[int]:
+        """The variables currently subscribed."""
+        return self._variables.copy()
+
+    @property
+    def subscribedIds(self) -> list[str]:
+        """The objects subscribed to the current variables."""
+        return list(self._subscribed)
+
+    @property
+    def results(self) -> dict[str, dict[int, Any]]:
+        """The subscription results of the last simulation step."""
+        return self._results
+
+    def subscribe(self, objectIds: Iterable[str], variables: Iterable[int]) -> None:
+        """Adds the given variables to the subscription of each given object.
+        If new variables are added, the objects that were already subscribed are
+        re-subscribed, so all objects share the same set of variables. Otherwise, only the
+        objects that aren't subscribed yet cost a TraCI call."""
+        newVariables = [v for v in dict.fromkeys(variables) if v not in self._variables]
+        self._variables.extend(newVariables)
+        if len(self._variables) == 0:
+            return
+
+        if len(newVariables) > 0:
+            toSubscribe = dict.fromkeys(objectIds)
+            toSubscribe.update(dict.fromkeys(list(self._results.keys())))
+            self._subscribed.clear()
+        else:
+            toSubscribe = {
+                objectId: None
+                for objectId in objectIds
+                if objectId not in self._subscribed
+            }
+            if len(toSubscribe) == 0:
+                return
+        for objectId in toSubscribe:
+            self._domain.subscribe(objectId, self._variables)
+        self._subscribed.update(toSubscribe)
+        self.update()
+
+    def forget(self, objectIds: Union[Iterable[str], None] = None) -> None:
+        """Forgets the subscriptions of the given objects (all, if None), e.g., because they left the
+        simulation (SUMO drops their subscriptions), so they are subscribed again if given to subscribe."""
+        if objectIds is None:
+            self._subscribed.clear()
+        else:
+            self._subscribed.difference_update(objectIds)
+
+    def update(self) -> None:
+        """Pulls the subscription results of the last simulation step (one bulk fetch)."""
+        if len(self._variables) == 0:
+            return
+        self._results = self._domain.getAllSubscriptionResults()  # type: ignore
+
+    def set(self, objectId: str, variable: int, value: Any) -> None:
+        """Updates the cached value of the variable for the given object (if it's cached), e.g., after
+        changing it through TraCI, so the new value is read until the next update.
+        The results of the object are replaced, not modified (snapshots may share them)."""
+        values = self._results.get(objectId)
+        if values is not None and variable in values:
+            self._results[objectId] = {**values, variable: value}
+
+    def get(self, objectId: str, variable: int, fallback: Callable[[str], Any]) -> Any:
+        """Returns the cached value of the variable for the given object.
+        If it isn't cached, the value is obtained by calling the fallback with the object ID.
+        """
+        try:
+            return self._results[objectId][variable]
+        except KeyError:
+            return fallback(objectId)
@@ -1,8 +1,20 @@
 from trasmapy.TraSMAPy import TraSMAPy
+from trasmapy.ScenarioRunner import ScenarioRunner
 
 from trasmapy.color.Color import Color
 
+from trasmapy.statistics.StatisticsSink import StatisticsSink
+from trasmapy.statistics.JsonLinesSink import JsonLinesSink
+from trasmapy.statistics.CsvSink import CsvSink
+from trasmapy.statistics.SQLiteSink import SQLiteSink
+from trasmapy.statistics.Aggregation import Aggregation
+from trasmapy.statistics.Reducer import Reducer
+
+from trasmapy.network.RoutingAlgorithm import RoutingAlgorithm
+
 from trasmapy.control.Toll import Toll
+from trasmapy.control.Tariff import Tariff
+from trasmapy.control.TariffToll import TariffToll
 
 from trasmapy.users.VehicleClass import VehicleClass
 from trasmapy.users.MoveReason import MoveReason
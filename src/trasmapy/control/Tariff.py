@@ -0,0 +1,75 @@
+from typing import Union
+
+import numpy as np
+
+from trasmapy.users.VehicleClass import VehicleClass
+from trasmapy.control._TollLedger import VEHICLE_CLASSES, classCode
+
+# length of the day used by the time-of-day periods (s)
+_DAY = 86400.0
+
+
+class Tariff:
+    def __init__(
+        self,
+        rate: float,
+        classRates: Union[dict[VehicleClass, float], None] = None,
+        periods: Union[list[tuple[float, float, float]], None] = None,
+    ) -> None:
+        """The price a TariffToll charges each vehicle: the rate of its vehicle class (classRates, or the
+        base rate for the other classes) times the multiplier of the time-of-day period of the charge.
+        Each period is (begin, end, multiplier), in seconds since midnight (the simulation time modulo
+        one day). The first period containing the time applies (the multiplier is 1 outside of them).
+        E.g., Tariff(2.0, {VehicleClass.TRUCK: 5.0}, [(7 * 3600, 9 * 3600, 1.5)]).
+        Raises ValueError for negative rates or multipliers and for empty periods."""
+        classRates = {} if classRates is None else classRates
+        periods = [] if periods is None else periods
+        for (vehicleClass, classRate) in [(None, rate), *classRates.items()]:
+            if classRate < 0:
+                raise ValueError(
+                    f"Tariff rates can't be negative: [vehicleClass={vehicleClass}], [rate={classRate}]."
+                )
+        for (begin, end, multiplier) in periods:
+            if not 0 <= begin < end <= _DAY or multiplier < 0:
+                raise ValueError(
+                    f"Invalid tariff period: [begin={begin}], [end={end}], [multiplier={multiplier}]."
+                )
+        self._rate = rate
+        self._classRates = dict(classRates)
+        self._periods = list(periods)
+        # the rate of each vehicle class, indexed by class code (see TollLedger)
+        self._rates = np.full(len(VEHICLE_CLASSES), rate, dtype=float)
+        for (vehicleClass, classRate) in classRates.items():
+            self._rates[classCode[vehicleClass.value]] = classRate
+
+    @property
+    def rate(self) -> float:
+        """The rate of the vehicle classes without one of their own."""
+        return self._rate
+
+    @property
+    def classRates(self) -> dict[VehicleClass, float]:
+        return self._classRates.copy()
+
+    @property
+    def periods(self) -> list[tuple[float, float, float]]:
+        return self._periods.copy()
+
+    def multiplier(self, time: float) -> float:
+        """Returns the multiplier of the period containing the given simulation time (s)."""
+        timeOfDay = time % _DAY
+        for (begin, end, multiplier) in self._periods:
+            if begin <= timeOfDay < end:
+                return multiplier
+        return 1.0
+
+    def price(self, vehicleClass: VehicleClass, time: float) -> float:
+        """Returns the price for a vehicle of the given class at the given simulation time (s)."""
+        return float(self._rates[classCode[vehicleClass.value]]) * self.multiplier(time)
+
+    def _prices(self, classCodes: np.ndarray, time: float) -> np.ndarray:
+        """The prices for the vehicles of the given classes (codes) at the given simulation time (in bulk)."""
+        return self._rates[classCodes] * self.multiplier(time)
+
+    def __repr__(self) -> str:
+        return f"Tariff(rate={self._rate})"
@@ -0,0 +1,90 @@
+from math import inf
+from typing_extensions import override
+
+import numpy as np
+
+from trasmapy.network._Detector import Detector
+from trasmapy.control.Toll import Toll
+from trasmapy.control.Tariff import Tariff
+from trasmapy.control._TollLedger import _grow
+
+
+class TariffToll(Toll):
+    def __init__(
+        self,
+        id: str,
+        detectors: list[Detector],
+        tariff: Tariff,
+        chargeWindow: float = 0.0,
+    ) -> None:
+        """A toll that charges the vehicles detected by its detectors according to the given tariff.
+        The charges are recorded in the ledger of the Control the toll is registered with (see
+        Control.ledger). The detections of a step are charged in bulk at the end of the step. Each passage
+        is charged once: a vehicle seen by several detectors, or on consecutive steps (e.g., while over a
+        loop), is charged once, and it isn't charged again within chargeWindow seconds of its last charge
+        (e.g., for loops spread along the tolled road).
+        Raises ValueError if the charge window is negative."""
+        if chargeWindow < 0:
+            raise ValueError(
+                f"The charge window can't be negative: [chargeWindow={chargeWindow}]."
+            )
+        super().__init__(id, detectors)
+        self._tariff = tariff
+        self._chargeWindow = chargeWindow
+        # the vehicles detected in the current step (may repeat)
+        self._pending: list[str] = []
+        # per vehicle (ledger index): the last step it was detected and the time of its last charge
+        self._lastDetections = np.full(0, -2, dtype=np.int64)
+        self._lastCharges = np.full(0, -inf, dtype=float)
+
+    @property
+    def tariff(self) -> Tariff:
+        return self._tariff
+
+    @tariff.setter
+    def tariff(self, tariff: Tariff) -> None:
+        """Changes the tariff of the next charges."""
+        self._tariff = tariff
+
+    @property
+    def chargeWindow(self) -> float:
+        return self._chargeWindow
+
+    @override
+    def _register(self, ledger) -> None:
+        super()._register(ledger)
+        # the classes of the charged vehicles come from their types, as seen by the detectors
+        for detector in self._detectors:
+            detector._subscribeVehicleTypes()
+
+    @override
+    def roadPricingScheme(self, detectedVehicles):
+        if self._ledger is not None:
+            self._pending.extend(detectedVehicles)
+
+    @override
+    def _doSimulationStep(self, *args, step: int, time: float) -> None:
+        if len(self._pending) == 0:
+            return
+        ledger = self._ledger
+        vehicleTypeIds: dict[str, str] = {}
+        for detector in self._detectors:
+            vehicleTypeIds.update(detector._vehicleTypeIds())
+        vehicles = ledger._indexVehicles(list(dict.fromkeys(self._pending)), vehicleTypeIds)  # type: ignore
+        self._pending.clear()
+        if len(vehicles) == 0:
+            return
+
+        vehicleCount = len(ledger._vehicleIds)  # type: ignore
+        self._lastDetections = _grow(self._lastDetections, vehicleCount, fill=-2)
+        self._lastCharges = _grow(self._lastCharges, vehicleCount, fill=-inf)
+        due = (self._lastDetections[vehicles] < step - 1) & (
+            self._lastCharges[vehicles] < time - self._chargeWindow
+        )
+        self._lastDetections[vehicles] = step
+        vehicles = vehicles[due]
+        if len(vehicles) == 0:
+            return
+        self._lastCharges[vehicles] = time
+        amounts = self._tariff._prices(ledger._vehicleClasses[vehicles], time)  # type: ignore
+        ledger._charge(self._ledgerIndex, vehicles, amounts, time)  # type: ignore
@@ -1,15 +1,21 @@
 from abc import abstractmethod
+from typing import Union
+from typing_extensions import override
 
 from trasmapy.network._Detector import Detector
 from trasmapy._IdentifiedObject import IdentifiedObject
+from trasmapy._SimUpdatable import SimUpdatable
 
 
-class Toll(IdentifiedObject):
+class Toll(IdentifiedObject, SimUpdatable):
     def __init__(self, id: str, detectors: list[Detector]) -> None:
         super().__init__(id)
         self._detectors = detectors
         for detector in self._detectors:
             detector.listen(self.roadPricingScheme)
+        # set when the toll is registered (see Control.registerToll)
+        self._ledger = None
+        self._ledgerIndex: Union[int, None] = None
 
     @property
     def detectors(self) -> list[Detector]:
@@ -18,3 +24,11 @@ class Toll(IdentifiedObject):
     @abstractmethod
     def roadPricingScheme(self, detectedVehicles):
         pass
+
+    def _register(self, ledger) -> None:
+        self._ledger = ledger
+        self._ledgerIndex = ledger._addToll(self.id)
+
+    @override
+    def _doSimulationStep(self, *args, step: int, time: float) -> None:
+        pass
@@ -1,31 +1,43 @@
 from typing_extensions import override
 
-import traci
-
 from trasmapy._SimUpdatable import SimUpdatable
 from trasmapy.control._TrafficLight import TrafficLight
 from trasmapy.control.Toll import Toll
+from trasmapy.control._TollLedger import TollLedger
 
 
 class Control(SimUpdatable):
-    def __init__(self) -> None:
+    def __init__(self, connection) -> None:
+        self._connection = connection
         self._tolls: dict[str, Toll] = {}
+        self._ledger = TollLedger(connection)
 
     @property
     def trafficlights(self) -> list[TrafficLight]:
-        return list(map(lambda id: TrafficLight(id), traci.trafficlight.getIDList()))
+        return list(
+            map(
+                lambda id: TrafficLight(id, self._connection),
+                self._connection.trafficlight.getIDList(),
+            )
+        )
 
     def getTrafficLight(self, id: str) -> TrafficLight:
-        return TrafficLight(id)
+        return TrafficLight(id, self._connection)
 
     @property
     def tolls(self) -> list[Toll]:
         return list(self._tolls.values())
 
+    @property
+    def ledger(self) -> TollLedger:
+        """The charges of the registered tolls (see TariffToll)."""
+        return self._ledger
+
     def registerToll(self, toll: Toll) -> None:
         if toll.id in self._tolls:
             raise KeyError("There's already a Toll with that ID registered.")
         self._tolls[toll.id] = toll
+        toll._register(self._ledger)
 
     def getToll(self, id: str) -> Toll:
         """Returns the registered Toll with the given ID or raises KeyError if none is found."""
@@ -33,4 +45,9 @@ class Control(SimUpdatable):
 
     @override
     def _doSimulationStep(self, *args, step: int, time: float) -> None:
-        pass
+        # the detections of the step (dispatched by the network) are charged in bulk
+        for toll in self._tolls.values():
+            toll._doSimulationStep(*args, step=step, time=time)
+
+    def _close(self) -> None:
+        self._ledger._close()
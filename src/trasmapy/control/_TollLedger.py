@@ -0,0 +1,204 @@
+import csv
+from typing import Union
+
+import numpy as np
+
+from trasmapy import _Backend
+from trasmapy.users.VehicleClass import VehicleClass
+
+# the vehicle classes, indexed by their code in the ledger's arrays
+VEHICLE_CLASSES: list[VehicleClass] = list(VehicleClass)
+# vehicle class (SUMO name) -> code
+classCode: dict[str, int] = {
+    vehicleClass.value: code for code, vehicleClass in enumerate(VEHICLE_CLASSES)
+}
+
+
+def _grow(array: np.ndarray, size: int, fill=0) -> np.ndarray:
+    """Returns the array with room for (at least) the given number of elements (doubling its capacity)."""
+    if size <= len(array):
+        return array
+    grown = np.full(max(size, 2 * len(array)), fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class TollLedger:
+    """Records the charges of the tolls (see TariffToll) in array-backed storage: one row per charge
+    (time, toll, vehicle, vehicle class and amount). Running totals are kept, so the revenue and the
+    totals per vehicle class, toll and vehicle are O(1)."""
+
+    def __init__(self, connection, capacity: int = 1024) -> None:
+        self._connection = connection
+        # the charges (only the first chargeCount rows are used)
+        self._chargeCount = 0
+        self._times = np.empty(capacity, dtype=float)
+        self._tolls = np.empty(capacity, dtype=np.int32)
+        self._vehicles = np.empty(capacity, dtype=np.int32)
+        self._amounts = np.empty(capacity, dtype=float)
+        # the tolls and vehicles, indexed by their position in the charges
+        self._tollIds: list[str] = []
+        self._tollIndexes: dict[str, int] = {}
+        self._vehicleIds: list[str] = []
+        self._vehicleIndexes: dict[str, int] = {}
+        # per vehicle: its class code (see classCode)
+        self._vehicleClasses = np.empty(capacity, dtype=np.int16)
+        # vehicle type ID -> class code (the types outlive their vehicles)
+        self._typeClasses: dict[str, int] = {}
+        # running totals
+        self._revenue = 0.0
+        self._classTotals = np.zeros(len(VEHICLE_CLASSES), dtype=float)
+        self._tollTotals = np.zeros(0, dtype=float)
+        self._vehicleTotals = np.zeros(capacity, dtype=float)
+        self._exportPath: Union[str, None] = None
+
+    def __len__(self) -> int:
+        """The number of charges."""
+        return self._chargeCount
+
+    @property
+    def revenue(self) -> float:
+        """The sum of all charges."""
+        return self._revenue
+
+    @property
+    def classTotals(self) -> dict[VehicleClass, float]:
+        """The sum of the charges of each vehicle class (only the charged classes)."""
+        return {
+            VEHICLE_CLASSES[code]: float(total)
+            for code, total in enumerate(self._classTotals)
+            if total != 0
+        }
+
+    @property
+    def tollTotals(self) -> dict[str, float]:
+        """The sum of the charges of each registered toll."""
+        return {
+            tollId: float(total) for tollId, total in zip(self._tollIds, self._tollTotals)
+        }
+
+    def classTotal(self, vehicleClass: VehicleClass) -> float:
+        """Returns the sum of the charges of the vehicles of the given class."""
+        return float(self._classTotals[classCode[vehicleClass.value]])
+
+    def tollTotal(self, tollId: str) -> float:
+        """Returns the sum of the charges of the given toll.
+        Raises KeyError if the toll isn't registered."""
+        try:
+            return float(self._tollTotals[self._tollIndexes[tollId]])
+        except KeyError:
+            raise KeyError(f"Toll not found: [tollId={tollId}].")
+
+    def vehicleTotal(self, vehicleId: str) -> float:
+        """Returns the sum of the charges of the given vehicle (0 if it was never charged)."""
+        try:
+            return float(self._vehicleTotals[self._vehicleIndexes[vehicleId]])
+        except KeyError:
+            return 0.0
+
+    def charges(self) -> dict[str, np.ndarray]:
+        """Returns the charges as columns: time, tollId, vehicleId, vehicleClass (SUMO name) and amount."""
+        count = self._chargeCount
+        vehicles = self._vehicles[:count]
+        classNames = np.array([vehicleClass.value for vehicleClass in VEHICLE_CLASSES], dtype=object)
+        return {
+            "time": self._times[:count].copy(),
+            "tollId": np.array(self._tollIds, dtype=object)[self._tolls[:count]],
+            "vehicleId": np.array(self._vehicleIds, dtype=object)[vehicles],
+            "vehicleClass": classNames[self._vehicleClasses[vehicles]],
+            "amount": self._amounts[:count].copy(),
+        }
+
+    def export(self, path: str) -> None:
+        """Writes the charges to the given path: CSV (one row per charge, with the columns of charges)
+        or, if the path ends with .npz, a compressed NumPy archive with one array per column."""
+        columns = self.charges()
+        if path.endswith(".npz"):
+            np.savez_compressed(path, **columns)  # type: ignore
+            return
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(columns.keys()))
+            writer.writerows(zip(*(column.tolist() for column in columns.values())))
+
+    def exportOnClose(self, path: Union[str, None]) -> None:
+        """Sets the path the charges are exported to when the simulation is closed (None to not export them).
+        See export."""
+        self._exportPath = path
+
+    def _close(self) -> None:
+        if self._exportPath is not None:
+            self.export(self._exportPath)
+
+    def _addToll(self, tollId: str) -> int:
+        """Registers the toll and returns its index."""
+        self._tollIndexes[tollId] = len(self._tollIds)
+        self._tollIds.append(tollId)
+        self._tollTotals = np.append(self._tollTotals, 0.0)
+        return self._tollIndexes[tollId]
+
+    def _indexVehicles(self, vehicleIds, vehicleTypeIds: dict[str, str]) -> np.ndarray:
+        """Returns the indexes of the given vehicles, indexing the new ones.
+        The class of a new vehicle is the class of its type (given by vehicleTypeIds, e.g., as seen by a
+        detector), as the vehicle may have left the simulation already. Vehicles without a known type
+        are looked up through TraCI and skipped (not indexed) if they don't exist anymore."""
+        indexes: list[int] = []
+        for vehicleId in vehicleIds:
+            try:
+                indexes.append(self._vehicleIndexes[vehicleId])
+                continue
+            except KeyError:
+                pass
+            try:
+                vehicleTypeId = vehicleTypeIds.get(vehicleId)
+                if vehicleTypeId is None:
+                    vehicleTypeId = self._connection.vehicle.getTypeID(vehicleId)
+                code = self._typeClass(vehicleTypeId)  # type: ignore
+            except _Backend.traciExceptions:
+                continue
+            index = len(self._vehicleIds)
+            self._vehicleClasses = _grow(self._vehicleClasses, index + 1)
+            self._vehicleTotals = _grow(self._vehicleTotals, index + 1)
+            self._vehicleClasses[index] = code
+            self._vehicleIndexes[vehicleId] = index
+            self._vehicleIds.append(vehicleId)
+            indexes.append(index)
+        return np.array(indexes, dtype=np.int32)
+
+    def _typeClass(self, vehicleTypeId: str) -> int:
+        """Returns the class code of the given vehicle type (fetched once per type)."""
+        try:
+            return self._typeClasses[vehicleTypeId]
+        except KeyError:
+            pass
+        vehicleClass = self._connection.vehicletype.getVehicleClass(vehicleTypeId)
+        try:
+            code = classCode[vehicleClass]  # type: ignore
+        except KeyError:
+            raise ValueError(
+                f"Unknown vehicle class: [vehicleTypeId={vehicleTypeId}], [vehicleClass={vehicleClass}]."
+            )
+        self._typeClasses[vehicleTypeId] = code
+        return code
+
+    def _charge(
+        self, tollIndex: int, vehicles: np.ndarray, amounts: np.ndarray, time: float
+    ) -> None:
+        """Records the charges of the given (indexed, distinct) vehicles by the given toll."""
+        start, end = self._chargeCount, self._chargeCount + len(vehicles)
+        self._times = _grow(self._times, end)
+        self._tolls = _grow(self._tolls, end)
+        self._vehicles = _grow(self._vehicles, end)
+        self._amounts = _grow(self._amounts, end)
+        self._times[start:end] = time
+        self._tolls[start:end] = tollIndex
+        self._vehicles[start:end] = vehicles
+        self._amounts[start:end] = amounts
+        self._chargeCount = end
+
+        total = float(amounts.sum())
+        self._revenue += total
+        self._tollTotals[tollIndex] += total
+        # the vehicles are distinct, so fancy indexing accumulates correctly
+        self._vehicleTotals[vehicles] += amounts
+        np.add.at(self._classTotals, self._vehicleClasses[vehicles], amounts)
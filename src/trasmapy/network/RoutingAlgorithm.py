@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class RoutingAlgorithm(Enum):
+    DIJKSTRA = "dijkstra"
+
+    ASTAR = "astar"
+    """Dijkstra guided by the straight-line distance to the destination (at the highest speed of the network).
+    Only optimal if the weights are travel times (no faster than driving at that speed)."""
+
+    CH = "ch"
+    """Contraction hierarchies: the network is preprocessed once per set of weights (see Router.contract),
+    and each query only settles a small part of it. Best when many routes share the same weights."""
@@ -1,7 +1,5 @@
 from typing_extensions import override
 
-from traci import chargingstation
-
 from trasmapy.network._StopLocation import StopLocation
 from trasmapy.users.StopType import StopType
 
@@ -9,25 +7,25 @@ from trasmapy.users.StopType import StopType
 class ChargingStation(StopLocation):
     stopType: StopType = StopType.CHARGING_STATION
 
-    def __init__(self, chargingStationId: str) -> None:
-        super().__init__(chargingStationId)
+    def __init__(self, chargingStationId: str, connection) -> None:
+        super().__init__(chargingStationId, connection)
 
     @property
     @override
     def name(self) -> str:
-        return chargingstation.getName(self.id)  # type: ignore
+        return self._connection.chargingstation.getName(self.id)  # type: ignore
 
     @property
     @override
     def startPos(self) -> float:
-        return chargingstation.getStartPos(self.id)  # type: ignore
+        return self._connection.chargingstation.getStartPos(self.id)  # type: ignore
 
     @property
     @override
     def endPos(self) -> float:
-        return chargingstation.getEndPos(self.id)  # type: ignore
+        return self._connection.chargingstation.getEndPos(self.id)  # type: ignore
 
     @property
     @override
     def vehicleIds(self) -> list[str]:
-        return chargingstation.getVehicleIDs(self.id)  # type: ignore
+        return self._connection.chargingstation.getVehicleIDs(self.id)  # type: ignore
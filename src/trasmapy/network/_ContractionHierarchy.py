@@ -0,0 +1,172 @@
+import heapq
+from math import inf
+from typing import Union
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy of a graph whose nodes have weights (the cost of a path is the sum
+    of the weights of its nodes). The nodes are contracted from the least to the most important,
+    adding shortcuts that preserve the shortest paths among the remaining nodes. Queries then only
+    follow arcs that go up in the hierarchy (bidirectional), settling a small part of the graph.
+    The hierarchy is only valid for the weights it was built with."""
+
+    # maximum number of nodes settled by each witness search (bounds the preprocessing time;
+    # a missed witness only adds an unnecessary shortcut)
+    _witnessSettleLimit: int = 64
+
+    def __init__(self, successors: list[list[int]], weights: list[float]) -> None:
+        nodeCount = len(successors)
+        self._weights = weights
+        # arcs (u -> v), with the cost of entering v and the contracted node of the shortcut (or -1)
+        self._out: list[dict[int, tuple[float, int]]] = [{} for _ in range(nodeCount)]
+        self._in: list[dict[int, tuple[float, int]]] = [{} for _ in range(nodeCount)]
+        for u, nodeSuccessors in enumerate(successors):
+            for v in nodeSuccessors:
+                if u != v and weights[v] < inf:
+                    self._out[u][v] = (weights[v], -1)
+                    self._in[v][u] = (weights[v], -1)
+        self._rank: list[int] = [0] * nodeCount
+        self._contract()
+        # the arcs going up in the hierarchy (forward search) and coming down from it (backward search)
+        self._up: list[list[tuple[int, float]]] = [
+            [(v, cost) for v, (cost, _) in self._out[u].items() if self._rank[v] > self._rank[u]]
+            for u in range(nodeCount)
+        ]
+        self._down: list[list[tuple[int, float]]] = [
+            [(u, cost) for u, (cost, _) in self._in[v].items() if self._rank[u] > self._rank[v]]
+            for v in range(nodeCount)
+        ]
+
+    def shortestPath(self, origin: int, destination: int) -> Union[list[int], None]:
+        """Returns the nodes of the shortest path (None if the destination can't be reached)."""
+        if origin == destination:
+            return [origin] if self._weights[origin] < inf else None
+        forward: dict[int, float] = {origin: self._weights[origin]}
+        backward: dict[int, float] = {destination: 0.0}
+        forwardParent: dict[int, int] = {}
+        backwardParent: dict[int, int] = {}
+        forwardQueue = [(self._weights[origin], origin)]
+        backwardQueue = [(0.0, destination)]
+        best, meeting = inf, -1
+
+        while True:
+            forwardMin = forwardQueue[0][0] if forwardQueue else inf
+            backwardMin = backwardQueue[0][0] if backwardQueue else inf
+            # both searches are past the best path found (the distances only grow)
+            if min(forwardMin, backwardMin) >= best:
+                break
+            if forwardMin <= backwardMin:
+                queue, dist, parent, arcs, otherDist = (
+                    forwardQueue, forward, forwardParent, self._up, backward
+                )
+            else:
+                queue, dist, parent, arcs, otherDist = (
+                    backwardQueue, backward, backwardParent, self._down, forward
+                )
+            d, u = heapq.heappop(queue)
+            if d > dist[u]:
+                continue
+            if u in otherDist and d + otherDist[u] < best:
+                best, meeting = d + otherDist[u], u
+            for v, cost in arcs[u]:
+                nd = d + cost
+                if nd < dist.get(v, inf):
+                    dist[v] = nd
+                    parent[v] = u
+                    heapq.heappush(queue, (nd, v))
+
+        if meeting == -1:
+            return None
+        # the up path to the meeting node and the down path from it (unpacking the shortcuts)
+        ups = [meeting]
+        while ups[-1] != origin:
+            ups.append(forwardParent[ups[-1]])
+        ups.reverse()
+        downs = [meeting]
+        while downs[-1] != destination:
+            downs.append(backwardParent[downs[-1]])
+        path = [origin]
+        for u, v in zip(ups, ups[1:]):
+            self._unpack(u, v, path)
+        for u, v in zip(downs, downs[1:]):
+            self._unpack(u, v, path)
+        return path
+
+    def _unpack(self, u: int, v: int, path: list[int]) -> None:
+        """Appends the nodes of the arc (u -> v), without u, to the path."""
+        via = self._out[u][v][1]
+        if via == -1:
+            path.append(v)
+            return
+        self._unpack(u, via, path)
+        self._unpack(via, v, path)
+
+    def _contract(self) -> None:
+        contracted = [False] * len(self._out)
+        # number of contracted neighbours (spreads the contraction over the graph)
+        contractedNeighbours = [0] * len(self._out)
+        queue = [(self._priority(v, contracted, contractedNeighbours), v) for v in range(len(self._out))]
+        heapq.heapify(queue)
+        rank = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            # lazy update: re-evaluate the node and only contract it if it is still the least important
+            priority = self._priority(v, contracted, contractedNeighbours)
+            if queue and priority > queue[0][0]:
+                heapq.heappush(queue, (priority, v))
+                continue
+            for u, w, cost in self._shortcuts(v, contracted):
+                if cost < self._out[u].get(w, (inf, -1))[0]:
+                    self._out[u][w] = (cost, v)
+                    self._in[w][u] = (cost, v)
+            contracted[v] = True
+            self._rank[v] = rank
+            rank += 1
+            for neighbour in (*self._out[v], *self._in[v]):
+                contractedNeighbours[neighbour] += 1
+
+    def _priority(self, v: int, contracted: list[bool], contractedNeighbours: list[int]) -> int:
+        # edge difference: the shortcuts added minus the arcs removed
+        arcs = sum(1 for u in self._in[v] if not contracted[u]) + sum(
+            1 for w in self._out[v] if not contracted[w]
+        )
+        return len(self._shortcuts(v, contracted)) - arcs + contractedNeighbours[v]
+
+    def _shortcuts(self, v: int, contracted: list[bool]) -> list[tuple[int, int, float]]:
+        """The shortcuts (u, w, cost) needed to contract v (the paths u -> v -> w without a witness)."""
+        targets = {w: cost for w, (cost, _) in self._out[v].items() if not contracted[w]}
+        shortcuts = []
+        for u, (inCost, _) in self._in[v].items():
+            if contracted[u]:
+                continue
+            candidates = {w: inCost + cost for w, cost in targets.items() if w != u}
+            if not candidates:
+                continue
+            witnesses = self._witnessSearch(u, v, max(candidates.values()), contracted)
+            for w, cost in candidates.items():
+                if witnesses.get(w, inf) > cost:
+                    shortcuts.append((u, w, cost))
+        return shortcuts
+
+    def _witnessSearch(
+        self, origin: int, excluded: int, maxCost: float, contracted: list[bool]
+    ) -> dict[int, float]:
+        """Bounded Dijkstra from the origin, avoiding the excluded and contracted nodes."""
+        dist = {origin: 0.0}
+        queue = [(0.0, origin)]
+        settled = 0
+        while queue and settled < self._witnessSettleLimit:
+            d, u = heapq.heappop(queue)
+            if d > dist[u]:
+                continue
+            if d > maxCost:
+                break
+            settled += 1
+            for w, (cost, _) in self._out[u].items():
+                if w == excluded or contracted[w]:
+                    continue
+                nd = d + cost
+                if nd < dist.get(w, inf):
+                    dist[w] = nd
+                    heapq.heappush(queue, (nd, w))
+        return dist
@@ -1,40 +1,64 @@
 from typing_extensions import override
-import traci
+
+from traci.constants import LAST_STEP_VEHICLE_ID_LIST, LAST_STEP_VEHICLE_DATA
 
 from trasmapy._SimUpdatable import SimUpdatable
 from trasmapy._IdentifiedObject import IdentifiedObject
 
 
 class Detector(IdentifiedObject, SimUpdatable):
-    def __init__(self, detectorId: str) -> None:
+    def __init__(self, detectorId: str, connection, subscriptionCache) -> None:
         super().__init__(detectorId)
+        self._connection = connection
+        self._cache = subscriptionCache
         self._listeners = []
 
     @property
     def timeSinceLastDetection(self) -> float:
         """Returns how many seconds elapsed since the last detection."""
-        return traci.inductionloop.getTimeSinceDetection(self.id)  # type: ignore
+        return self._connection.inductionloop.getTimeSinceDetection(self.id)  # type: ignore
 
     @property
     def laneId(self) -> str:
         """Returns the ID of the lane where the detector is placed."""
-        return traci.inductionloop.getLaneID(self.id)  # type: ignore
+        return self._connection.inductionloop.getLaneID(self.id)  # type: ignore
 
     @property
     def position(self) -> float:
         """Returns the position of the detection on its containing lane."""
-        return traci.inductionloop.getPosition(self.id)  # type: ignore
+        return self._connection.inductionloop.getPosition(self.id)  # type: ignore
 
     def listen(self, listener):
-        """Hooks into the detector. The given function will be called with the IDs of the detected vehicles there's a detection."""
+        """Hooks into the detector. The given function will be called with the IDs of the detected vehicles there's a detection.
+        The detections of all listened detectors are fetched in bulk once per simulation step."""
         self._listeners.append(listener)
+        if len(self._listeners) == 1:
+            self._cache.subscribe([self.id], [LAST_STEP_VEHICLE_ID_LIST])
 
     @override
     def _doSimulationStep(self, *args, step: int, time: float) -> None:
-        detectedVehicles = traci.inductionloop.getLastStepVehicleIDs(self.id)
+        if len(self._listeners) == 0:
+            return
+        detectedVehicles = self._cache.get(
+            self.id,
+            LAST_STEP_VEHICLE_ID_LIST,
+            self._connection.inductionloop.getLastStepVehicleIDs,
+        )
         if len(detectedVehicles) == 0:
             # nothing happened
             return
 
         for listener in self._listeners:
             listener(detectedVehicles)
+
+    def _subscribeVehicleTypes(self) -> None:
+        """Subscribes the data of the detected vehicles, so _vehicleTypeIds doesn't need TraCI calls."""
+        self._cache.subscribe([self.id], [LAST_STEP_VEHICLE_DATA])
+
+    def _vehicleTypeIds(self) -> dict[str, str]:
+        """Returns the type of each vehicle detected in the last simulation step (known even if the
+        vehicle left the simulation in that step)."""
+        vehicleData = self._cache.get(
+            self.id, LAST_STEP_VEHICLE_DATA, self._connection.inductionloop.getVehicleData
+        )
+        return {data[0]: data[4] for data in vehicleData}
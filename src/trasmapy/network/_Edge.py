@@ -1,103 +1,165 @@
 from itertools import chain
-
-import traci
+from typing_extensions import override
+
+from traci.constants import (
+    VAR_CURRENT_TRAVELTIME,
+    VAR_CO2EMISSION,
+    VAR_COEMISSION,
+    VAR_HCEMISSION,
+    VAR_PMXEMISSION,
+    VAR_NOXEMISSION,
+    VAR_FUELCONSUMPTION,
+    VAR_ELECTRICITYCONSUMPTION,
+    LAST_STEP_VEHICLE_NUMBER,
+    LAST_STEP_MEAN_SPEED,
+    LAST_STEP_VEHICLE_ID_LIST,
+    LAST_STEP_OCCUPANCY,
+    LAST_STEP_LENGTH,
+    VAR_WAITING_TIME,
+    LAST_STEP_VEHICLE_HALTING_NUMBER,
+)
 
 from trasmapy._IdentifiedObject import IdentifiedObject
+from trasmapy._CachedAttributes import CachedAttributes
+from trasmapy._SubscriptionCache import SubscriptionCache
 from trasmapy.network._Lane import Lane
 from trasmapy.network._Stop import Stop
 from trasmapy.users.VehicleClass import VehicleClass
 
 
-class Edge(IdentifiedObject):
-    def __init__(self, edgeId: str, laneList: list[Lane]) -> None:
-        super().__init__(edgeId)
+class Edge(IdentifiedObject, CachedAttributes):
+    subscribableAttributes: dict[str, int] = {
+        "travelTime": VAR_CURRENT_TRAVELTIME,
+        "CO2Emissions": VAR_CO2EMISSION,
+        "COEmissions": VAR_COEMISSION,
+        "HCEmissions": VAR_HCEMISSION,
+        "PMxEmissions": VAR_PMXEMISSION,
+        "NOxEmissions": VAR_NOXEMISSION,
+        "fuelConsumption": VAR_FUELCONSUMPTION,
+        "electricityConsumption": VAR_ELECTRICITYCONSUMPTION,
+        "vehicleCount": LAST_STEP_VEHICLE_NUMBER,
+        "vehicleMeanSpeed": LAST_STEP_MEAN_SPEED,
+        "vehicleIds": LAST_STEP_VEHICLE_ID_LIST,
+        "occupancy": LAST_STEP_OCCUPANCY,
+        "vehicleMeanLength": LAST_STEP_LENGTH,
+        "vehicleWaitingTime": VAR_WAITING_TIME,
+        "vehicleHaltCount": LAST_STEP_VEHICLE_HALTING_NUMBER,
+    }
+    """The attributes that can be served from a per-step subscription (see Network.subscribeEdgeAttributes)."""
+
+    def __init__(
+        self, edgeId: str, laneList: list[Lane], connection, cache: SubscriptionCache
+    ) -> None:
+        IdentifiedObject.__init__(self, edgeId)
+        CachedAttributes.__init__(self)
+        self._connection = connection
+        self._cache = cache
+        self._parent = None
 
         self._lanes: dict[str, Lane] = {}
         for lane in laneList:
             lane._setParent(self)
             self._lanes[lane.id] = lane
 
+    def _setParent(self, network) -> None:
+        self._parent = network
+
+    def _weightsChanged(self) -> None:
+        if self._parent is not None:
+            self._parent._weightsChanged()
+
+    @override
+    def refresh(self) -> None:
+        """Drops the cached attribute values of this edge and its lanes."""
+        super().refresh()
+        for lane in self._lanes.values():
+            lane.refresh()
+
     @property
     def streetName(self) -> str:
         """Returns the street name of the edge."""
-        return traci.edge.getStreetName(self.id)  # type: ignore
+        return self._getCached("streetName", self._connection.edge.getStreetName)
 
     @property
     def travelTime(self) -> float:
         """Returns the estimated travel time for the last time step on the edge (s)."""
-        return traci.edge.getTraveltime(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_CURRENT_TRAVELTIME, self._connection.edge.getTraveltime)  # type: ignore
 
     @property
     def CO2Emissions(self) -> float:
         """Sum of CO2 emissions on this edge during this time step (mg)."""
-        return traci.edge.getCO2Emission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_CO2EMISSION, self._connection.edge.getCO2Emission)  # type: ignore
 
     @property
     def COEmissions(self) -> float:
         """Sum of CO emissions on this edge during this time step (mg)."""
-        return traci.edge.getCOEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_COEMISSION, self._connection.edge.getCOEmission)  # type: ignore
 
     @property
     def HCEmissions(self) -> float:
         """Sum of HC emissions on this edge during this time step (mg)."""
-        return traci.edge.getHCEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_HCEMISSION, self._connection.edge.getHCEmission)  # type: ignore
 
     @property
     def PMxEmissions(self) -> float:
         """Sum of PMx emissions on this edge during this time step (mg)."""
-        return traci.edge.getPMxEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_PMXEMISSION, self._connection.edge.getPMxEmission)  # type: ignore
 
     @property
     def NOxEmissions(self) -> float:
         """Sum of NOx emissions on this edge during this time step (mg)."""
-        return traci.edge.getNOxEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_NOXEMISSION, self._connection.edge.getNOxEmission)  # type: ignore
 
     @property
     def fuelConsumption(self) -> float:
         """Sum of fuel consumption on this edge during this time step (ml)."""
-        return traci.edge.getFuelConsumption(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_FUELCONSUMPTION, self._connection.edge.getFuelConsumption)  # type: ignore
 
     @property
     def electricityConsumption(self) -> float:
         """Sum of electricity consumption on this edge during this time step (kWh)."""
-        return traci.edge.getElectricityConsumption(self.id)
+        return self._cache.get(
+            self.id,
+            VAR_ELECTRICITYCONSUMPTION,
+            self._connection.edge.getElectricityConsumption,
+        )
 
     @property
     def vehicleCount(self) -> int:
         """The number of vehicles on this edge within the last time step."""
-        return traci.edge.getLastStepVehicleNumber(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_VEHICLE_NUMBER, self._connection.edge.getLastStepVehicleNumber)  # type: ignore
 
     @property
     def vehicleMeanSpeed(self) -> float:
         """Returns the mean speed of vehicles that were on this edge within the last simulation step (m/s)."""
-        return traci.edge.getLastStepMeanSpeed(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_MEAN_SPEED, self._connection.edge.getLastStepMeanSpeed)  # type: ignore
 
     @property
     def vehicleIds(self) -> list[str]:
         """Returns the list of ids of vehicles that were on the edge in the last simulation step.
         The order is from rightmost to leftmost lane and downstream for each lane."""
-        return traci.edge.getLastStepVehicleIDs(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_VEHICLE_ID_LIST, self._connection.edge.getLastStepVehicleIDs)  # type: ignore
 
     @property
     def occupancy(self) -> float:
         """Returns the percentage of time the edge was occupied by a vehicle (%)."""
-        return traci.edge.getLastStepOccupancy(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_OCCUPANCY, self._connection.edge.getLastStepOccupancy)  # type: ignore
 
     @property
     def vehicleMeanLength(self) -> float:
         """Returns the mean length of the vehicles on the edge in the last time step (m)."""
-        return traci.edge.getLastStepLength(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_LENGTH, self._connection.edge.getLastStepLength)  # type: ignore
 
     @property
     def vehicleWaitingTime(self) -> float:
         """Returns the sum of the waiting times for all vehicles on the edge (s)."""
-        return traci.edge.getWaitingTime(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_WAITING_TIME, self._connection.edge.getWaitingTime)  # type: ignore
 
     @property
     def vehicleHaltCount(self) -> int:
         """Returns the total number of halting vehicles for the last time step on the edge.
         A speed of less than 0.1 m/s is considered a halt."""
-        return traci.edge.getLastStepHaltingNumber(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_VEHICLE_HALTING_NUMBER, self._connection.edge.getLastStepHaltingNumber)  # type: ignore
 
     @property
     def lanes(self) -> list[Lane]:
@@ -112,28 +174,45 @@ class Edge(IdentifiedObject):
 
     def getAdaptedTravelTime(self, time: float) -> float:
         """Returns the edge travel time for the given time as stored in the global container.
-        If no such value exists, -1 is returned."""
-        return traci.edge.getAdaptedTraveltime(self.id, time)
+        If no such value exists, -1 is returned.
+        Values set through TraSMAPy (see Network.loadEdgeWeights) are read locally."""
+        value = self._parent._travelTimes.get(self.id, time)  # type: ignore
+        if value is None:
+            return self._connection.edge.getAdaptedTraveltime(self.id, time)  # type: ignore
+        return value
 
     def setAdaptedTravelTime(
         self, beginTime: float, endTime: float, travelTime: float
     ) -> None:
-        traci.edge.adaptTraveltime(self.id, beginTime, endTime, travelTime)
+        self._connection.edge.adaptTraveltime(
+            self.id, travelTime, begin=beginTime, end=endTime
+        )
+        self._parent._travelTimes.set(self.id, beginTime, endTime, travelTime)  # type: ignore
+        self._weightsChanged()
 
     def getEffort(self, time: float) -> float:
         """Returns the edge effort for the given time as stored in the global container.
-        If no such value exists, -1 is returned."""
-        return traci.edge.getEffort(self.id, time)
+        If no such value exists, -1 is returned.
+        Values set through TraSMAPy (see Network.loadEdgeWeights) are read locally."""
+        value = self._parent._efforts.get(self.id, time)  # type: ignore
+        if value is None:
+            return self._connection.edge.getEffort(self.id, time)  # type: ignore
+        return value
 
     def setEffort(self, beginTime: float, endTime: float, travelTime: float) -> None:
         """Inserts the information about the effort of the named edge valid from begin
         time to end time into the global edge weights container."""
-        traci.edge.setEffort(self.id, beginTime, endTime, travelTime)
+        self._connection.edge.setEffort(self.id, travelTime, begin=beginTime, end=endTime)
+        self._parent._efforts.set(self.id, beginTime, endTime, travelTime)  # type: ignore
+        self._weightsChanged()
 
     def setMaxSpeed(self, maxSpeed: float) -> None:
         """Sets the maximum speed for the vehicles in this edge (for all lanes) to the given value."""
         if isinstance(maxSpeed, float) or isinstance(maxSpeed, int):
-            traci.edge.setMaxSpeed(self.id, maxSpeed)
+            self._connection.edge.setMaxSpeed(self.id, maxSpeed)
+            for lane in self._lanes.values():
+                lane._setCached("maxSpeed", maxSpeed)
+            self._weightsChanged()
         else:
             raise ValueError("maxSpeed needs to be a number (int/float data type).")
 
@@ -0,0 +1,84 @@
+from bisect import bisect_right
+from typing import Iterator, Union
+
+
+class EdgeWeights:
+    """Local copy of time-dependent edge weights (adapted travel times or efforts), as given to SUMO.
+    Each edge holds sorted, non-overlapping [begin, end[ intervals. Like in SUMO, setting an interval
+    overrides the overlapping parts of the existing ones."""
+
+    def __init__(self) -> None:
+        # edgeId -> (begins, ends, values), sorted by begin
+        self._intervals: dict[str, tuple[list[float], list[float], list[float]]] = {}
+
+    def __len__(self) -> int:
+        """The number of intervals."""
+        return sum(len(begins) for begins, _, _ in self._intervals.values())
+
+    def get(self, edgeId: str, time: float) -> Union[float, None]:
+        """The value of the edge at the given time (None if there isn't one)."""
+        try:
+            begins, ends, values = self._intervals[edgeId]
+        except KeyError:
+            return None
+        i = bisect_right(begins, time) - 1
+        if i >= 0 and time < ends[i]:
+            return values[i]
+        return None
+
+    def set(self, edgeId: str, begin: float, end: float, value: float) -> None:
+        try:
+            begins, ends, values = self._intervals[edgeId]
+        except KeyError:
+            begins, ends, values = self._intervals[edgeId] = ([], [], [])
+        if end <= begin:
+            return
+        # fast path: the intervals are usually loaded in order
+        if len(begins) == 0 or begin >= ends[-1]:
+            begins.append(begin)
+            ends.append(end)
+            values.append(value)
+            return
+
+        # keep the parts of the overlapping intervals that are outside [begin, end[
+        first = max(bisect_right(begins, begin) - 1, 0)
+        last = bisect_right(begins, end)
+        kept: list[tuple[float, float, float]] = []
+        for i in range(first, last):
+            if ends[i] <= begin or begins[i] >= end:
+                kept.append((begins[i], ends[i], values[i]))
+                continue
+            if begins[i] < begin:
+                kept.append((begins[i], begin, values[i]))
+            if ends[i] > end:
+                kept.append((end, ends[i], values[i]))
+        kept.append((begin, end, value))
+        kept.sort()
+        begins[first:last] = [interval[0] for interval in kept]
+        ends[first:last] = [interval[1] for interval in kept]
+        values[first:last] = [interval[2] for interval in kept]
+
+    def edgeIds(self) -> list[str]:
+        return list(self._intervals.keys())
+
+    def intervals(
+        self, edgeId: str, merged: bool = False
+    ) -> Iterator[tuple[float, float, float]]:
+        """The (begin, end, value) intervals of the edge, in order.
+        If merged, adjacent intervals with the same value are merged into one."""
+        try:
+            begins, ends, values = self._intervals[edgeId]
+        except KeyError:
+            return
+        current: Union[list[float], None] = None
+        for interval in zip(begins, ends, values):
+            if not merged:
+                yield interval
+            elif current is not None and current[1] == interval[0] and current[2] == interval[2]:
+                current[1] = interval[1]
+            else:
+                if current is not None:
+                    yield (current[0], current[1], current[2])
+                current = list(interval)
+        if current is not None:
+            yield (current[0], current[1], current[2])
@@ -0,0 +1,87 @@
+from abc import abstractmethod
+from typing import Any, Callable
+from typing_extensions import override
+
+from traci.constants import LAST_STEP_VEHICLE_ID_LIST
+
+from trasmapy._SimUpdatable import SimUpdatable
+from trasmapy._IdentifiedObject import IdentifiedObject
+from trasmapy._SubscriptionCache import SubscriptionCache
+
+
+class IntervalDetector(IdentifiedObject, SimUpdatable):
+    """Base of the detectors whose readings are aggregated over intervals of simulation steps
+    for their listeners (see listen). The readings are read from a per-step bulk subscription
+    (shared by all listened detectors of the same kind) and aggregated incrementally."""
+
+    subscribableAttributes: dict[str, int] = {}
+
+    def __init__(
+        self, detectorId: str, connection, domain, subscriptionCache: SubscriptionCache
+    ) -> None:
+        super().__init__(detectorId)
+        self._connection = connection
+        # the TraCI domain of the detector (e.g., lanearea)
+        self._domain = domain
+        self._cache = subscriptionCache
+        # interval (steps) -> listeners and the accumulator of the current interval
+        self._listeners: dict[int, list[Callable[[Any], Any]]] = {}
+        self._accumulators: dict[int, Any] = {}
+        # the vehicles on the detector on the last step (to find the ones that entered/left it)
+        self._present: set[str] = set()
+
+    @property
+    def vehicleIds(self) -> list[str]:
+        """Returns the IDs of the vehicles on the detector in the last simulation step."""
+        return list(
+            self._read(LAST_STEP_VEHICLE_ID_LIST, self._domain.getLastStepVehicleIDs)
+        )
+
+    def listen(self, listener: Callable[[Any], Any], interval: int = 1) -> None:
+        """Hooks into the detector. Every given number of simulation steps, the listener is called with the
+        readings of the detector aggregated over them. The intervals are aligned to the step count (an
+        interval ends on the steps multiple of its length), so the first one may be shorter.
+        Raises ValueError if the interval isn't positive."""
+        if interval < 1:
+            raise ValueError(f"The interval must be positive: [interval={interval}].")
+        if len(self._listeners) == 0:
+            self._cache.subscribe([self.id], self.subscribableAttributes.values())
+            # the vehicles already there didn't enter during the intervals
+            self._present = set(self.vehicleIds)
+        if interval not in self._listeners:
+            self._listeners[interval] = []
+            self._accumulators[interval] = self._newAccumulator(
+                self._connection.simulation.getTime()
+            )
+        self._listeners[interval].append(listener)
+
+    @abstractmethod
+    def _newAccumulator(self, begin: float) -> Any:
+        """Returns an accumulator for an interval that begins at the given time."""
+        pass
+
+    @abstractmethod
+    def _sample(self, vehicleIds: set[str], time: float) -> tuple:
+        """The readings of the last step to add to the accumulators."""
+        pass
+
+    def _read(self, variable: int, fallback: Callable[[str], Any]) -> Any:
+        return self._cache.get(self.id, variable, fallback)
+
+    @override
+    def _doSimulationStep(self, *args, step: int, time: float) -> None:
+        if len(self._listeners) == 0:
+            return
+        vehicleIds = set(
+            self._read(LAST_STEP_VEHICLE_ID_LIST, self._domain.getLastStepVehicleIDs)
+        )
+        sample = self._sample(vehicleIds, time)
+        self._present = vehicleIds
+
+        for (interval, accumulator) in self._accumulators.items():
+            accumulator.add(*sample)
+            if step % interval == 0:
+                readings = accumulator.emit(self.id, time)
+                self._accumulators[interval] = self._newAccumulator(time)
+                for listener in self._listeners[interval]:
+                    listener(readings)
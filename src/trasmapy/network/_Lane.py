@@ -1,13 +1,65 @@
-import traci
+from traci.constants import (
+    VAR_CO2EMISSION,
+    VAR_COEMISSION,
+    VAR_HCEMISSION,
+    VAR_PMXEMISSION,
+    VAR_NOXEMISSION,
+    VAR_FUELCONSUMPTION,
+    VAR_NOISEEMISSION,
+    VAR_ELECTRICITYCONSUMPTION,
+    LAST_STEP_VEHICLE_NUMBER,
+    LAST_STEP_MEAN_SPEED,
+    LAST_STEP_VEHICLE_ID_LIST,
+    LAST_STEP_OCCUPANCY,
+    LAST_STEP_LENGTH,
+    VAR_WAITING_TIME,
+    VAR_CURRENT_TRAVELTIME,
+    LAST_STEP_VEHICLE_HALTING_NUMBER,
+)
+
+from typing import Union
 
 from trasmapy._IdentifiedObject import IdentifiedObject
+from trasmapy._CachedAttributes import CachedAttributes
+from trasmapy._SubscriptionCache import SubscriptionCache
 from trasmapy.network._Stop import Stop
 from trasmapy.users.VehicleClass import VehicleClass
 
 
-class Lane(IdentifiedObject):
-    def __init__(self, laneId: str, stopList: list[Stop]) -> None:
-        super().__init__(laneId)
+class Lane(IdentifiedObject, CachedAttributes):
+    subscribableAttributes: dict[str, int] = {
+        "CO2Emissions": VAR_CO2EMISSION,
+        "COEmissions": VAR_COEMISSION,
+        "HCEmissions": VAR_HCEMISSION,
+        "PMxEmissions": VAR_PMXEMISSION,
+        "NOxEmissions": VAR_NOXEMISSION,
+        "fuelConsumption": VAR_FUELCONSUMPTION,
+        "noiseEmissions": VAR_NOISEEMISSION,
+        "electricityConsumption": VAR_ELECTRICITYCONSUMPTION,
+        "vehicleCount": LAST_STEP_VEHICLE_NUMBER,
+        "vehicleMeanSpeed": LAST_STEP_MEAN_SPEED,
+        "vehicleIds": LAST_STEP_VEHICLE_ID_LIST,
+        "occupancy": LAST_STEP_OCCUPANCY,
+        "vehicleMeanLength": LAST_STEP_LENGTH,
+        "vehicleWaitingTime": VAR_WAITING_TIME,
+        "travelTime": VAR_CURRENT_TRAVELTIME,
+        "vehicleHaltCount": LAST_STEP_VEHICLE_HALTING_NUMBER,
+    }
+    """The attributes that can be served from a per-step subscription (see Network.subscribeLaneAttributes)."""
+
+    def __init__(
+        self,
+        laneId: str,
+        stopList: list[Stop],
+        connection,
+        cache: SubscriptionCache,
+        staticAttributes: Union[dict[str, float], None] = None,
+    ) -> None:
+        IdentifiedObject.__init__(self, laneId)
+        # static attributes (seeded with the ones loaded by the network index)
+        CachedAttributes.__init__(self, staticAttributes)
+        self._connection = connection
+        self._cache = cache
         self._stops: dict[str, Stop] = {}
         for stop in stopList:
             stop._setParent(self)
@@ -27,117 +79,120 @@ class Lane(IdentifiedObject):
     @property
     def linkCount(self) -> int:
         """Returns the number of links outgoing from this lane."""
-        return traci.lane.getLinkNumber(self.id)  # type: ignore
+        return self._getCached("linkCount", self._connection.lane.getLinkNumber)
 
     @property
     def length(self) -> float:
         """Returns the length of the named lane (m)."""
-        return traci.lane.getLength(self.id)  # type: ignore
+        return self._getCached("length", self._connection.lane.getLength)
 
     @length.setter
     def length(self, newLen: float) -> None:
         """Sets the the lane's length."""
         if isinstance(newLen, float) or isinstance(newLen, int):
-            traci.lane.setLength(self.id, newLen)
+            self._connection.lane.setLength(self.id, newLen)
+            self._setCached("length", newLen)
         else:
             raise ValueError("Length needs to be a number (int/float data type).")
 
     @property
     def width(self) -> float:
         """Returns the width of the named lane (m)."""
-        return traci.lane.getWidth(self.id)  # type: ignore
+        return self._getCached("width", self._connection.lane.getWidth)
 
     @property
     def CO2Emissions(self) -> float:
         """Sum of CO2 emissions on this lane in mg during this time step (mg)."""
-        return traci.lane.getCO2Emission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_CO2EMISSION, self._connection.lane.getCO2Emission)  # type: ignore
 
     @property
     def COEmissions(self) -> float:
         """Sum of CO emissions on this lane in mg during this time step (mg)."""
-        return traci.lane.getCOEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_COEMISSION, self._connection.lane.getCOEmission)  # type: ignore
 
     @property
     def HCEmissions(self) -> float:
         """Sum of HC emissions on this lane in mg during this time step (mg)."""
-        return traci.lane.getHCEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_HCEMISSION, self._connection.lane.getHCEmission)  # type: ignore
 
     @property
     def PMxEmissions(self) -> float:
         """Sum of PMx emissions on this lane in mg during this time step (mg)."""
-        return traci.lane.getPMxEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_PMXEMISSION, self._connection.lane.getPMxEmission)  # type: ignore
 
     @property
     def NOxEmissions(self) -> float:
         """Sum of NOx emissions on this lane in mg during this time step (mg)."""
-        return traci.lane.getNOxEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_NOXEMISSION, self._connection.lane.getNOxEmission)  # type: ignore
 
     @property
     def fuelConsumption(self) -> float:
         """Sum of fuel consumption on this lane in ml during this time step (ml)."""
-        return traci.lane.getFuelConsumption(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_FUELCONSUMPTION, self._connection.lane.getFuelConsumption)  # type: ignore
 
     @property
     def noiseEmissions(self) -> float:
         """Sum of noise generated on this lane (dBA)."""
-        return traci.lane.getNoiseEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_NOISEEMISSION, self._connection.lane.getNoiseEmission)  # type: ignore
 
     @property
     def electricityConsumption(self) -> float:
         """Sum of electricity consumption on this edge during this time step (kWh)."""
-        return traci.lane.getElectricityConsumption(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_ELECTRICITYCONSUMPTION, self._connection.lane.getElectricityConsumption)  # type: ignore
 
     @property
     def vehicleCount(self) -> int:
         """The number of vehicles on this lane within the last time step."""
-        return traci.lane.getLastStepVehicleNumber(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_VEHICLE_NUMBER, self._connection.lane.getLastStepVehicleNumber)  # type: ignore
 
     @property
     def vehicleMeanSpeed(self) -> float:
         """Returns the mean speed of vehicles that were on this lane within the last simulation step (m/s)"""
-        return traci.lane.getLastStepMeanSpeed(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_MEAN_SPEED, self._connection.lane.getLastStepMeanSpeed)  # type: ignore
 
     @property
     def vehicleIds(self) -> list[str]:
         """Returns the list of ids of vehicles that were on this lane in the last simulation step."""
-        return traci.lane.getLastStepVehicleIDs(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_VEHICLE_ID_LIST, self._connection.lane.getLastStepVehicleIDs)  # type: ignore
 
     @property
     def occupancy(self) -> float:
         """Returns the total lengths of vehicles on this lane during the last simulation step divided by the length of this lane (%)."""
-        return traci.lane.getLastStepOccupancy(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_OCCUPANCY, self._connection.lane.getLastStepOccupancy)  # type: ignore
 
     @property
     def vehicleMeanLength(self) -> float:
         """Returns the mean length of the vehicles which were on this lane in the last step (m)."""
-        return traci.lane.getLastStepLength(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_LENGTH, self._connection.lane.getLastStepLength)  # type: ignore
 
     @property
     def vehicleWaitingTime(self) -> float:
         """Returns the sum of the waiting times for all vehicles on the lane (s)."""
-        return traci.lane.getWaitingTime(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_WAITING_TIME, self._connection.lane.getWaitingTime)  # type: ignore
 
     @property
     def travelTime(self) -> float:
         """Returns the estimated travel time for the last time step on the given lane (s)."""
-        return traci.lane.getTraveltime(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_CURRENT_TRAVELTIME, self._connection.lane.getTraveltime)  # type: ignore
 
     @property
     def vehicleHaltCount(self) -> int:
         """Returns the total number of halting vehicles for the last time step on the given lane.
         A speed of less than 0.1 m/s is considered a halt."""
-        return traci.lane.getLastStepHaltingNumber(self.id)  # type: ignore
+        return self._cache.get(self.id, LAST_STEP_VEHICLE_HALTING_NUMBER, self._connection.lane.getLastStepHaltingNumber)  # type: ignore
 
     @property
     def maxSpeed(self) -> float:
         """Returns the maximum speed allowed on this lane (m/s)."""
-        return traci.lane.getMaxSpeed(self.id)  # type: ignore
+        return self._getCached("maxSpeed", self._connection.lane.getMaxSpeed)
 
     @maxSpeed.setter
     def maxSpeed(self, newVal):
         """Sets the maximum speed for the vehicles in this lane."""
         if isinstance(newVal, float) or isinstance(newVal, int):
-            traci.lane.setMaxSpeed(self.id, newVal)
+            self._connection.lane.setMaxSpeed(self.id, newVal)
+            self._setCached("maxSpeed", newVal)
+            self._parent._weightsChanged()
         else:
             raise ValueError("maxSpeed needs to be a number (int/float data type).")
 
@@ -149,19 +204,34 @@ class Lane(IdentifiedObject):
 
     def allowedVehicles(self) -> list[VehicleClass]:
         """List of allowed vehicle classes on this lane."""
-        return list(map(lambda x: VehicleClass(x), traci.lane.getAllowed(self.id)))
+        return list(
+            map(
+                lambda x: VehicleClass(x),
+                self._getCached("allowed", self._connection.lane.getAllowed),
+            )
+        )
 
     def disallowedVehicles(self) -> list[VehicleClass]:
         """List of disallowed vehicle classes on this lane."""
-        return list(map(lambda x: VehicleClass(x), traci.lane.getDisallowed(self.id)))
+        return list(
+            map(
+                lambda x: VehicleClass(x),
+                self._getCached("disallowed", self._connection.lane.getDisallowed),
+            )
+        )
 
     def _setAllowed(self, allowedVehicleClasses: list[str]) -> None:
         """Set the classes of vehicles allowed to move on this lane."""
-        traci.lane.setAllowed(self.id, allowedVehicleClasses)
+        self._connection.lane.setAllowed(self.id, allowedVehicleClasses)
+        # SUMO derives the disallowed classes from the allowed ones (and "all" is expanded)
+        self._invalidateCached("allowed", "disallowed")
+        self._parent._weightsChanged()
 
     def _setDisallowed(self, disallowedVehicleClasses: list[str]) -> None:
         """Set the classes of vehicles disallowed to move on this lane."""
-        traci.lane.setDisallowed(self.id, disallowedVehicleClasses)
+        self._connection.lane.setDisallowed(self.id, disallowedVehicleClasses)
+        self._invalidateCached("allowed", "disallowed")
+        self._parent._weightsChanged()
 
     def setAllowed(self, allowedVehicleClasses: list[VehicleClass]) -> None:
         """Set the classes of vehicles allowed to move on this lane."""
@@ -0,0 +1,152 @@
+from traci.constants import (
+    LAST_STEP_VEHICLE_NUMBER,
+    LAST_STEP_MEAN_SPEED,
+    LAST_STEP_VEHICLE_ID_LIST,
+    LAST_STEP_OCCUPANCY,
+    LAST_STEP_VEHICLE_HALTING_NUMBER,
+    JAM_LENGTH_METERS,
+)
+
+from typing_extensions import override
+
+from trasmapy._SubscriptionCache import SubscriptionCache
+from trasmapy.network._IntervalDetector import IntervalDetector
+from trasmapy.network._LaneAreaInterval import LaneAreaInterval
+
+
+class _Accumulator:
+    __slots__ = (
+        "begin",
+        "steps",
+        "vehicleCount",
+        "occupancy",
+        "jamLength",
+        "maxJamLength",
+        "haltCount",
+        "speed",
+        "vehicleSteps",
+    )
+
+    def __init__(self, begin: float) -> None:
+        self.begin = begin
+        self.steps = 0
+        self.vehicleCount = 0
+        # running sums over the steps of the interval
+        self.occupancy = 0.0
+        self.jamLength = 0.0
+        self.maxJamLength = 0.0
+        self.haltCount = 0
+        # the sum of the speeds of the vehicles (mean speed * vehicles) and of the vehicles
+        self.speed = 0.0
+        self.vehicleSteps = 0
+
+    def add(
+        self,
+        entered: int,
+        occupancy: float,
+        jamLength: float,
+        haltCount: int,
+        vehicles: int,
+        meanSpeed: float,
+    ) -> None:
+        self.steps += 1
+        self.vehicleCount += entered
+        self.occupancy += occupancy
+        self.jamLength += jamLength
+        self.maxJamLength = max(self.maxJamLength, jamLength)
+        self.haltCount += haltCount
+        if vehicles > 0:
+            self.speed += meanSpeed * vehicles
+            self.vehicleSteps += vehicles
+
+    def emit(self, detectorId: str, end: float) -> LaneAreaInterval:
+        """Returns the readings of the interval, which ended at the given time."""
+        steps = max(self.steps, 1)
+        return LaneAreaInterval(
+            detectorId,
+            self.begin,
+            end,
+            self.vehicleCount,
+            self.occupancy / steps,
+            self.jamLength / steps,
+            self.maxJamLength,
+            self.haltCount / steps,
+            self.speed / self.vehicleSteps if self.vehicleSteps > 0 else -1.0,
+        )
+
+
+class LaneAreaDetector(IntervalDetector):
+    subscribableAttributes: dict[str, int] = {
+        "vehicleCount": LAST_STEP_VEHICLE_NUMBER,
+        "vehicleMeanSpeed": LAST_STEP_MEAN_SPEED,
+        "vehicleIds": LAST_STEP_VEHICLE_ID_LIST,
+        "occupancy": LAST_STEP_OCCUPANCY,
+        "vehicleHaltCount": LAST_STEP_VEHICLE_HALTING_NUMBER,
+        "jamLength": JAM_LENGTH_METERS,
+    }
+    """The attributes served from the per-step subscription of the listened detectors."""
+
+    def __init__(
+        self, detectorId: str, connection, subscriptionCache: SubscriptionCache
+    ) -> None:
+        """A lane area detector (E2), which covers a stretch of one or more consecutive lanes.
+        Listeners get LaneAreaInterval readings (see IntervalDetector.listen)."""
+        super().__init__(detectorId, connection, connection.lanearea, subscriptionCache)
+
+    @property
+    def laneId(self) -> str:
+        """Returns the ID of the lane where the detector starts."""
+        return self._domain.getLaneID(self.id)  # type: ignore
+
+    @property
+    def position(self) -> float:
+        """Returns the starting position of the detector on its lane."""
+        return self._domain.getPosition(self.id)  # type: ignore
+
+    @property
+    def length(self) -> float:
+        """Returns the length of the detector (m)."""
+        return self._domain.getLength(self.id)  # type: ignore
+
+    @property
+    def vehicleCount(self) -> int:
+        """Returns the number of vehicles on the detector in the last simulation step."""
+        return self._read(LAST_STEP_VEHICLE_NUMBER, self._domain.getLastStepVehicleNumber)
+
+    @property
+    def vehicleMeanSpeed(self) -> float:
+        """Returns the mean speed of the vehicles on the detector in the last simulation step (m/s).
+        If there are no vehicles, -1 is returned."""
+        return self._read(LAST_STEP_MEAN_SPEED, self._domain.getLastStepMeanSpeed)
+
+    @property
+    def occupancy(self) -> float:
+        """Returns the percentage of the detector's length occupied by vehicles in the last simulation step (%)."""
+        return self._read(LAST_STEP_OCCUPANCY, self._domain.getLastStepOccupancy)
+
+    @property
+    def vehicleHaltCount(self) -> int:
+        """Returns the number of halting vehicles on the detector in the last simulation step."""
+        return self._read(
+            LAST_STEP_VEHICLE_HALTING_NUMBER, self._domain.getLastStepHaltingNumber
+        )
+
+    @property
+    def jamLength(self) -> float:
+        """Returns the length of the jams on the detector in the last simulation step (m)."""
+        return self._read(JAM_LENGTH_METERS, self._domain.getJamLengthMeters)
+
+    @override
+    def _newAccumulator(self, begin: float) -> _Accumulator:
+        return _Accumulator(begin)
+
+    @override
+    def _sample(self, vehicleIds: set[str], time: float) -> tuple:
+        return (
+            len(vehicleIds - self._present),
+            self.occupancy,
+            self.jamLength,
+            self.vehicleHaltCount,
+            len(vehicleIds),
+            self.vehicleMeanSpeed,
+        )
@@ -0,0 +1,83 @@
+class LaneAreaInterval:
+    """The readings of a lane area detector (E2) aggregated over an interval of simulation steps
+    (see LaneAreaDetector.listen)."""
+
+    def __init__(
+        self,
+        detectorId: str,
+        begin: float,
+        end: float,
+        vehicleCount: int,
+        meanOccupancy: float,
+        meanJamLength: float,
+        maxJamLength: float,
+        meanHaltCount: float,
+        meanSpeed: float,
+    ) -> None:
+        self._detectorId = detectorId
+        self._begin = begin
+        self._end = end
+        self._vehicleCount = vehicleCount
+        self._meanOccupancy = meanOccupancy
+        self._meanJamLength = meanJamLength
+        self._maxJamLength = maxJamLength
+        self._meanHaltCount = meanHaltCount
+        self._meanSpeed = meanSpeed
+
+    @property
+    def detectorId(self) -> str:
+        return self._detectorId
+
+    @property
+    def begin(self) -> float:
+        """The simulation time when the interval began (s)."""
+        return self._begin
+
+    @property
+    def end(self) -> float:
+        """The simulation time when the interval ended (s)."""
+        return self._end
+
+    @property
+    def vehicleCount(self) -> int:
+        """The number of vehicles that entered the detector during the interval."""
+        return self._vehicleCount
+
+    @property
+    def flow(self) -> float:
+        """The number of vehicles that entered the detector per hour (veh/h)."""
+        duration = self._end - self._begin
+        return self._vehicleCount * 3600 / duration if duration > 0 else 0.0
+
+    @property
+    def meanOccupancy(self) -> float:
+        """The mean percentage of the detector's length occupied by vehicles (%)."""
+        return self._meanOccupancy
+
+    @property
+    def meanJamLength(self) -> float:
+        """The mean length of the jams on the detector (m)."""
+        return self._meanJamLength
+
+    @property
+    def maxJamLength(self) -> float:
+        """The length of the longest jam on the detector (m)."""
+        return self._maxJamLength
+
+    @property
+    def meanHaltCount(self) -> float:
+        """The mean number of halting vehicles on the detector."""
+        return self._meanHaltCount
+
+    @property
+    def meanSpeed(self) -> float:
+        """The mean speed of the vehicles on the detector, weighted by the vehicles on each step (m/s).
+        If there were no vehicles, -1 is returned."""
+        return self._meanSpeed
+
+    def __repr__(self) -> str:
+        return (
+            f"LaneAreaInterval(detectorId={self._detectorId}, begin={self._begin}, end={self._end}, "
+            f"vehicleCount={self._vehicleCount}, meanOccupancy={self._meanOccupancy}, "
+            f"maxJamLength={self._maxJamLength})"
+        )
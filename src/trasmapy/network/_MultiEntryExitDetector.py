@@ -0,0 +1,154 @@
+from traci.constants import (
+    LAST_STEP_VEHICLE_NUMBER,
+    LAST_STEP_MEAN_SPEED,
+    LAST_STEP_VEHICLE_ID_LIST,
+    LAST_STEP_VEHICLE_HALTING_NUMBER,
+    VAR_ARRIVED_VEHICLES_IDS,
+    VAR_TELEPORT_STARTING_VEHICLES_IDS,
+)
+
+from typing_extensions import override
+
+from trasmapy._SubscriptionCache import SubscriptionCache
+from trasmapy.network._IntervalDetector import IntervalDetector
+from trasmapy.network._MultiEntryExitInterval import MultiEntryExitInterval
+
+
+class _Accumulator:
+    __slots__ = (
+        "begin",
+        "steps",
+        "vehicleCount",
+        "travelTime",
+        "travelTimeCount",
+        "vehicles",
+        "haltCount",
+        "speed",
+    )
+
+    def __init__(self, begin: float) -> None:
+        self.begin = begin
+        self.steps = 0
+        self.vehicleCount = 0
+        # the sum of the (known) travel times and their number
+        self.travelTime = 0.0
+        self.travelTimeCount = 0
+        # running sums over the steps of the interval
+        self.vehicles = 0
+        self.haltCount = 0
+        # the sum of the speeds of the vehicles (mean speed * vehicles)
+        self.speed = 0.0
+
+    def add(
+        self,
+        exited: int,
+        travelTimes: list[float],
+        vehicles: int,
+        haltCount: int,
+        meanSpeed: float,
+    ) -> None:
+        self.steps += 1
+        self.vehicleCount += exited
+        self.travelTime += sum(travelTimes)
+        self.travelTimeCount += len(travelTimes)
+        self.vehicles += vehicles
+        self.haltCount += haltCount
+        if vehicles > 0:
+            self.speed += meanSpeed * vehicles
+
+    def emit(self, detectorId: str, end: float) -> MultiEntryExitInterval:
+        """Returns the readings of the interval, which ended at the given time."""
+        steps = max(self.steps, 1)
+        return MultiEntryExitInterval(
+            detectorId,
+            self.begin,
+            end,
+            self.vehicleCount,
+            self.travelTime / self.travelTimeCount if self.travelTimeCount > 0 else -1.0,
+            self.vehicles / steps,
+            self.haltCount / steps,
+            self.speed / self.vehicles if self.vehicles > 0 else -1.0,
+        )
+
+
+class MultiEntryExitDetector(IntervalDetector):
+    subscribableAttributes: dict[str, int] = {
+        "vehicleCount": LAST_STEP_VEHICLE_NUMBER,
+        "vehicleMeanSpeed": LAST_STEP_MEAN_SPEED,
+        "vehicleIds": LAST_STEP_VEHICLE_ID_LIST,
+        "vehicleHaltCount": LAST_STEP_VEHICLE_HALTING_NUMBER,
+    }
+    """The attributes served from the per-step subscription of the listened detectors."""
+
+    def __init__(
+        self, detectorId: str, connection, subscriptionCache: SubscriptionCache
+    ) -> None:
+        """A multi-entry/exit detector (E3), which covers the area between its entries and exits.
+        Listeners get MultiEntryExitInterval readings (see IntervalDetector.listen)."""
+        super().__init__(
+            detectorId, connection, connection.multientryexit, subscriptionCache
+        )
+        # vehicle ID -> the simulation time when it entered (while inside)
+        self._entryTimes: dict[str, float] = {}
+
+    @property
+    def entryLaneIds(self) -> list[str]:
+        """Returns the IDs of the lanes of the entries of the detector."""
+        return list(self._domain.getEntryLanes(self.id))  # type: ignore
+
+    @property
+    def exitLaneIds(self) -> list[str]:
+        """Returns the IDs of the lanes of the exits of the detector."""
+        return list(self._domain.getExitLanes(self.id))  # type: ignore
+
+    @property
+    def vehicleCount(self) -> int:
+        """Returns the number of vehicles inside the detector in the last simulation step."""
+        return self._read(LAST_STEP_VEHICLE_NUMBER, self._domain.getLastStepVehicleNumber)
+
+    @property
+    def vehicleMeanSpeed(self) -> float:
+        """Returns the mean speed of the vehicles inside the detector in the last simulation step (m/s).
+        If there are no vehicles, -1 is returned."""
+        return self._read(LAST_STEP_MEAN_SPEED, self._domain.getLastStepMeanSpeed)
+
+    @property
+    def vehicleHaltCount(self) -> int:
+        """Returns the number of halting vehicles inside the detector in the last simulation step."""
+        return self._read(
+            LAST_STEP_VEHICLE_HALTING_NUMBER, self._domain.getLastStepHaltingNumber
+        )
+
+    @override
+    def _newAccumulator(self, begin: float) -> _Accumulator:
+        return _Accumulator(begin)
+
+    @override
+    def _sample(self, vehicleIds: set[str], time: float) -> tuple:
+        for vehicleId in vehicleIds - self._present:
+            self._entryTimes[vehicleId] = time
+
+        left = self._present - vehicleIds
+        exited = 0
+        travelTimes: list[float] = []
+        if len(left) > 0:
+            # the vehicles that left the simulation (or started teleporting) inside didn't exit
+            # (the events are subscribed by Users, so this doesn't need a TraCI call)
+            events = self._connection.simulation.getSubscriptionResults()
+            removed = set(events.get(VAR_ARRIVED_VEHICLES_IDS, ()))
+            removed.update(events.get(VAR_TELEPORT_STARTING_VEHICLES_IDS, ()))
+            for vehicleId in left:
+                entryTime = self._entryTimes.pop(vehicleId, None)
+                if vehicleId in removed:
+                    continue
+                exited += 1
+                if entryTime is not None:
+                    travelTimes.append(time - entryTime)
+
+        return (
+            exited,
+            travelTimes,
+            len(vehicleIds),
+            self.vehicleHaltCount,
+            self.vehicleMeanSpeed,
+        )
@@ -0,0 +1,77 @@
+class MultiEntryExitInterval:
+    """The readings of a multi-entry/exit detector (E3) aggregated over an interval of simulation steps
+    (see MultiEntryExitDetector.listen)."""
+
+    def __init__(
+        self,
+        detectorId: str,
+        begin: float,
+        end: float,
+        vehicleCount: int,
+        meanTravelTime: float,
+        meanVehicleCount: float,
+        meanHaltCount: float,
+        meanSpeed: float,
+    ) -> None:
+        self._detectorId = detectorId
+        self._begin = begin
+        self._end = end
+        self._vehicleCount = vehicleCount
+        self._meanTravelTime = meanTravelTime
+        self._meanVehicleCount = meanVehicleCount
+        self._meanHaltCount = meanHaltCount
+        self._meanSpeed = meanSpeed
+
+    @property
+    def detectorId(self) -> str:
+        return self._detectorId
+
+    @property
+    def begin(self) -> float:
+        """The simulation time when the interval began (s)."""
+        return self._begin
+
+    @property
+    def end(self) -> float:
+        """The simulation time when the interval ended (s)."""
+        return self._end
+
+    @property
+    def vehicleCount(self) -> int:
+        """The number of vehicles that left the detector (through an exit) during the interval."""
+        return self._vehicleCount
+
+    @property
+    def flow(self) -> float:
+        """The number of vehicles that left the detector per hour (veh/h)."""
+        duration = self._end - self._begin
+        return self._vehicleCount * 3600 / duration if duration > 0 else 0.0
+
+    @property
+    def meanTravelTime(self) -> float:
+        """The mean time the vehicles that left the detector took from an entry to an exit (s).
+        Vehicles that were already inside when the detector started being listened aren't considered.
+        If there are no such vehicles, -1 is returned."""
+        return self._meanTravelTime
+
+    @property
+    def meanVehicleCount(self) -> float:
+        """The mean number of vehicles inside the detector."""
+        return self._meanVehicleCount
+
+    @property
+    def meanHaltCount(self) -> float:
+        """The mean number of halting vehicles inside the detector."""
+        return self._meanHaltCount
+
+    @property
+    def meanSpeed(self) -> float:
+        """The mean speed of the vehicles inside the detector, weighted by the vehicles on each step (m/s).
+        If there were no vehicles, -1 is returned."""
+        return self._meanSpeed
+
+    def __repr__(self) -> str:
+        return (
+            f"MultiEntryExitInterval(detectorId={self._detectorId}, begin={self._begin}, end={self._end}, "
+            f"vehicleCount={self._vehicleCount}, meanTravelTime={self._meanTravelTime})"
+        )
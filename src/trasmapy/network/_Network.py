@@ -1,71 +1,133 @@
+import csv
+from math import isnan
 from sys import stderr
+from typing import Union
 from typing_extensions import override
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
 
-import traci
 from traci.constants import INVALID_DOUBLE_VALUE
 
 
 from trasmapy._SimUpdatable import SimUpdatable
+from trasmapy._SubscriptionCache import SubscriptionCache
+from trasmapy._Frame import Frame
 from trasmapy.network._Edge import Edge
 from trasmapy.network._Lane import Lane
 from trasmapy.network._Stop import Stop
 from trasmapy.network._Detector import Detector
+from trasmapy.network._LaneAreaDetector import LaneAreaDetector
+from trasmapy.network._MultiEntryExitDetector import MultiEntryExitDetector
 from trasmapy.network._BusStop import BusStop
 from trasmapy.network._ChargingStation import ChargingStation
 from trasmapy.network._ParkingArea import ParkingArea
 from trasmapy.network._LaneStop import LaneStop
+from trasmapy.network._Router import Router
+from trasmapy.network._EdgeWeights import EdgeWeights
+from trasmapy.network._NetworkIndex import (
+    NetworkIndex,
+    _open,
+    _iterparse,
+    BUS_STOP,
+    CHARGING_STATION,
+    PARKING_AREA,
+)
 
 
 class Network(SimUpdatable):
-    def __init__(self) -> None:
+    _stopClasses: dict = {
+        BUS_STOP: BusStop,
+        CHARGING_STATION: ChargingStation,
+        PARKING_AREA: ParkingArea,
+    }
+
+    def __init__(
+        self, connection, networkIndex: Union[NetworkIndex, None] = None
+    ) -> None:
+        """The network structure is taken from the given index (e.g., streamed from the net file).
+        If there's no index, or it doesn't match the simulation, it's queried through TraCI."""
+        self._connection = connection
+
+        # per-step snapshots of the subscribed edge/lane attributes (opt-in)
+        self._edgeCache = SubscriptionCache(self._connection.edge)
+        self._laneCache = SubscriptionCache(self._connection.lane)
+        # detections/readings of the listened detectors (see Detector.listen and IntervalDetector.listen)
+        self._detectorCache = SubscriptionCache(self._connection.inductionloop)
+        self._laneAreaCache = SubscriptionCache(self._connection.lanearea)
+        self._multiEntryExitCache = SubscriptionCache(self._connection.multientryexit)
+
+        if networkIndex is None or not networkIndex.matches(self._connection):
+            networkIndex = NetworkIndex.fromConnection(self._connection)
+
         # index Stops
         self._stopsIndex: dict[str, Stop] = {}
         laneToStopMap: dict[str, list[Stop]] = {}
-        self._indexStops(laneToStopMap, BusStop, traci.busstop)
-        self._indexStops(laneToStopMap, ChargingStation, traci.chargingstation)
-        self._indexStops(laneToStopMap, ParkingArea, traci.parkingarea)
-
-        # index Lanes
-        self._lanesIndex: dict[str, Lane] = {}
-        edgeToLaneMap: dict[str, list[Lane]] = {}
-        for laneId in traci.lane.getIDList():
-            try:
-                stopList = laneToStopMap[laneId]
-            except KeyError:
-                stopList = []
-
-            parentEdgeId: str = traci.lane.getEdgeID(laneId)  # type: ignore
-            lane = Lane(laneId, stopList)
-            self._lanesIndex[laneId] = lane
+        for stopId, (kind, parentLaneId) in networkIndex.stops.items():
+            stop: Stop = self._stopClasses[kind](stopId, self._connection)
+            self._stopsIndex[stopId] = stop
             try:
-                edgeToLaneMap[parentEdgeId].append(lane)
+                laneToStopMap[parentLaneId].append(stop)
             except KeyError:
-                edgeToLaneMap[parentEdgeId] = [lane]
+                laneToStopMap[parentLaneId] = [stop]
 
-        # index edges
+        # index Lanes and edges
+        self._lanesIndex: dict[str, Lane] = {}
         self._edges: dict[str, Edge] = {}
-        for edgeId in traci.edge.getIDList():
-            try:
-                laneList = edgeToLaneMap[edgeId]
-                self._edges[edgeId] = Edge(edgeId, laneList)
-            except KeyError:
+        for edgeId, laneIds in networkIndex.edgeLanes.items():
+            if len(laneIds) == 0:
                 print(
                     f"Failed to find any lanes for edge (skipping it): [edgeId={edgeId}]",
                     file=stderr,
                 )
                 continue
 
-        self._detectors: dict[str, Detector] = {}
+            laneList: list[Lane] = []
+            for laneId in laneIds:
+                try:
+                    stopList = laneToStopMap[laneId]
+                except KeyError:
+                    stopList = []
+                lane = Lane(
+                    laneId,
+                    stopList,
+                    self._connection,
+                    self._laneCache,
+                    networkIndex.laneAttributes.get(laneId),
+                )
+                self._lanesIndex[laneId] = lane
+                laneList.append(lane)
+            edge = Edge(edgeId, laneList, self._connection, self._edgeCache)
+            edge._setParent(self)
+            self._edges[edgeId] = edge
 
-    def _indexStops(self, laneToStopMap, StopClass, traciModule):
-        for stopId in traciModule.getIDList():
-            parentLaneId: str = traciModule.getLaneID(stopId)  # type: ignore
-            stop: Stop = StopClass(stopId)
-            self._stopsIndex[stopId] = stop
-            try:
-                laneToStopMap[parentLaneId].append(stop)
-            except KeyError:
-                laneToStopMap[parentLaneId] = [stop]
+        # index Detectors (inductionloops)
+        self._detectors: dict[str, Detector] = {
+            detectorId: Detector(detectorId, self._connection, self._detectorCache)
+            for detectorId in self._connection.inductionloop.getIDList()  # type: ignore
+        }
+        self._laneAreaDetectors: dict[str, LaneAreaDetector] = {
+            detectorId: LaneAreaDetector(detectorId, self._connection, self._laneAreaCache)
+            for detectorId in self._connection.lanearea.getIDList()  # type: ignore
+        }
+        self._multiEntryExitDetectors: dict[str, MultiEntryExitDetector] = {
+            detectorId: MultiEntryExitDetector(
+                detectorId, self._connection, self._multiEntryExitCache
+            )
+            for detectorId in self._connection.multientryexit.getIDList()  # type: ignore
+        }
+        # the connectivity of the edges (see createRouter)
+        self._edgeSuccessors = networkIndex.edgeSuccessors
+        self._edgeEndpoints = networkIndex.edgeEndpoints
+        self._weightsVersion: int = 0
+        # local copies of the adapted travel times and efforts given to SUMO
+        self._travelTimes = EdgeWeights()
+        self._efforts = EdgeWeights()
+        # the (static) IDs, e.g., for snapshots
+        self._edgeIds: list[str] = list(self._edges.keys())
+        self._laneIds: list[str] = list(self._lanesIndex.keys())
+        # position of each object in the (static) indexes, built on demand (see _lookup)
+        self._positions: dict[str, dict[str, int]] = {}
 
     @property
     def edges(self) -> list[Edge]:
@@ -82,6 +144,27 @@ class Network(SimUpdatable):
         """Returns a list of all stops in the network."""
         return list(self._stopsIndex.values())
 
+    def _lookupEdges(self, edgeIds: list[str]) -> list[Edge]:
+        return self._lookup("edges", self._edges, edgeIds)
+
+    def _lookupLanes(self, laneIds: list[str]) -> list[Lane]:
+        return self._lookup("lanes", self._lanesIndex, laneIds)
+
+    def _lookupStops(self, stopIds: list[str]) -> list[Stop]:
+        return self._lookup("stops", self._stopsIndex, stopIds)
+
+    def _lookup(self, name: str, index: dict, objectIds: list[str]) -> list:
+        """Returns the objects of the index with the given IDs that exist, in the index's order."""
+        found = [index[objectId] for objectId in objectIds if objectId in index]
+        if len(found) > 1:
+            try:
+                positions = self._positions[name]
+            except KeyError:
+                positions = {objectId: i for i, objectId in enumerate(index)}
+                self._positions[name] = positions
+            found.sort(key=lambda x: positions[x.id])
+        return found
+
     def getEdge(self, edgeId: str) -> Edge:
         """Returns an object representing the edge with the given ID in the network.
         Raises KeyError if the given edge doesn't exist."""
@@ -103,11 +186,81 @@ class Network(SimUpdatable):
         try:
             return self._detectors[detectorId]
         except KeyError:
-            if detectorId in traci.inductionloop.getIDList():
-                det = Detector(detectorId)
-                self._detectors[detectorId] = det
-                return det
-        raise KeyError(f"Detector not found: [detectorId={detectorId}]")
+            raise KeyError(f"Detector not found: [detectorId={detectorId}]")
+
+    def getLaneAreaDetector(self, detectorId: str) -> LaneAreaDetector:
+        """Returns an object representing the lane area detector (E2) with the given ID in the network.
+        Raises KeyError if the given detector doesn't exist."""
+        try:
+            return self._laneAreaDetectors[detectorId]
+        except KeyError:
+            raise KeyError(f"Lane area detector not found: [detectorId={detectorId}]")
+
+    def getMultiEntryExitDetector(self, detectorId: str) -> MultiEntryExitDetector:
+        """Returns an object representing the multi-entry/exit detector (E3) with the given ID in the network.
+        Raises KeyError if the given detector doesn't exist."""
+        try:
+            return self._multiEntryExitDetectors[detectorId]
+        except KeyError:
+            raise KeyError(
+                f"Multi-entry/exit detector not found: [detectorId={detectorId}]"
+            )
+
+    def refresh(self) -> None:
+        """Drops the cached static attributes of all edges and lanes (see Edge.refresh)."""
+        for edge in self._edges.values():
+            edge.refresh()
+
+    def subscribeEdgeAttributes(self, attributes: list[str]) -> None:
+        """Subscribes the given Edge attributes (e.g., vehicleCount, occupancy) for all edges.
+        The values of subscribed attributes are fetched in bulk once per simulation step, and
+        the Edge properties are served from that snapshot instead of doing one TraCI call each.
+        See Edge.subscribableAttributes for the available attributes."""
+        self._edgeCache.subscribe(
+            self._edges.keys(),
+            self._toVariables(attributes, Edge.subscribableAttributes),
+        )
+
+    def subscribeLaneAttributes(self, attributes: list[str]) -> None:
+        """Subscribes the given Lane attributes (e.g., vehicleCount, occupancy) for all lanes.
+        See subscribeEdgeAttributes and Lane.subscribableAttributes."""
+        self._laneCache.subscribe(
+            self._lanesIndex.keys(),
+            self._toVariables(attributes, Lane.subscribableAttributes),
+        )
+
+    def edgeFrame(self, attributes: list[str]) -> Frame:
+        """Returns the current value of the given attributes for all edges, as a columnar Frame.
+        The rows follow the (stable) order of the edges property. The attributes are subscribed
+        (see subscribeEdgeAttributes), so the frame is built from the bulk subscription results.
+        """
+        variables = self._toVariables(attributes, Edge.subscribableAttributes)
+        self._edgeCache.subscribe(self._edges.keys(), variables)
+        return Frame.fromSubscriptionResults(
+            list(self._edges.keys()), attributes, variables, self._edgeCache.results
+        )
+
+    def laneFrame(self, attributes: list[str]) -> Frame:
+        """Returns the current value of the given attributes for all lanes, as a columnar Frame.
+        The rows follow the (stable) order of the lanes property. See edgeFrame."""
+        variables = self._toVariables(attributes, Lane.subscribableAttributes)
+        self._laneCache.subscribe(self._lanesIndex.keys(), variables)
+        return Frame.fromSubscriptionResults(
+            list(self._lanesIndex.keys()),
+            attributes,
+            variables,
+            self._laneCache.results,
+        )
+
+    def _toVariables(
+        self, attributes: list[str], subscribableAttributes: dict[str, int]
+    ) -> list[int]:
+        try:
+            return [subscribableAttributes[attribute] for attribute in attributes]
+        except KeyError as e:
+            raise ValueError(
+                f"The given attribute can't be subscribed: [attribute={e}]."
+            )
 
     def createLaneStop(
         self, laneId: str, endPos: float = 0, startPos: float = INVALID_DOUBLE_VALUE
@@ -121,7 +274,195 @@ class Network(SimUpdatable):
         edge = self.getEdge(edgeId)
         return LaneStop(edge.lanes[0], endPos=endPos, startPos=startPos)
 
+    @property
+    def weightsVersion(self) -> int:
+        """Incremented whenever something that affects routing is changed through TraSMAPy: adapted travel
+        times, efforts, speed limits and lane permissions. Cached routes are invalidated when it changes
+        (see Users.rerouteMany)."""
+        return self._weightsVersion
+
+    def _weightsChanged(self) -> None:
+        self._weightsVersion += 1
+
+    def loadEdgeWeights(
+        self,
+        source: Union[str, np.ndarray],
+        edgeIds: Union[list[str], None] = None,
+        begin: float = 0.0,
+        period: Union[float, None] = None,
+        attribute: str = "traveltime",
+        effort: bool = False,
+        push: bool = True,
+    ) -> int:
+        """Loads time-dependent edge weights in bulk: adapted travel times (see Edge.setAdaptedTravelTime)
+        or, with effort, efforts (see Edge.setEffort). The source can be:
+        - the path of a SUMO edgedata XML file (e.g., edge-based meandata output, optionally gzipped),
+          which is streamed; the values are read from the given attribute of each edge of each interval;
+        - the path of a CSV file (.csv) with the header "edge,<begin 0>,<begin 1>,..." and one row per edge
+          ("<edge ID>,<value 0>,<value 1>,..."); each interval lasts until the next begin and the last one
+          lasts period (the length of the previous one, by default);
+        - a 2D array with one row per edge (in the order of edgeIds) and one column per interval,
+          the first one starting at begin and each lasting period.
+        A local copy of the values is kept, so Edge.getAdaptedTravelTime/getEffort don't need TraCI calls.
+        If push, the values are sent to SUMO: TraCI has no bulk command for them, so this costs one
+        command per edge and run of intervals with the same value (O(edges * intervals) round trips).
+        Otherwise, SUMO is assumed to have them already. For large or recurring data sets, loading them
+        at start is the recommended path: write them once with writeEdgeWeights, start the runs with
+        the --weight-files option (see TraSMAPy's sumoArgs) and load them with push=False (which only
+        fills the local copy). NaN values and unknown edges are skipped.
+        Returns the number of loaded values."""
+        loaded = EdgeWeights()
+        if isinstance(source, str):
+            if source.endswith(".csv"):
+                count = self._readWeightsCsv(source, period, loaded)
+            else:
+                count = self._readWeightsXml(source, attribute, loaded)
+        else:
+            if edgeIds is None or period is None:
+                raise ValueError(
+                    "The edgeIds and the period are needed to load the edge weights of an array."
+                )
+            count = self._readWeightsArray(np.asarray(source), edgeIds, begin, period, loaded)
+
+        weights = self._efforts if effort else self._travelTimes
+        domain = self._connection.edge
+        for edgeId in loaded.edgeIds():
+            for (intervalBegin, intervalEnd, value) in loaded.intervals(edgeId, merged=True):
+                weights.set(edgeId, intervalBegin, intervalEnd, value)
+                if not push:
+                    continue
+                if effort:
+                    domain.setEffort(edgeId, value, begin=intervalBegin, end=intervalEnd)
+                else:
+                    domain.adaptTraveltime(edgeId, value, begin=intervalBegin, end=intervalEnd)
+        self._weightsChanged()
+        return count
+
+    def writeEdgeWeights(
+        self, path: str, attribute: str = "traveltime", effort: bool = False
+    ) -> None:
+        """Writes the adapted travel times (or, with effort, the efforts) known to TraSMAPy (see
+        loadEdgeWeights) to an edgedata XML file, which SUMO can load at start (--weight-files option),
+        so later runs don't need to push them."""
+        weights = self._efforts if effort else self._travelTimes
+        intervals: dict[tuple[float, float], list[tuple[str, float]]] = {}
+        for edgeId in weights.edgeIds():
+            for (intervalBegin, intervalEnd, value) in weights.intervals(edgeId):
+                intervals.setdefault((intervalBegin, intervalEnd), []).append((edgeId, value))
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("<meandata>\n")
+            for (intervalBegin, intervalEnd), values in sorted(intervals.items()):
+                f.write(f'    <interval begin="{intervalBegin}" end="{intervalEnd}">\n')
+                for edgeId, value in values:
+                    f.write(f'        <edge id={quoteattr(edgeId)} {attribute}="{value}"/>\n')
+                f.write("    </interval>\n")
+            f.write("</meandata>\n")
+
+    def _readWeightsXml(self, path: str, attribute: str, weights: EdgeWeights) -> int:
+        count = 0
+        intervalBegin, intervalEnd = 0.0, 0.0
+        with _open(path) as f:
+            for event, elem in _iterparse(f, ("start", "end")):
+                if event == "start":
+                    if elem.tag == "interval":
+                        intervalBegin = float(elem.get("begin", 0))
+                        intervalEnd = float(elem.get("end", 0))
+                elif elem.tag == "edge":
+                    count += self._addWeight(
+                        weights, elem.get("id"), intervalBegin, intervalEnd, elem.get(attribute)  # type: ignore
+                    )
+        return count
+
+    def _readWeightsCsv(
+        self, path: str, period: Union[float, None], weights: EdgeWeights
+    ) -> int:
+        count = 0
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None or len(header) < 2:
+                raise ValueError(f"The CSV file doesn't have any interval: [path={path}].")
+            begins = [float(intervalBegin) for intervalBegin in header[1:]]
+            if period is None:
+                if len(begins) < 2:
+                    raise ValueError(
+                        f"The period is needed for CSV files with a single interval: [path={path}]."
+                    )
+                period = begins[-1] - begins[-2]
+            ends = [*begins[1:], begins[-1] + period]
+            for row in reader:
+                if len(row) == 0:
+                    continue
+                for intervalBegin, intervalEnd, value in zip(begins, ends, row[1:]):
+                    count += self._addWeight(weights, row[0], intervalBegin, intervalEnd, value)
+        return count
+
+    def _readWeightsArray(
+        self,
+        values: np.ndarray,
+        edgeIds: list[str],
+        begin: float,
+        period: float,
+        weights: EdgeWeights,
+    ) -> int:
+        if values.ndim != 2 or values.shape[0] != len(edgeIds):
+            raise ValueError(
+                f"The array must have one row per edge: [shape={values.shape}], [edges={len(edgeIds)}]."
+            )
+        count = 0
+        for edgeId, row in zip(edgeIds, values.tolist()):
+            for i, value in enumerate(row):
+                count += self._addWeight(
+                    weights, edgeId, begin + i * period, begin + (i + 1) * period, value
+                )
+        return count
+
+    def _addWeight(
+        self,
+        weights: EdgeWeights,
+        edgeId: str,
+        begin: float,
+        end: float,
+        value: Union[str, float, None],
+    ) -> int:
+        """Adds the value (if it's valid) and returns the number of values added (0 or 1)."""
+        if value is None or value == "" or edgeId not in self._edges:
+            return 0
+        value = float(value)
+        if isnan(value):
+            return 0
+        weights.set(edgeId, begin, end, value)
+        return 1
+
+    def createRouter(self) -> Router:
+        """Returns a router that computes shortest routes in-process, over the connectivity of the edges
+        (see Router). Each router has its own weights, so several can be used side by side."""
+        return Router(self, self._edgeSuccessors, self._edgeEndpoints)
+
     @override
     def _doSimulationStep(self, *args, step: int, time: float) -> None:
-        for detector in self._detectors.values():
-            detector._doSimulationStep(*args, step=step, time=time)
+        self._edgeCache.update()
+        self._laneCache.update()
+        self._detectorCache.update()
+        for detectorId in self._detectorCache.results:
+            self._detectors[detectorId]._doSimulationStep(*args, step=step, time=time)
+        self._laneAreaCache.update()
+        for detectorId in self._laneAreaCache.results:
+            self._laneAreaDetectors[detectorId]._doSimulationStep(
+                *args, step=step, time=time
+            )
+        self._multiEntryExitCache.update()
+        for detectorId in self._multiEntryExitCache.results:
+            self._multiEntryExitDetectors[detectorId]._doSimulationStep(
+                *args, step=step, time=time
+            )
+
+    def _hasListeners(self) -> bool:
+        """Whether any detector is listened (the listeners need to check every step)."""
+        # only the listened detectors are subscribed
+        return (
+            len(self._detectorCache.results) > 0
+            or len(self._laneAreaCache.results) > 0
+            or len(self._multiEntryExitCache.results) > 0
+        )
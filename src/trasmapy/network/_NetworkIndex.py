@@ -0,0 +1,318 @@
+import gzip
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+from typing import Union
+from xml.etree.ElementTree import iterparse
+
+BUS_STOP = "busStop"
+CHARGING_STATION = "chargingStation"
+PARKING_AREA = "parkingArea"
+
+# bumped whenever the pickled index layout changes (old cache files are then ignored)
+_CACHE_VERSION = 2
+# SUMO's default lane width (omitted from the net file)
+_DEFAULT_LANE_WIDTH = 3.2
+
+# additional file elements that are indexed as stops (trainStops live in the busstop domain)
+_stopTags: dict[str, str] = {
+    "busStop": BUS_STOP,
+    "trainStop": BUS_STOP,
+    "chargingStation": CHARGING_STATION,
+    "parkingArea": PARKING_AREA,
+}
+
+
+class NetworkIndex:
+    """The static structure of the network: the lanes of each edge (ordered by lane index),
+    the lane of each stop, the static attributes of each lane (as loaded) and the connectivity
+    of the (non-internal) edges, with the positions of their junctions (used for routing).
+    It is either streamed from the net/additional files (no TraCI calls) or queried through TraCI.
+    Indexes built from files can be cached on disk, keyed by the content hash of those files."""
+
+    def __init__(
+        self,
+        edgeLanes: dict[str, list[str]],
+        stops: dict[str, tuple[str, str]],
+        laneAttributes: Union[dict[str, dict[str, float]], None] = None,
+        edgeSuccessors: Union[dict[str, list[str]], None] = None,
+        edgeEndpoints: Union[
+            dict[str, tuple[tuple[float, float], tuple[float, float]]], None
+        ] = None,
+    ) -> None:
+        # edgeId -> [laneId, ...]
+        self.edgeLanes = edgeLanes
+        # stopId -> (stop kind, laneId)
+        self.stops = stops
+        # laneId -> {"length": ..., "width": ..., "maxSpeed": ...}
+        self.laneAttributes = {} if laneAttributes is None else laneAttributes
+        # edgeId -> [edgeId, ...] (the edges reachable from the end of the edge, without internal edges)
+        self.edgeSuccessors = {} if edgeSuccessors is None else edgeSuccessors
+        # edgeId -> ((x, y) of the from junction, (x, y) of the to junction), without internal edges
+        self.edgeEndpoints = {} if edgeEndpoints is None else edgeEndpoints
+
+    @classmethod
+    def fromConnection(cls, connection):
+        """Builds the index through TraCI (a few calls per lane and stop)."""
+        stops: dict[str, tuple[str, str]] = {}
+        for kind, domain in cls._stopDomains(connection).items():
+            for stopId in domain.getIDList():
+                stops[stopId] = (kind, domain.getLaneID(stopId))
+
+        edgeLanes: dict[str, list[str]] = {
+            edgeId: [] for edgeId in connection.edge.getIDList()
+        }
+        laneEdges: dict[str, str] = {}
+        for laneId in connection.lane.getIDList():
+            parentEdgeId: str = connection.lane.getEdgeID(laneId)  # type: ignore
+            laneEdges[laneId] = parentEdgeId
+            try:
+                edgeLanes[parentEdgeId].append(laneId)
+            except KeyError:
+                edgeLanes[parentEdgeId] = [laneId]
+
+        edgeSuccessors: dict[str, list[str]] = {}
+        edgeEndpoints: dict[str, tuple[tuple[float, float], tuple[float, float]]] = {}
+        junctionPositions: dict[str, tuple[float, float]] = {}
+        for edgeId, laneIds in edgeLanes.items():
+            if edgeId.startswith(":"):
+                continue
+            successors: dict[str, None] = {}
+            for laneId in laneIds:
+                for link in connection.lane.getLinks(laneId, False):  # type: ignore
+                    successors[laneEdges[link[0]]] = None
+            edgeSuccessors[edgeId] = list(successors)
+            endpoints = []
+            for junctionId in (
+                connection.edge.getFromJunction(edgeId),
+                connection.edge.getToJunction(edgeId),
+            ):
+                if junctionId not in junctionPositions:
+                    junctionPositions[junctionId] = connection.junction.getPosition(junctionId)  # type: ignore
+                endpoints.append(junctionPositions[junctionId])
+            edgeEndpoints[edgeId] = (endpoints[0], endpoints[1])
+        return cls(edgeLanes, stops, {}, edgeSuccessors, edgeEndpoints)
+
+    @classmethod
+    def fromFiles(cls, netFile: str, additionalFiles: list[str]):
+        """Builds the index by streaming the given net file and additional files.
+        Raises OSError if a file can't be read and SyntaxError (ParseError) if it isn't valid XML."""
+        edgeLanes: dict[str, list[str]] = {}
+        laneAttributes: dict[str, dict[str, float]] = {}
+        edgeSuccessors: dict[str, dict[str, None]] = {}
+        edgeJunctions: dict[str, tuple[str, str]] = {}
+        junctionPositions: dict[str, tuple[float, float]] = {}
+        with _open(netFile) as f:
+            laneIndexes: list[tuple[int, str]] = []
+            for _, elem in _iterparse(f):
+                if elem.tag == "lane":
+                    laneId: str = elem.get("id")  # type: ignore
+                    laneIndexes.append((int(elem.get("index", 0)), laneId))
+                    laneAttributes[laneId] = {
+                        "length": float(elem.get("length", 0)),
+                        "width": float(elem.get("width", _DEFAULT_LANE_WIDTH)),
+                        "maxSpeed": float(elem.get("speed", 0)),
+                    }
+                elif elem.tag == "edge":
+                    edgeId: str = elem.get("id")  # type: ignore
+                    edgeLanes[edgeId] = [laneId for _, laneId in sorted(laneIndexes)]
+                    laneIndexes = []
+                    if elem.get("function") != "internal":
+                        edgeJunctions[edgeId] = (elem.get("from"), elem.get("to"))  # type: ignore
+                        edgeSuccessors[edgeId] = {}
+                elif elem.tag == "junction":
+                    junctionPositions[elem.get("id")] = (  # type: ignore
+                        float(elem.get("x", 0)),
+                        float(elem.get("y", 0)),
+                    )
+                elif elem.tag == "connection":
+                    fromEdgeId: str = elem.get("from")  # type: ignore
+                    if not fromEdgeId.startswith(":"):
+                        edgeSuccessors.setdefault(fromEdgeId, {})[elem.get("to")] = None  # type: ignore
+
+        stops: dict[str, tuple[str, str]] = {}
+        for additionalFile in additionalFiles:
+            with _open(additionalFile) as f:
+                for _, elem in _iterparse(f):
+                    try:
+                        stops[elem.get("id")] = (_stopTags[elem.tag], elem.get("lane"))  # type: ignore
+                    except KeyError:
+                        pass
+        # same order as the TraCI index: bus stops, then charging stations, then parking areas
+        kindOrder = [BUS_STOP, CHARGING_STATION, PARKING_AREA]
+        stops = dict(sorted(stops.items(), key=lambda item: kindOrder.index(item[1][0])))
+        edgeEndpoints = {
+            edgeId: (junctionPositions[fromId], junctionPositions[toId])
+            for edgeId, (fromId, toId) in edgeJunctions.items()
+        }
+        return cls(
+            edgeLanes,
+            stops,
+            laneAttributes,
+            {edgeId: list(successors) for edgeId, successors in edgeSuccessors.items()},
+            edgeEndpoints,
+        )
+
+    @classmethod
+    def fromSumoConfig(
+        cls,
+        sumoCfg: str,
+        sumoArgs: Union[list[str], None] = None,
+        cacheDir: Union[str, None] = None,
+    ):
+        """Builds the index from the net and additional files referenced by the given sumo
+        configuration file (and command line arguments, which take precedence).
+        If a cacheDir is given, the index is loaded from there when the files haven't changed
+        (same content hash), and stored there otherwise.
+        Returns None if the files can't be found or parsed."""
+        sumoArgs = [] if sumoArgs is None else sumoArgs
+        try:
+            netFiles, additionalFiles = _networkFiles(sumoCfg, sumoArgs)
+            if len(netFiles) != 1:
+                return None
+            if cacheDir is None:
+                return cls.fromFiles(netFiles[0], additionalFiles)
+
+            cacheFile = os.path.join(
+                cacheDir, f"{_hashFiles([*netFiles, *additionalFiles])}.pickle"
+            )
+            index = cls._load(cacheFile)
+            if index is None:
+                index = cls.fromFiles(netFiles[0], additionalFiles)
+                try:
+                    index._store(cacheFile)
+                except OSError:
+                    # the cache is an optimization: a read-only/full disk isn't an error
+                    pass
+            return index
+        except (OSError, SyntaxError, ValueError):
+            return None
+
+    @classmethod
+    def _load(cls, cacheFile: str):
+        try:
+            with open(cacheFile, "rb") as f:
+                version, *fields = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return None
+        if version != _CACHE_VERSION:
+            return None
+        return cls(*fields)
+
+    def _store(self, cacheFile: str) -> None:
+        cacheDir = os.path.dirname(cacheFile)
+        os.makedirs(cacheDir, exist_ok=True)
+        # write + rename, so concurrent runs (e.g., sweeps) never read a partial file
+        fd, tmpFile = tempfile.mkstemp(dir=cacheDir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(
+                    (
+                        _CACHE_VERSION,
+                        self.edgeLanes,
+                        self.stops,
+                        self.laneAttributes,
+                        self.edgeSuccessors,
+                        self.edgeEndpoints,
+                    ),
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmpFile, cacheFile)
+        except OSError:
+            if os.path.exists(tmpFile):
+                os.remove(tmpFile)
+            raise
+
+    def matches(self, connection) -> bool:
+        """Checks (with a constant number of TraCI calls) that the simulation has exactly the
+        edges, lanes and stops of this index."""
+        if set(self.edgeLanes.keys()) != set(connection.edge.getIDList()):
+            return False
+        lanes = {laneId for laneIds in self.edgeLanes.values() for laneId in laneIds}
+        if lanes != set(connection.lane.getIDList()):
+            return False
+        for kind, domain in self._stopDomains(connection).items():
+            indexed = {stopId for stopId, (k, _) in self.stops.items() if k == kind}
+            if indexed != set(domain.getIDList()):
+                return False
+        return True
+
+    @staticmethod
+    def _stopDomains(connection) -> dict:
+        return {
+            BUS_STOP: connection.busstop,
+            CHARGING_STATION: connection.chargingstation,
+            PARKING_AREA: connection.parkingarea,
+        }
+
+
+def _open(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _iterparse(f, events: tuple[str, ...] = ("end",)):
+    """Streams the elements of the XML file like iterparse (yielding the given events).
+    Once an element's end was handled, it's detached from its parent (clearing it would keep it
+    in the tree), so the memory doesn't grow with the size of the file."""
+    parents: list = []
+    for event, elem in iterparse(f, events=("start", "end")):
+        if event == "start":
+            if event in events:
+                yield event, elem
+            parents.append(elem)
+            continue
+        parents.pop()
+        if event in events:
+            yield event, elem
+        if len(parents) > 0:
+            del parents[-1][:]
+
+
+def _hashFiles(files: list[str]) -> str:
+    digest = hashlib.sha256()
+    for file in files:
+        fileDigest = hashlib.sha256()
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                fileDigest.update(chunk)
+        digest.update(fileDigest.digest())
+    return digest.hexdigest()
+
+
+def _splitFileList(value: str, baseDir: str) -> list[str]:
+    return [
+        os.path.join(baseDir, file) for file in re.split(r"[,\s]+", value) if file != ""
+    ]
+
+
+def _networkFiles(sumoCfg: str, sumoArgs: list[str]) -> tuple[list[str], list[str]]:
+    """Returns the net files and additional files that SUMO loads for the given configuration."""
+    options: dict[str, list[str]] = {}
+    cfgDir = os.path.dirname(sumoCfg)
+    with _open(sumoCfg) as f:
+        for _, elem in iterparse(f):
+            value: Union[str, None] = elem.get("value")
+            if elem.tag in ("net-file", "additional-files") and value is not None:
+                options[elem.tag] = _splitFileList(value, cfgDir)
+
+    aliases = {
+        "-n": "net-file",
+        "--net-file": "net-file",
+        "-a": "additional-files",
+        "--additional-files": "additional-files",
+    }
+    for i, arg in enumerate(sumoArgs):
+        name, sep, value = arg.partition("=")
+        if name not in aliases:
+            continue
+        if sep == "":
+            if i + 1 >= len(sumoArgs):
+                raise ValueError(f"Missing value for the SUMO option: [option={name}].")
+            value = sumoArgs[i + 1]
+        options[aliases[name]] = _splitFileList(value, "")
+    return options.get("net-file", []), options.get("additional-files", [])
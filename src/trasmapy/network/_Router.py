@@ -0,0 +1,185 @@
+import heapq
+from math import hypot, inf
+from typing import Union
+
+from trasmapy.network._ContractionHierarchy import ContractionHierarchy
+from trasmapy.network._Edge import Edge
+from trasmapy.network.RoutingAlgorithm import RoutingAlgorithm
+
+
+class Router:
+    """Computes shortest routes in-process, over the graph of the (non-internal) edges of the network,
+    where each edge leads to the edges its lanes are connected to. The cost of a route is the sum of
+    the weights of its edges (the first and last included). Unlike Vehicle.rerouteByTravelTime, routes
+    don't need TraCI calls, so thousands of them can be computed per step.
+    Until set (see setWeights, useTravelTimes and useAdaptedTravelTimes), the weight of each edge is its
+    free-flow travel time (length / max speed). Vehicle class permissions aren't considered.
+    The routes can be applied with Vehicle.setRoute or Users.createRouteFromEdges."""
+
+    def __init__(
+        self,
+        network,
+        edgeSuccessors: dict[str, list[str]],
+        edgeEndpoints: dict[str, tuple[tuple[float, float], tuple[float, float]]],
+    ) -> None:
+        self._network = network
+        self._edges: list[Edge] = [
+            edge for edge in network.edges if edge.id in edgeSuccessors
+        ]
+        self._indexes: dict[str, int] = {edge.id: i for i, edge in enumerate(self._edges)}
+        self._successors: list[list[int]] = [
+            [
+                self._indexes[successorId]
+                for successorId in edgeSuccessors[edge.id]
+                if successorId in self._indexes
+            ]
+            for edge in self._edges
+        ]
+        self._endpoints = [edgeEndpoints.get(edge.id) for edge in self._edges]
+
+        self._freeFlow: list[float] = []
+        maxSpeed = 0.0
+        for edge in self._edges:
+            lanes = edge.lanes
+            speed = max(lane.maxSpeed for lane in lanes)
+            maxSpeed = max(maxSpeed, speed)
+            self._freeFlow.append(lanes[0].length / speed if speed > 0 else inf)
+        self._maxSpeed = maxSpeed
+        self._weights: list[float] = self._freeFlow.copy()
+        # built on demand, for the current weights
+        self._hierarchy: Union[ContractionHierarchy, None] = None
+        # incremented whenever the weights change (see Users.rerouteMany)
+        self._version: int = 0
+
+    @property
+    def weights(self) -> dict[str, float]:
+        """The current weight of each edge."""
+        return {edge.id: weight for edge, weight in zip(self._edges, self._weights)}
+
+    def setWeights(self, weights: dict[str, float]) -> None:
+        """Sets the weight of the given edges (by ID). The other edges keep their weight.
+        An infinite weight closes the edge. Raises ValueError for negative weights and KeyError
+        for edges that aren't routable (e.g., internal edges)."""
+        for edgeId, weight in weights.items():
+            if weight < 0:
+                raise ValueError(
+                    f"Edge weights can't be negative: [edgeId={edgeId}], [weight={weight}]."
+                )
+            try:
+                self._weights[self._indexes[edgeId]] = weight
+            except KeyError:
+                raise KeyError(f"The edge isn't routable: [edgeId={edgeId}].")
+        self._weightsChanged()
+
+    def resetWeights(self) -> None:
+        """Sets the weight of every edge to its free-flow travel time."""
+        self._weights = self._freeFlow.copy()
+        self._weightsChanged()
+
+    def useTravelTimes(self) -> None:
+        """Sets the weight of every edge to its current travel time (Edge.travelTime).
+        The travel times are fetched in bulk (see Network.edgeFrame)."""
+        frame = self._network.edgeFrame(["travelTime"])
+        travelTimes = frame.column("travelTime")
+        rows = {edgeId: i for i, edgeId in enumerate(frame.ids)}
+        self._weights = [float(travelTimes[rows[edge.id]]) for edge in self._edges]
+        self._weightsChanged()
+
+    def useAdaptedTravelTimes(self, time: float) -> None:
+        """Sets the weight of every edge to its adapted travel time at the given time
+        (Edge.getAdaptedTravelTime). Edges without one use their free-flow travel time."""
+        self._weights = [
+            travelTime if travelTime >= 0 else freeFlow
+            for travelTime, freeFlow in zip(
+                (edge.getAdaptedTravelTime(time) for edge in self._edges),
+                self._freeFlow,
+            )
+        ]
+        self._weightsChanged()
+
+    def _weightsChanged(self) -> None:
+        self._hierarchy = None
+        self._version += 1
+
+    def contract(self) -> None:
+        """Preprocesses the network for RoutingAlgorithm.CH queries (with the current weights).
+        Otherwise, it's done by the first CH query after the weights change."""
+        if self._hierarchy is None:
+            self._hierarchy = ContractionHierarchy(self._successors, self._weights)
+
+    def findRoute(
+        self,
+        origin: Edge,
+        destination: Edge,
+        algorithm: RoutingAlgorithm = RoutingAlgorithm.DIJKSTRA,
+    ) -> list[Edge]:
+        """Returns the edges of the cheapest route from the origin to the destination edge.
+        Returns an empty list if the destination can't be reached.
+        Raises KeyError if an edge isn't routable (e.g., an internal edge)."""
+        try:
+            originIndex = self._indexes[origin.id]
+            destinationIndex = self._indexes[destination.id]
+        except KeyError as e:
+            raise KeyError(f"The edge isn't routable: [edgeId={e}].")
+
+        if algorithm is RoutingAlgorithm.CH:
+            self.contract()
+            path = self._hierarchy.shortestPath(originIndex, destinationIndex)  # type: ignore
+        else:
+            path = self._search(
+                originIndex, destinationIndex, algorithm is RoutingAlgorithm.ASTAR
+            )
+        return [] if path is None else [self._edges[i] for i in path]
+
+    def routeCost(self, route: list[Edge]) -> float:
+        """Returns the cost of the given route (the sum of the weights of its edges)."""
+        return sum(self._weights[self._indexes[edge.id]] for edge in route)
+
+    def _search(
+        self, origin: int, destination: int, guided: bool
+    ) -> Union[list[int], None]:
+        """Dijkstra (A*, if guided) from the origin to the destination."""
+        weights = self._weights
+        if weights[origin] == inf:
+            return None
+        heuristic = self._heuristic(destination) if guided else None
+        dist: dict[int, float] = {origin: weights[origin]}
+        parent: dict[int, int] = {}
+        queue = [(weights[origin], weights[origin], origin)]
+        while queue:
+            _, d, u = heapq.heappop(queue)
+            if u == destination:
+                path = [u]
+                while path[-1] != origin:
+                    path.append(parent[path[-1]])
+                path.reverse()
+                return path
+            if d > dist[u]:
+                continue
+            for v in self._successors[u]:
+                nd = d + weights[v]
+                if nd < dist.get(v, inf):
+                    dist[v] = nd
+                    parent[v] = u
+                    heapq.heappush(
+                        queue, (nd if heuristic is None else nd + heuristic(v), nd, v)
+                    )
+        return None
+
+    def _heuristic(self, destination: int):
+        """Lower bound of the cost from (the end of) an edge to the destination: the straight-line
+        distance to the start of the destination at the highest speed of the network."""
+        endpoints = self._endpoints[destination]
+        if endpoints is None or self._maxSpeed <= 0:
+            return lambda v: 0.0
+        (x, y), _ = endpoints
+        speed = self._maxSpeed
+
+        def heuristic(v: int) -> float:
+            vEndpoints = self._endpoints[v]
+            if v == destination or vEndpoints is None:
+                return 0.0
+            (_, (vx, vy)) = vEndpoints
+            return hypot(vx - x, vy - y) / speed
+
+        return heuristic
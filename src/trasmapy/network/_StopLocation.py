@@ -8,8 +8,9 @@ from trasmapy.users.StopType import StopType
 class StopLocation(Stop):
     stopType: StopType = StopType.DEFAULT
 
-    def __init__(self, stopId: str) -> None:
+    def __init__(self, stopId: str, connection) -> None:
         super().__init__(stopId)
+        self._connection = connection
 
     def _setParent(self, parentLane) -> None:
         self._parent = parentLane
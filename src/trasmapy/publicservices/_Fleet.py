@@ -1,5 +1,5 @@
 from typing_extensions import override
-from math import inf
+from math import ceil, floor, inf
 
 from traci.constants import INVALID_DOUBLE_VALUE
 
@@ -93,6 +93,17 @@ class Fleet(IdentifiedObject, SimUpdatable):
         # remove dead vehicles from the list
         self._vehicles = list(filter(lambda v: not v.isDead(), self._vehicles))
 
+    def _stepsUntilSpawn(self, time: float, stepLength: float) -> float:
+        """The number of steps until the next spawn (inf if there are no more spawns).
+        Rounded down, so it's never later than the actual spawn."""
+        # the spawn happens on the first step with start < time < end and nextSpawn <= time
+        afterStart = floor((self._start - time) / stepLength - 1e-6) + 1
+        afterNextSpawn = ceil((self._nextSpawn - time) / stepLength - 1e-6)
+        steps = max(afterStart, afterNextSpawn, 1)
+        if time + steps * stepLength >= self._end:
+            return inf
+        return steps
+
     def _spawnVehicle(self, time: float, users: Users):
         newVehicleId: str = f"fleet{self.id}{len(self._spawnedVehiclesIds)}"
         self._spawnedVehiclesIds.append(newVehicleId)
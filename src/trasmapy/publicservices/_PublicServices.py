@@ -1,3 +1,4 @@
+from math import inf
 from typing import Union
 from typing_extensions import override
 
@@ -61,3 +62,10 @@ class PublicServices(SimUpdatable):
     def _doSimulationStep(self, *args, step: int, time: float) -> None:
         for fleet in self._fleets.values():
             fleet._doSimulationStep(self._users, step=step, time=time)
+
+    def _stepsUntilDue(self, time: float, stepLength: float) -> float:
+        """The number of steps until the next fleet spawn (inf if there are none)."""
+        return min(
+            (fleet._stepsUntilSpawn(time, stepLength) for fleet in self._fleets.values()),
+            default=inf,
+        )
@@ -0,0 +1,47 @@
+from typing import Any, Callable, Union
+
+from trasmapy.statistics.Reducer import Reducer
+
+
+class Aggregation:
+    def __init__(
+        self,
+        window: int,
+        reducer: Reducer,
+        groupBy: Union[Callable[[Any], Any], None] = None,
+        value: Union[Callable[[Any], Any], None] = None,
+    ) -> None:
+        """Describes how the results of a registered query are aggregated over (tumbling) windows of
+        the given number of steps, instead of being stored on every step (see TraSMAPy.registerQuery).
+        The windows are aligned to the step count (a window ends on the steps multiple of its length)
+        and the reduced value is stored on the last step of each window.
+        Without groupBy, each result of the query is a value to reduce (or value(result), if given).
+        With groupBy, each result is an iterable of items and the values (value(item), if given) are
+        reduced per key (groupBy(item)), so the stored result is a dict (key -> reduced value).
+        None values are ignored. Each group only holds a running accumulator (O(1) memory)."""
+        if window < 1:
+            raise ValueError(f"The window must be positive: [window={window}].")
+        self._window = window
+        self._reducer = reducer
+        self._groupBy = groupBy
+        self._value = value
+
+    @property
+    def window(self) -> int:
+        """The length of the windows (steps)."""
+        return self._window
+
+    @property
+    def reducer(self) -> Reducer:
+        return self._reducer
+
+    @property
+    def groupBy(self) -> Union[Callable[[Any], Any], None]:
+        return self._groupBy
+
+    @property
+    def value(self) -> Union[Callable[[Any], Any], None]:
+        return self._value
+
+    def __repr__(self) -> str:
+        return f"Aggregation(window={self._window}, reducer={self._reducer.name})"
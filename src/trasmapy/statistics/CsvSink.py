@@ -0,0 +1,23 @@
+import csv
+from typing import Any
+from typing_extensions import override
+
+from trasmapy.statistics.StatisticsSink import StatisticsSink
+
+
+class CsvSink(StatisticsSink):
+    """Writes one row per query result, with the columns step, query and result (JSON encoded)."""
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        self._file = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        if not append or self._file.tell() == 0:
+            self._writer.writerow(["step", "query", "result"])
+
+    @override
+    def write(self, step: int, queryName: str, result: Any) -> None:
+        self._writer.writerow([step, queryName, self._toJson(result)])
+
+    @override
+    def close(self) -> None:
+        self._file.close()
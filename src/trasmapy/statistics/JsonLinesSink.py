@@ -0,0 +1,21 @@
+from typing import Any
+from typing_extensions import override
+
+from trasmapy.statistics.StatisticsSink import StatisticsSink
+
+
+class JsonLinesSink(StatisticsSink):
+    """Writes one JSON object per query result: {"step": ..., "query": ..., "result": ...}."""
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    @override
+    def write(self, step: int, queryName: str, result: Any) -> None:
+        self._file.write(
+            f'{{"step": {step}, "query": {self._toJson(queryName)}, "result": {self._toJson(result)}}}\n'
+        )
+
+    @override
+    def close(self) -> None:
+        self._file.close()
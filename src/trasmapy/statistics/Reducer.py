@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class Reducer(Enum):
+    """How the values of a window are reduced (see Aggregation)."""
+
+    SUM = "sum"
+    MEAN = "mean"
+    MIN = "min"
+    MAX = "max"
+    COUNT = "count"
+    """The number of (non-None) values."""
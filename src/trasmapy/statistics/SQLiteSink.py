@@ -0,0 +1,42 @@
+import re
+import sqlite3
+from typing import Any
+from typing_extensions import override
+
+from trasmapy.statistics.StatisticsSink import StatisticsSink
+
+
+class SQLiteSink(StatisticsSink):
+    """Inserts one row per query result in a SQLite table with the columns
+    step (INTEGER), query (TEXT) and result (TEXT, JSON encoded).
+    Rows are committed in batches of commitInterval rows (and when the sink is closed)."""
+
+    def __init__(
+        self, path: str, table: str = "statistics", commitInterval: int = 1000
+    ) -> None:
+        if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table) is None:
+            raise ValueError(f"Invalid table name: [table={table}].")
+        if commitInterval < 1:
+            raise ValueError(
+                f"The commit interval must be positive: [commitInterval={commitInterval}]."
+            )
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (step INTEGER, query TEXT, result TEXT)"
+        )
+        self._insert = f"INSERT INTO {table} (step, query, result) VALUES (?, ?, ?)"
+        self._commitInterval = commitInterval
+        self._uncommitted: int = 0
+
+    @override
+    def write(self, step: int, queryName: str, result: Any) -> None:
+        self._connection.execute(self._insert, (step, queryName, self._toJson(result)))
+        self._uncommitted += 1
+        if self._uncommitted >= self._commitInterval:
+            self._connection.commit()
+            self._uncommitted = 0
+
+    @override
+    def close(self) -> None:
+        self._connection.commit()
+        self._connection.close()
@@ -0,0 +1,34 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class StatisticsSink(ABC):
+    """Receives the results of the registered queries as they are produced (e.g., to stream them
+    to disk), so they don't need to be kept in memory (see TraSMAPy.addStatisticsSink)."""
+
+    @abstractmethod
+    def write(self, step: int, queryName: str, result: Any) -> None:
+        """Stores the result of the given query on the given step."""
+        pass
+
+    def close(self) -> None:
+        """Flushes the stored results and releases the sink's resources.
+        Called when the simulation is closed."""
+        pass
+
+    @staticmethod
+    def _toJson(result: Any) -> str:
+        """Encodes a query result as JSON. NumPy values are converted to plain values and
+        other unsupported objects (e.g., Edges) are encoded through their repr."""
+        return json.dumps(result, default=_jsonDefault)
+
+
+def _jsonDefault(value: Any) -> Any:
+    # NumPy scalars and arrays (e.g., from frames)
+    for conversion in ("tolist", "item"):
+        if hasattr(value, conversion):
+            return getattr(value, conversion)()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return repr(value)
@@ -0,0 +1,73 @@
+from typing import Any, Union
+
+from trasmapy.statistics.Aggregation import Aggregation
+from trasmapy.statistics.Reducer import Reducer
+
+
+class _Accumulator:
+    __slots__ = ("total", "count")
+
+    def __init__(self) -> None:
+        # the running sum/min/max (depending on the reducer) and the number of values
+        self.total: Any = None
+        self.count: int = 0
+
+
+class WindowAggregator:
+    """Reduces the results of a query over the current window of its Aggregation."""
+
+    def __init__(self, aggregation: Aggregation) -> None:
+        self._aggregation = aggregation
+        self._groups: dict[Any, _Accumulator] = {}
+
+    @property
+    def aggregation(self) -> Aggregation:
+        return self._aggregation
+
+    def add(self, result: Any) -> None:
+        """Adds a result of the query to the current window."""
+        groupBy, value = self._aggregation.groupBy, self._aggregation.value
+        if groupBy is None:
+            self._accumulate(None, result if value is None else value(result))
+            return
+        for item in result:
+            self._accumulate(groupBy(item), item if value is None else value(item))
+
+    def isWindowEnd(self, step: int) -> bool:
+        return step % self._aggregation.window == 0
+
+    def hasValues(self) -> bool:
+        return len(self._groups) > 0
+
+    def emit(self) -> Union[Any, dict[Any, Any]]:
+        """Returns the reduced values of the current window and starts a new one."""
+        reduced = {key: self._reduce(acc) for key, acc in self._groups.items()}
+        self._groups = {}
+        if self._aggregation.groupBy is None:
+            return reduced.get(None)
+        return reduced
+
+    def _accumulate(self, key: Any, value: Any) -> None:
+        if value is None:
+            return
+        try:
+            acc = self._groups[key]
+        except KeyError:
+            acc = self._groups[key] = _Accumulator()
+
+        reducer = self._aggregation.reducer
+        if acc.count == 0 or reducer is Reducer.SUM or reducer is Reducer.MEAN:
+            acc.total = value if acc.count == 0 else acc.total + value
+        elif reducer is Reducer.MIN:
+            acc.total = min(acc.total, value)
+        elif reducer is Reducer.MAX:
+            acc.total = max(acc.total, value)
+        acc.count += 1
+
+    def _reduce(self, acc: _Accumulator) -> Any:
+        reducer = self._aggregation.reducer
+        if reducer is Reducer.MEAN:
+            return acc.total / acc.count
+        if reducer is Reducer.COUNT:
+            return acc.count
+        return acc.total
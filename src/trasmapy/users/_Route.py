@@ -1,12 +1,11 @@
-import traci
-
 from trasmapy._IdentifiedObject import IdentifiedObject
 
 
 class Route(IdentifiedObject):
-    def __init__(self, routeId: str) -> None:
+    def __init__(self, routeId: str, connection) -> None:
         super().__init__(routeId)
+        self._connection = connection
 
     @property
     def edgesIds(self) -> list[str]:
-        return traci.route.getEdges(self.idself.id)  # type: ignore
+        return self._connection.route.getEdges(self.id)  # type: ignore
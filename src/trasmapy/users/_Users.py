@@ -1,57 +1,138 @@
+from itertools import chain, count
 from typing import Union
 from typing_extensions import override
 
-import traci
-from traci.constants import VAR_STOPSTATE
+from traci.constants import (
+    VAR_DEPARTED_VEHICLES_IDS,
+    VAR_ARRIVED_VEHICLES_IDS,
+    VAR_COLLIDING_VEHICLES_IDS,
+    VAR_TELEPORT_STARTING_VEHICLES_IDS,
+    VAR_TELEPORT_ENDING_VEHICLES_IDS,
+    VAR_EDGES,
+    VAR_ROUTE_INDEX,
+    VAR_ROAD_ID,
+    VAR_TYPE,
+)
 
+from trasmapy import _Backend
 from trasmapy._SimUpdatable import SimUpdatable
+from trasmapy._SubscriptionCache import SubscriptionCache
+from trasmapy._Frame import Frame
 from trasmapy.users._Vehicle import Vehicle
 from trasmapy.users._VehicleType import VehicleType
 from trasmapy.users._Route import Route
 from trasmapy.network._Edge import Edge
+from trasmapy.network._Network import Network
+from trasmapy.network._Router import Router
+from trasmapy.network.RoutingAlgorithm import RoutingAlgorithm
 
 
 class Users(SimUpdatable):
-    def __init__(self):
-        # the vehicles being tracked
+    def __init__(self, connection, network: Network):
+        self._connection = connection
+        self._network = network
+        # pool of the vehicle objects (one per live vehicle, created on first access)
+        # every pooled vehicle is tracked (marked dead when it leaves the simulation)
         self._vehicles: dict[str, Vehicle] = {}
+        # the IDs of the vehicles running in the simulation (same as vehicle.getIDList), in departure
+        # order and mapped to their departure sequence number (used to sort lookups)
+        self._departureCounter = count()
+        self._runningVehicleIds: dict[str, int] = {}
+        # per-step snapshot of the subscribed vehicle variables
+        self._vehicleCache = SubscriptionCache(self._connection.vehicle)
+        self._resyncVehicles()
+        # the vehicles removed through TraSMAPy since the last step
+        self._removedVehicleIds: set[str] = set()
+        self._subscribeEvents()
+        # whether every vehicle in the simulation is subscribed (not only the tracked ones)
+        self._subscribeAllVehicles: bool = False
+        # one object per vehicle type, so their cached attributes are shared
+        self._vehicleTypes: dict[str, VehicleType] = {}
+        # routes computed by rerouteMany: (origin, destination, vehicle type) -> edge IDs
+        # valid while the weights they were computed with don't change (see _routeCacheKey)
+        self._routeCache: dict[tuple[str, str, str], list[str]] = {}
+        self._routeCacheKey: tuple = ()
 
     def getAllVehicleIds(self) -> list[str]:
-        return traci.vehicle.getIDList()  # type: ignore
+        return list(self._runningVehicleIds)
 
     def getAllPendingVehicleIds(self) -> list[str]:
-        return traci.simulation.getPendingVehicles()  # type: ignore
+        return self._connection.simulation.getPendingVehicles()  # type: ignore
 
     def getAllVehicleTypeIds(self) -> list[str]:
-        return traci.vehicletype.getIDList()  # type: ignore
+        return self._connection.vehicletype.getIDList()  # type: ignore
 
     @property
     def vehicles(self) -> list[Vehicle]:
         """Retrieves an object for each vehicle currently in the simulation.
-        The API doesn't keep track of the liveness of the references returned
-        from this method. As such, the values returned from this method should
-        only be kept for one tick of the simulation (e.g., for querries)."""
-        return list(map(lambda id: Vehicle(id), self.getAllVehicleIds()))
+        The objects are pooled (the same object is returned for the same vehicle) and
+        their liveness is tracked, like the ones returned by getVehicle."""
+        return [self._pooledVehicle(id) for id in self._runningVehicleIds]
 
     @property
     def pendingVehicles(self) -> list[Vehicle]:
         """Retrieves an object for each pending vehicle currently in the simulation.
-        The API doesn't keep track of the liveness of the references returned
-        from this method. As such, the values returned from this method should
-        only be kept for one tick of the simulation (e.g., for querries)."""
-        return list(map(lambda id: Vehicle(id), self.getAllPendingVehicleIds()))
+        The objects are pooled and their liveness is tracked (see vehicles)."""
+        return [self._pooledVehicle(id) for id in self.getAllPendingVehicleIds()]
 
     @property
     def vehicleTypes(self) -> list[VehicleType]:
-        return list(map(lambda id: VehicleType(id), self.getAllVehicleTypeIds()))
+        return list(
+            map(
+                lambda id: VehicleType._fromPool(
+                    id, self._connection, self._vehicleTypes
+                ),
+                self.getAllVehicleTypeIds(),
+            )
+        )
+
+    def subscribeVehicleAttributes(self, attributes: list[str]) -> None:
+        """Subscribes the given Vehicle attributes (e.g., speed, edgeId) for all vehicles in the simulation.
+        The values of subscribed attributes are fetched in bulk once per simulation step, and
+        the Vehicle properties are served from that snapshot instead of doing one TraCI call each.
+        See Vehicle.subscribableAttributes for the available attributes."""
+        # once all vehicles are subscribed, the departing ones are subscribed on each step
+        vehicleIds = [] if self._subscribeAllVehicles else self.getAllVehicleIds()
+        self._subscribeAllVehicles = True
+        self._vehicleCache.subscribe(vehicleIds, self._toVariables(attributes))
+
+    def vehicleFrame(self, attributes: list[str]) -> Frame:
+        """Returns the current value of the given attributes for all vehicles in the simulation,
+        as a columnar Frame (one row per vehicle). The attributes are subscribed
+        (see subscribeVehicleAttributes), so the frame is built from the bulk subscription results.
+        """
+        variables = self._toVariables(attributes)
+        self.subscribeVehicleAttributes(attributes)
+        return Frame.fromSubscriptionResults(
+            list(self.getAllVehicleIds()),
+            attributes,
+            variables,
+            self._vehicleCache.results,
+        )
+
+    def _toVariables(self, attributes: list[str]) -> list[int]:
+        try:
+            return [Vehicle.subscribableAttributes[a] for a in attributes]
+        except KeyError as e:
+            raise ValueError(
+                f"The given attribute can't be subscribed: [attribute={e}]."
+            )
 
     def getVehicleType(self, vehicleTypeId: str) -> VehicleType:
         """Retrieves an object for each vehicle type currently in the simulation."""
-        if vehicleTypeId not in self.getAllVehicleTypeIds():
+        if (
+            vehicleTypeId not in self._vehicleTypes
+            and vehicleTypeId not in self.getAllVehicleTypeIds()
+        ):
             raise KeyError(
                 f"The vehicle type with the given ID does not exist: [vehicleTypeId={vehicleTypeId}]."
             )
-        return VehicleType(vehicleTypeId)
+        return VehicleType._fromPool(vehicleTypeId, self._connection, self._vehicleTypes)
+
+    def refreshVehicleTypes(self) -> None:
+        """Drops the cached attributes of all vehicle types (see VehicleType.refresh)."""
+        for vehicleType in self._vehicleTypes.values():
+            vehicleType.refresh()
 
     def getVehicle(self, vehicleId: str) -> Vehicle:
         """Retrieve a registered vehicle reference to a vehicle in the network.
@@ -60,7 +141,7 @@ class Users(SimUpdatable):
             return self._vehicles[vehicleId]
         except KeyError:
             if (
-                vehicleId in self.getAllVehicleIds()
+                vehicleId in self._runningVehicleIds
                 or vehicleId in self.getAllPendingVehicleIds()
             ):
                 return self._registerVehicle(vehicleId)
@@ -72,7 +153,7 @@ class Users(SimUpdatable):
         self,
         vehicleId: str,
         route: Union[Route, None] = None,
-        vehicleType: VehicleType = VehicleType("DEFAULT_VEHTYPE"),
+        vehicleType: Union[VehicleType, None] = None,
         personNumber: int = 0,
         personCapacity: int = 0,
         departTime: Union[str, float] = "now",
@@ -82,60 +163,297 @@ class Users(SimUpdatable):
         If the route is None, the vehicle will be added to a random network edge.
         If the route consists of two disconnected edges, the vehicle will be treated like
         a <trip> and use the fastest route between the two edges.
+        If the vehicle type is None, the default vehicle type (DEFAULT_VEHTYPE) is used.
         If depart time is the string 'now', the depart time is the same as the vehicle spawn.
         Negative values for depart time have special meanings:
             -1: 'triggered'
             -2: 'containerTriggered'
         """
         try:
-            traci.vehicle.add(
+            self._connection.vehicle.add(
                 vehicleId,
                 route.id if isinstance(route, Route) else "",
-                typeID=vehicleType.id,
+                typeID="DEFAULT_VEHTYPE" if vehicleType is None else vehicleType.id,
                 personNumber=personNumber,
                 personCapacity=personCapacity,
                 depart=str(departTime),
             )
             return self._registerVehicle(vehicleId)
-        except traci.TraCIException as e:
+        except _Backend.traciExceptions as e:
             raise KeyError(
                 f"A error occured while adding the vehicle with the given ID: [vehicleId={vehicleId}], [error={e}]."
             )
 
     def getRoute(self, routeId: str) -> Route:
-        if routeId not in traci.route.getIDList():
+        if routeId not in self._connection.route.getIDList():
             raise KeyError(
                 f"The given route ID doesn't belong to any registered route: [routeId={routeId}]"
             )
-        return Route(routeId)
+        return Route(routeId, self._connection)
 
     def createRouteFromIds(self, routeId: str, edgesIds: list[str]) -> Route:
         try:
-            traci.route.add(routeId, edgesIds)
-        except traci.TraCIException as e:
+            self._connection.route.add(routeId, edgesIds)
+        except _Backend.traciExceptions as e:
             raise KeyError(
                 f"A error occured while adding the route with the given ID: [vehicleId={routeId}], [error={e}]."
             )
-        return Route(routeId)
+        return Route(routeId, self._connection)
 
     def createRouteFromEdges(self, routeId: str, edges: list[Edge]) -> Route:
         return self.createRouteFromIds(routeId, list(map(lambda x: x.id, edges)))
 
+    def rerouteMany(
+        self,
+        vehicles: list[Vehicle],
+        by: Union[str, Router] = "travelTime",
+        algorithm: RoutingAlgorithm = RoutingAlgorithm.DIJKSTRA,
+    ) -> int:
+        """Reroutes the given vehicles to their current destination, computing each distinct route once.
+        The vehicles are grouped by (current edge, destination edge, vehicle type) and each group gets the
+        same route. With by="travelTime", the routes are computed by SUMO (like Vehicle.rerouteByTravelTime,
+        one simulation.findRoute per group). If by is a Router (see Network.createRouter), they are computed
+        in-process with the given algorithm (vehicle types are then ignored).
+        With by="travelTime", the routes are only cached for the current simulation step, since SUMO's travel
+        times follow the traffic. With a Router, they are cached until Network.weightsVersion or the router's
+        weights change.
+        The route, position and type of the running vehicles are subscribed (see subscribeVehicleAttributes)
+        and read from the snapshot of the last step, so each vehicle only costs one TraCI call (setRoute).
+        Vehicles whose destination can't be reached keep their route.
+        Returns the number of rerouted vehicles."""
+        if isinstance(by, Router):
+            router: Union[Router, None] = by
+        elif by == "travelTime":
+            router = None
+        else:
+            raise ValueError(
+                f"Vehicles can only be rerouted by travelTime or a Router: [by={by}]."
+            )
+        cacheKey = (
+            self._network.weightsVersion,
+            self._connection.simulation.getTime()
+            if router is None
+            else (id(router), router._version, algorithm),
+        )
+        if cacheKey != self._routeCacheKey:
+            self._routeCache.clear()
+            self._routeCacheKey = cacheKey
+
+        # the vehicles that didn't depart yet can't be subscribed (their values are fetched one by one)
+        self._vehicleCache.subscribe(
+            [vehicle.id for vehicle in vehicles if vehicle.id in self._runningVehicleIds],
+            [VAR_EDGES, VAR_ROUTE_INDEX, VAR_ROAD_ID, VAR_TYPE],
+        )
+        cache, domain = self._vehicleCache, self._connection.vehicle
+        rerouted = 0
+        for vehicle in vehicles:
+            routeEdgesIds: list[str] = cache.get(vehicle.id, VAR_EDGES, domain.getRoute)
+            routeIndex: int = cache.get(vehicle.id, VAR_ROUTE_INDEX, domain.getRouteIndex)
+            # vehicles that didn't depart yet have a route index of -1
+            routeIndex = max(routeIndex, 0)
+            # a vehicle crossing a junction is already committed to the next edge of its route
+            prefix: list[str] = []
+            if cache.get(vehicle.id, VAR_ROAD_ID, domain.getRoadID).startswith(":"):
+                prefix = list(routeEdgesIds[routeIndex : routeIndex + 1])
+                routeIndex += 1
+                if routeIndex >= len(routeEdgesIds):
+                    continue
+            origin = routeEdgesIds[routeIndex]
+            destination = routeEdgesIds[-1]
+            vehicleTypeId = (
+                "" if router is not None else cache.get(vehicle.id, VAR_TYPE, domain.getTypeID)
+            )
+            key = (origin, destination, vehicleTypeId)
+            try:
+                route = self._routeCache[key]
+            except KeyError:
+                route = self._findRoute(origin, destination, vehicleTypeId, router, algorithm)
+                self._routeCache[key] = route
+            if len(route) == 0:
+                continue
+            domain.setRoute(vehicle.id, prefix + route)
+            rerouted += 1
+        return rerouted
+
+    def _findRoute(
+        self,
+        origin: str,
+        destination: str,
+        vehicleTypeId: str,
+        router: Union[Router, None],
+        algorithm: RoutingAlgorithm,
+    ) -> list[str]:
+        """The IDs of the edges of the route (empty if the destination can't be reached)."""
+        if router is not None:
+            try:
+                route = router.findRoute(
+                    self._network.getEdge(origin),
+                    self._network.getEdge(destination),
+                    algorithm,
+                )
+            except KeyError:
+                return []
+            return [edge.id for edge in route]
+        try:
+            return list(
+                self._connection.simulation.findRoute(origin, destination, vType=vehicleTypeId).edges  # type: ignore
+            )
+        except _Backend.traciExceptions:
+            return []
+
     def _registerVehicle(self, vehicleId) -> Vehicle:
-        # subscribe stoped state byte (check liveness)
-        traci.vehicle.subscribe(vehicleId, [VAR_STOPSTATE])
+        # subscribe the subscribed attributes (if any)
+        self._vehicleCache.subscribe([vehicleId], [])
+        # a vehicle with the same ID may have been removed earlier in this step
+        self._removedVehicleIds.discard(vehicleId)
 
-        v = Vehicle(vehicleId)
+        v = Vehicle(vehicleId, self._connection, self._vehicleCache, self)
         self._vehicles[vehicleId] = v
         return v
 
+    def _lookupVehicles(self, vehicleIds: list[str]) -> list[Vehicle]:
+        """Returns the running vehicles with the given IDs, in the order of the vehicles property."""
+        found = [
+            vehicleId for vehicleId in vehicleIds if vehicleId in self._runningVehicleIds
+        ]
+        found.sort(key=lambda vehicleId: self._runningVehicleIds[vehicleId])
+        return [self._pooledVehicle(vehicleId) for vehicleId in found]
+
+    def _pooledVehicle(self, vehicleId: str) -> Vehicle:
+        try:
+            return self._vehicles[vehicleId]
+        except KeyError:
+            return self._registerVehicle(vehicleId)
+
+    def _vehicleRemoved(self, vehicleId: str) -> None:
+        self._removedVehicleIds.add(vehicleId)
+
+    def _vehicleExists(self, vehicleId: str) -> bool:
+        try:
+            self._connection.vehicle.getStopState(vehicleId)
+            return True
+        except _Backend.traciExceptions:
+            return False
+
     @override
     def _doSimulationStep(self, *args, step: int, time: float) -> None:
-        res: dict[str, dict] = traci.vehicle.getAllSubscriptionResults()  # type: ignore
+        events: dict[int, tuple[str, ...]] = self._connection.simulation.getSubscriptionResults()  # type: ignore
+        if self._subscribeAllVehicles:
+            self._vehicleCache.subscribe(events[VAR_DEPARTED_VEHICLES_IDS], [])
+        self._vehicleCache.update()
+
+        # teleporting vehicles aren't part of the running vehicles (like in vehicle.getIDList)
+        for vehicleId in chain(
+            events[VAR_DEPARTED_VEHICLES_IDS],
+            events[VAR_TELEPORT_ENDING_VEHICLES_IDS],
+        ):
+            self._runningVehicleIds[vehicleId] = next(self._departureCounter)
+        for vehicleId in events[VAR_TELEPORT_STARTING_VEHICLES_IDS]:
+            self._runningVehicleIds.pop(vehicleId, None)
+
         # the vehicles that exited the simulation on this step
-        vehiclesThatDied: set[str] = self._vehicles.keys() - res.keys()
+        vehiclesThatDied: set[str] = self._removedVehicleIds.union(
+            events[VAR_ARRIVED_VEHICLES_IDS]
+        )
+        self._removedVehicleIds.clear()
+        # colliding/teleporting vehicles may have been removed (depends on the configured action)
+        for vehicleId in chain(
+            events[VAR_COLLIDING_VEHICLES_IDS],
+            events[VAR_TELEPORT_STARTING_VEHICLES_IDS],
+        ):
+            if vehicleId in self._vehicles and not self._vehicleExists(vehicleId):
+                vehiclesThatDied.add(vehicleId)
+        self._markDead(vehiclesThatDied)
+
+        # safety net for removals that don't show up in the events (e.g., made outside TraSMAPy)
+        if len(self._runningVehicleIds) != self._connection.vehicle.getIDCount():
+            self._resyncVehicles()
+
+    def _fastForwarded(self) -> None:
+        """Called after several steps ran at once. The events of the skipped steps are lost,
+        so the running vehicles are read from the simulation again."""
+        self._removedVehicleIds.clear()
+        self._resyncVehicles()
+        # the vehicles that left during the skipped steps
+        self._vehicleCache.forget(
+            [
+                vehicleId
+                for vehicleId in self._vehicleCache.subscribedIds
+                if vehicleId not in self._runningVehicleIds
+            ]
+        )
+        if self._subscribeAllVehicles:
+            self._vehicleCache.subscribe(
+                [
+                    vehicleId
+                    for vehicleId in self._runningVehicleIds
+                    if vehicleId not in self._vehicleCache.results
+                ],
+                [],
+            )
+
+    def _stateLoaded(self) -> None:
+        """Called after a simulation state is loaded (see TraSMAPy.fromCheckpoint).
+        The vehicles (and their subscriptions) are replaced by the ones in the state."""
+        self._subscribeEvents()
+        for vehicle in self._vehicles.values():
+            vehicle._dead = True
+        self._vehicles.clear()
+        self._removedVehicleIds.clear()
+        self._resyncVehicles()
+        self._vehicleCache.forget()
+        if self._subscribeAllVehicles:
+            self._vehicleCache.subscribe(self._runningVehicleIds, [])
 
-        for vehicleId in vehiclesThatDied:
-            # garanteed to be in the map (doesn't need catch)
-            v = self._vehicles.pop(vehicleId)
+    def _restoreVehicle(self, vehicleId: str, dead: bool) -> Vehicle:
+        """Returns the vehicle with the given ID in the loaded state (a dead object if it isn't there)."""
+        if not dead and (
+            vehicleId in self._runningVehicleIds
+            or vehicleId in self.getAllPendingVehicleIds()
+        ):
+            return self._pooledVehicle(vehicleId)
+        v = Vehicle(vehicleId, self._connection, self._vehicleCache, self)
+        v._dead = True
+        return v
+
+    def _subscribeEvents(self) -> None:
+        # liveness is tracked from the simulation's departed/arrived/... lists (one subscription),
+        # so the per-step work only depends on the vehicles that changed state
+        self._connection.simulation.subscribe(
+            [
+                VAR_DEPARTED_VEHICLES_IDS,
+                VAR_ARRIVED_VEHICLES_IDS,
+                VAR_COLLIDING_VEHICLES_IDS,
+                VAR_TELEPORT_STARTING_VEHICLES_IDS,
+                VAR_TELEPORT_ENDING_VEHICLES_IDS,
+            ]
+        )
+
+    def _markDead(self, vehicleIds) -> None:
+        self._vehicleCache.forget(vehicleIds)
+        for vehicleId in vehicleIds:
+            self._runningVehicleIds.pop(vehicleId, None)
+            try:
+                v = self._vehicles.pop(vehicleId)
+            except KeyError:
+                # never accessed
+                continue
             v._dead = True
+
+    def _resyncVehicles(self) -> None:
+        self._runningVehicleIds = {
+            vehicleId: next(self._departureCounter)
+            for vehicleId in self._connection.vehicle.getIDList()  # type: ignore
+        }
+        # the pooled vehicles that aren't running may still be loaded (waiting to depart or teleporting)
+        notRunning = [
+            vehicleId
+            for vehicleId in self._vehicles
+            if vehicleId not in self._runningVehicleIds
+        ]
+        if len(notRunning) == 0:
+            return
+        loadedVehicleIds = set(self._connection.vehicle.getLoadedIDList())  # type: ignore
+        self._markDead(
+            [vehicleId for vehicleId in notRunning if vehicleId not in loadedVehicleIds]
+        )
@@ -1,9 +1,32 @@
 import functools
 from typing_extensions import override
 
-import traci
-
+from traci.constants import (
+    VAR_VEHICLECLASS,
+    VAR_TYPE,
+    VAR_PERSON_NUMBER,
+    VAR_SPEED,
+    VAR_SPEED_LAT,
+    VAR_ALLOWED_SPEED,
+    VAR_ACCELERATION,
+    VAR_ROAD_ID,
+    VAR_LANE_ID,
+    VAR_DISTANCE,
+    VAR_CO2EMISSION,
+    VAR_COEMISSION,
+    VAR_HCEMISSION,
+    VAR_PMXEMISSION,
+    VAR_NOXEMISSION,
+    VAR_FUELCONSUMPTION,
+    VAR_ELECTRICITYCONSUMPTION,
+    VAR_NOISEEMISSION,
+    VAR_TIMELOSS,
+    VAR_STOPSTATE,
+)
+
+from trasmapy import _Backend
 from trasmapy._IdentifiedObject import IdentifiedObject
+from trasmapy._SubscriptionCache import SubscriptionCache
 from trasmapy.color._Colorable import Colorable, Color
 from trasmapy.network._Stop import Stop
 from trasmapy.network._Edge import Edge
@@ -17,6 +40,29 @@ from trasmapy.users._VehicleStop import VehicleStop
 
 
 class Vehicle(IdentifiedObject, Colorable):
+    subscribableAttributes: dict[str, int] = {
+        "vehicleClass": VAR_VEHICLECLASS,
+        "vehicleType": VAR_TYPE,
+        "personCount": VAR_PERSON_NUMBER,
+        "speed": VAR_SPEED,
+        "lateralSpeed": VAR_SPEED_LAT,
+        "allowedSpeed": VAR_ALLOWED_SPEED,
+        "acceleration": VAR_ACCELERATION,
+        "edgeId": VAR_ROAD_ID,
+        "laneId": VAR_LANE_ID,
+        "drivenDistance": VAR_DISTANCE,
+        "CO2Emissions": VAR_CO2EMISSION,
+        "COEmissions": VAR_COEMISSION,
+        "HCEmissions": VAR_HCEMISSION,
+        "PMxEmissions": VAR_PMXEMISSION,
+        "NOxEmissions": VAR_NOXEMISSION,
+        "fuelConsumption": VAR_FUELCONSUMPTION,
+        "electricityConsumption": VAR_ELECTRICITYCONSUMPTION,
+        "noiseEmission": VAR_NOISEEMISSION,
+        "timeLoss": VAR_TIMELOSS,
+    }
+    """The attributes that can be served from a per-step subscription (see Users.subscribeVehicleAttributes)."""
+
     @staticmethod
     def _checkVehicleExistance(method):
         @functools.wraps(method)
@@ -29,66 +75,84 @@ class Vehicle(IdentifiedObject, Colorable):
 
         return decorated
 
-    def __init__(self, vehicleId: str):
+    def __init__(
+        self,
+        vehicleId: str,
+        connection,
+        cache: SubscriptionCache,
+        users,
+    ):
         super().__init__(vehicleId)
+        self._connection = connection
+        self._cache = cache
+        # the Users that created this object (vehicle type pool and liveness tracking)
+        self._users = users
         self._dead: bool = False
 
     @property
     @_checkVehicleExistance
     def vehicleClass(self) -> VehicleClass:
-        return VehicleClass(traci.vehicle.getVehicleClass(self.id))
+        return VehicleClass(
+            self._cache.get(
+                self.id, VAR_VEHICLECLASS, self._connection.vehicle.getVehicleClass
+            )
+        )
 
     @property
     @_checkVehicleExistance
     def vehicleType(self) -> VehicleType:
-        return VehicleType(traci.vehicle.getTypeID(self.id))  # type: ignore
+        return VehicleType._fromPool(
+            self._cache.get(self.id, VAR_TYPE, self._connection.vehicle.getTypeID),  # type: ignore
+            self._connection,
+            self._users._vehicleTypes,
+        )
 
     @vehicleType.setter
     @_checkVehicleExistance
     def vehicleType(self, newType: VehicleType) -> None:
         """Sets the vehicle type ID."""
-        if isinstance(newType, str):
-            traci.vehicle.setType(self.id, newType)
-        elif isinstance(newType, VehicleType):
-            traci.vehicle.setType(self.id, newType.id)
-        else:
+        if isinstance(newType, VehicleType):
+            newType = newType.id
+        elif not isinstance(newType, str):
             raise ValueError("type needs to be a VehicleType instance or a string.")
+        self._connection.vehicle.setType(self.id, newType)
+        self._cache.set(self.id, VAR_TYPE, newType)
 
     @property
     @_checkVehicleExistance
     def emissionClass(self) -> str:
-        return traci.vehicle.getEmissionClass(self.id)  # type: ignore
+        return self._connection.vehicle.getEmissionClass(self.id)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def shapeClass(self) -> str:
-        return traci.vehicle.getShapeClass(self.id)  # type: ignore
+        return self._connection.vehicle.getShapeClass(self.id)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def personCapacity(self) -> int:
         """Returns the person capacity of the vehicle."""
-        return traci.vehicle.getPersonCapacity(self.id)  # type: ignore
+        return self._connection.vehicle.getPersonCapacity(self.id)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def personCount(self) -> int:
         """Returns the number of people inside the vehicle."""
-        return traci.vehicle.getPersonNumber(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_PERSON_NUMBER, self._connection.vehicle.getPersonNumber)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def speed(self) -> float:
         """Returns the speed of the vehicle within the last step (m/s).
         Error value: -2^30"""
-        return traci.vehicle.getSpeed(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_SPEED, self._connection.vehicle.getSpeed)  # type: ignore
 
     @speed.setter
     @_checkVehicleExistance
     def speed(self, newVal: float) -> None:
         """Sets the vehicle speed (m/s). It may drive slower according to the speed mode (safety rules)."""
         if isinstance(newVal, float) or isinstance(newVal, int):
-            traci.vehicle.setSpeed(self.id, newVal)
+            self._connection.vehicle.setSpeed(self.id, newVal)
         else:
             raise ValueError("speed needs to be a number (int/float data type).")
 
@@ -97,19 +161,19 @@ class Vehicle(IdentifiedObject, Colorable):
     def lateralSpeed(self) -> float:
         """Returns the lateral speed of the vehicle within the last step (m/s).
         Error value: -2^30"""
-        return traci.vehicle.getLateralSpeed(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_SPEED_LAT, self._connection.vehicle.getLateralSpeed)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def allowedSpeed(self) -> float:
         """Returns the maximum allowed speed of the lane the vehicle is in (m/s)."""
-        return traci.vehicle.getAllowedSpeed(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_ALLOWED_SPEED, self._connection.vehicle.getAllowedSpeed)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def acceleration(self) -> float:
         """Returns the acceleration in the previous time step (m/s^2)."""
-        return traci.vehicle.getAcceleration(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_ACCELERATION, self._connection.vehicle.getAcceleration)  # type: ignore
 
     @_checkVehicleExistance
     def setAcceleration(self, newAccel: float, duration: float) -> None:
@@ -118,13 +182,13 @@ class Vehicle(IdentifiedObject, Colorable):
             raise ValueError("Acceleration needs to be a number (int/float data type).")
         if not (isinstance(duration, float) or isinstance(duration, int)):
             raise ValueError("Duration needs to be a number (int/float data type).")
-        traci.vehicle.setAcceleration(self.id, newAccel, duration)
+        self._connection.vehicle.setAcceleration(self.id, newAccel, duration)
 
     @property
     @_checkVehicleExistance
     def doRerouting(self) -> bool:
         """Returns whether the vehicle is able to do automatic rerouting."""
-        return traci.vehicle.getParameter(self.id, "has.rerouting.device")  # type: ignore
+        return self._connection.vehicle.getParameter(self.id, "has.rerouting.device")  # type: ignore
 
     @doRerouting.setter
     @_checkVehicleExistance
@@ -132,38 +196,40 @@ class Vehicle(IdentifiedObject, Colorable):
         """Sets whether or not the vehicle is able to do automatic rerouting."""
         if not isinstance(isRerouting, bool):
             raise ValueError("isRerouting needs to be a bool.")
-        traci.vehicle.setParameter(self.id, "has.rerouting.device", isRerouting)
+        self._connection.vehicle.setParameter(
+            self.id, "has.rerouting.device", isRerouting
+        )
 
     def rerouteByTravelTime(self) -> None:
         """Computes a new route to the current destination that minimizes travel time.
         The assumed values for each edge in the network can be customized in various ways.
         See Simulation/Routing#Travel-time_values_for_routing.
         Replaces the current route by the found."""
-        traci.vehicle.rerouteTraveltime(self.id)
+        self._connection.vehicle.rerouteTraveltime(self.id)
 
     def rerouteByEffort(self) -> None:
         """Computes a new route using the vehicle's internal and the global edge effort information.
         Replaces the current route by the found."""
-        traci.vehicle.rerouteEffort(self.id)
+        self._connection.vehicle.rerouteEffort(self.id)
 
     @property
     @_checkVehicleExistance
     def edgeId(self) -> str:
         """Returns the ID of the edge the vehicle was in the previous time step."""
-        return traci.vehicle.getRoadID(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_ROAD_ID, self._connection.vehicle.getRoadID)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def laneId(self) -> str:
         """Returns the ID of the lane the vehicle was in the previous time step."""
-        return traci.vehicle.getLaneID(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_LANE_ID, self._connection.vehicle.getLaneID)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def drivenDistance(self) -> float:
         """Returns the distance the vehicle has already driven (m).
         Error value: -2^30"""
-        return traci.vehicle.getDistance(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_DISTANCE, self._connection.vehicle.getDistance)  # type: ignore
 
     @property
     @_checkVehicleExistance
@@ -171,7 +237,7 @@ class Vehicle(IdentifiedObject, Colorable):
         """Returns the vehicle's CO2 emissions during this time step (mg/s).
         To get the value for one step multiply with the step length.
         Error value: -2^30"""
-        return traci.vehicle.getCO2Emission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_CO2EMISSION, self._connection.vehicle.getCO2Emission)  # type: ignore
 
     @property
     @_checkVehicleExistance
@@ -179,7 +245,7 @@ class Vehicle(IdentifiedObject, Colorable):
         """Returns the vehicle's CO emissions during this time step (mg/s).
         To get the value for one step multiply with the step length.
         Error value: -2^30"""
-        return traci.vehicle.getCOEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_COEMISSION, self._connection.vehicle.getCOEmission)  # type: ignore
 
     @property
     @_checkVehicleExistance
@@ -187,7 +253,7 @@ class Vehicle(IdentifiedObject, Colorable):
         """Returns the vehicle's HC emissions during this time step (mg/s).
         To get the value for one step multiply with the step length.
         Error value: -2^30"""
-        return traci.vehicle.getHCEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_HCEMISSION, self._connection.vehicle.getHCEmission)  # type: ignore
 
     @property
     @_checkVehicleExistance
@@ -195,7 +261,7 @@ class Vehicle(IdentifiedObject, Colorable):
         """Returns the vehicle's PMx emissions during this time step (mg/s).
         To get the value for one step multiply with the step length.
         Error value: -2^30"""
-        return traci.vehicle.getPMxEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_PMXEMISSION, self._connection.vehicle.getPMxEmission)  # type: ignore
 
     @property
     @_checkVehicleExistance
@@ -203,7 +269,7 @@ class Vehicle(IdentifiedObject, Colorable):
         """Returns the vehicle's NOx emissions during this time step (mg/s).
         To get the value for one step multiply with the step length.
         Error value: -2^30"""
-        return traci.vehicle.getNOxEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_NOXEMISSION, self._connection.vehicle.getNOxEmission)  # type: ignore
 
     @property
     @_checkVehicleExistance
@@ -211,7 +277,7 @@ class Vehicle(IdentifiedObject, Colorable):
         """Returns the vehicle's NOx emissions during this time step (ml/s).
         To get the value for one step multiply with the step length.
         Error value: -2^30"""
-        return traci.vehicle.getFuelConsumption(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_FUELCONSUMPTION, self._connection.vehicle.getFuelConsumption)  # type: ignore
 
     @property
     @_checkVehicleExistance
@@ -219,45 +285,45 @@ class Vehicle(IdentifiedObject, Colorable):
         """Returns the vehicle's electricity consumption during this time step (Wh/s).
         To get the value for one step multiply with the step length.
         Error value: -2^30"""
-        return traci.vehicle.getElectricityConsumption(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_ELECTRICITYCONSUMPTION, self._connection.vehicle.getElectricityConsumption)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def noiseEmission(self) -> float:
         """Returns the noise generated by the vehicle (dBA).
         Error value: -2^30"""
-        return traci.vehicle.getNoiseEmission(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_NOISEEMISSION, self._connection.vehicle.getNoiseEmission)  # type: ignore
 
     @property
     @_checkVehicleExistance
     def timeLoss(self) -> float:
-        return traci.vehicle.getTimeLoss(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_TIMELOSS, self._connection.vehicle.getTimeLoss)  # type: ignore
 
     @property
     @override
     @_checkVehicleExistance
     def color(self) -> Color:
-        return Color(*traci.vehicle.getColor(self.id))
+        return Color(*self._connection.vehicle.getColor(self.id))
 
     @color.setter
     @override
     @_checkVehicleExistance
     def color(self, color: Color) -> None:
-        traci.vehicle.setColor(self.id, color.colorTupleA)
+        self._connection.vehicle.setColor(self.id, color.colorTupleA)
 
     @property
     @_checkVehicleExistance
     def via(self) -> list[str]:
         """Returns the list of IDs via edges (edge it needs to pass through in the route)
         for the vehicle."""
-        return traci.vehicle.getVia(self.id)  # type: ignore
+        return self._connection.vehicle.getVia(self.id)  # type: ignore
 
     @via.setter
     @_checkVehicleExistance
     def via(self, vias: list[str]) -> None:
         """Sets the via edges for the vehicle."""
         if isinstance(vias, list):
-            traci.vehicle.setVia(self.id, vias)
+            self._connection.vehicle.setVia(self.id, vias)
         else:
             raise ValueError("vias needs to be a list of IDs (list of strings).")
 
@@ -265,11 +331,11 @@ class Vehicle(IdentifiedObject, Colorable):
         return self._dead
 
     def isPending(self) -> bool:
-        return self.id in traci.simulation.getPendingVehicles()
+        return self.id in self._connection.simulation.getPendingVehicles()
 
     @_checkVehicleExistance
     def _getStopState(self) -> int:
-        return traci.vehicle.getStopState(self.id)  # type: ignore
+        return self._cache.get(self.id, VAR_STOPSTATE, self._connection.vehicle.getStopState)  # type: ignore
 
     def isStoppedAnyReason(self) -> bool:
         """Returns whether the vehicle's is stopped state for any reason (any stopped state)"""
@@ -310,7 +376,7 @@ class Vehicle(IdentifiedObject, Colorable):
     @_checkVehicleExistance
     def getStops(self) -> list[VehicleStop]:
         stops: list[VehicleStop] = []
-        for stopData in traci.vehicle.getStops(self.id):
+        for stopData in self._connection.vehicle.getStops(self.id):
             stops.append(VehicleStop(stopData))
         return stops
 
@@ -321,7 +387,7 @@ class Vehicle(IdentifiedObject, Colorable):
         Setting the duration to 0 cancels an existing stop.
         Note that it might not be possible for a vehicle to stop at a given place because of access restrictions."""
         try:
-            traci.vehicle.setStop(
+            self._connection.vehicle.setStop(
                 self.id,
                 scheduledStop.stop.id,
                 laneIndex=scheduledStop.stop.laneIndex,
@@ -331,7 +397,7 @@ class Vehicle(IdentifiedObject, Colorable):
                 until=scheduledStop.until,
                 flags=functools.reduce(lambda x, y: x | y, scheduledStop.stopTypes),
             )
-        except traci.TraCIException as e:
+        except _Backend.traciExceptions as e:
             raise ValueError(
                 f"It isn't possible for the vehicle to stop there: [vehicleId={self.id}], [error={e}]"
             )
@@ -356,7 +422,7 @@ class Vehicle(IdentifiedObject, Colorable):
         """Resumes the march of a stopped vehicle.
         Throws exception if the vehicle isn't stopped."""
         if self.isStoppedAnyReason():
-            traci.vehicle.resume(self.id)
+            self._connection.vehicle.resume(self.id)
         else:
             raise ValueError(
                 f"The vehicle isn't stopped, so it can't resume: [vehicleId={self.id}]"
@@ -367,13 +433,26 @@ class Vehicle(IdentifiedObject, Colorable):
         self, laneId: str, pos: float, reason: MoveReason = MoveReason.AUTOMATIC
     ) -> None:
         """Move a vehicle to a new position along its current route."""
-        traci.vehicle.moveTo(self.id, laneId, pos, reason.value)
+        self._connection.vehicle.moveTo(self.id, laneId, pos, reason.value)
 
     @_checkVehicleExistance
     def remove(self, reason: RemoveReason = RemoveReason.VAPORIZED) -> None:
         self._dead = True
-        traci.vehicle.remove(self.id, reason=reason)
+        self._connection.vehicle.remove(self.id, reason=reason)
+        self._users._vehicleRemoved(self.id)
+
+    @_checkVehicleExistance
+    def setRoute(self, route: list[Edge]) -> None:
+        """Replaces the route of the vehicle by the given edges (e.g., found by a Router).
+        The first edge must be the edge the vehicle is currently on.
+        Raises ValueError if the route can't be applied."""
+        try:
+            self._connection.vehicle.setRoute(self.id, [edge.id for edge in route])
+        except _Backend.traciExceptions as e:
+            raise ValueError(
+                f"The route can't be applied to the vehicle: [vehicleId={self.id}], [error={e}]."
+            )
 
     @_checkVehicleExistance
     def changeTargetEdge(self, targedEdge: Edge) -> None:
-        traci.vehicle.changeTarget(self.id, targedEdge.id)
+        self._connection.vehicle.changeTarget(self.id, targedEdge.id)
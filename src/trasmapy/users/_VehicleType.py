@@ -1,51 +1,67 @@
 from typing_extensions import override
-import traci
 
 from trasmapy._IdentifiedObject import IdentifiedObject
+from trasmapy._CachedAttributes import CachedAttributes
 from trasmapy.color._Colorable import Colorable, Color
 from trasmapy.users.VehicleClass import VehicleClass
 
-class VehicleType(IdentifiedObject, Colorable):
-    def __init__(self, typeId: str) -> None:
-        super().__init__(typeId)
+class VehicleType(IdentifiedObject, Colorable, CachedAttributes):
+    def __init__(self, typeId: str, connection, typePool: dict) -> None:
+        """Use _fromPool, so there's only one object (and attribute cache) per vehicle type."""
+        IdentifiedObject.__init__(self, typeId)
+        CachedAttributes.__init__(self)
+        self._connection = connection
+        self._typePool: dict[str, VehicleType] = typePool
+
+    @classmethod
+    def _fromPool(cls, typeId: str, connection, typePool: dict):
+        """Returns the object of the given vehicle type in the pool (creating it if needed)."""
+        try:
+            return typePool[typeId]
+        except KeyError:
+            vehicleType = cls(typeId, connection, typePool)
+            typePool[typeId] = vehicleType
+            return vehicleType
 
     def duplicate(self, cloneId: str):
-        if cloneId in traci.vehicletype.getIDList():
+        if cloneId in self._connection.vehicletype.getIDList():
             raise ValueError(
                 f"There's already a vehicle type with the given ID: [TypeId={cloneId}]"
             )
 
-        traci.vehicletype.copy(self.id, cloneId)
-        return VehicleType(cloneId)
+        self._connection.vehicletype.copy(self.id, cloneId)
+        return VehicleType._fromPool(cloneId, self._connection, self._typePool)
 
     @property
     def length(self) -> float:
         """Returns the length of the vehicles of this type (m)."""
-        return traci.vehicletype.getLength(self.id)  # type: ignore
+        return self._getCached("length", self._connection.vehicletype.getLength)
 
     @length.setter
     def length(self, newVal: float) -> None:
         """Sets the length of the vehicles of this type (m)."""
         if not (isinstance(newVal, float) or isinstance(newVal, int)):
             raise ValueError("Length needs to be a number (int/float data type).")
-        traci.vehicletype.setLength(self.id, newVal)
+        self._connection.vehicletype.setLength(self.id, newVal)
+        self._setCached("length", newVal)
 
     @property
     def maxSpeed(self) -> float:
         """Returns the maximum speed of the vehicles of this type (m/s)."""
-        return traci.vehicletype.getMaxSpeed(self.id)  # type: ignore
+        return self._getCached("maxSpeed", self._connection.vehicletype.getMaxSpeed)
 
     @maxSpeed.setter
     def maxSpeed(self, newVal: float) -> None:
         """Sets the maximum speed of the vehicles of this type (m/s)."""
         if not (isinstance(newVal, float) or isinstance(newVal, int)):
             raise ValueError("MaxSpeed needs to be a number (int/float data type).")
-        traci.vehicletype.setMaxSpeed(self.id, newVal)
+        self._connection.vehicletype.setMaxSpeed(self.id, newVal)
+        self._setCached("maxSpeed", newVal)
 
     @property
     def maxLateralSpeed(self) -> float:
         """Returns the maximum lateral speed of the vehicles of this type (m/s)."""
-        return traci.vehicletype.getMaxSpeedLat(self.id)  # type: ignore
+        return self._getCached("maxLateralSpeed", self._connection.vehicletype.getMaxSpeedLat)
 
     @maxLateralSpeed.setter
     def maxLateralSpeed(self, newVal: float) -> None:
@@ -54,12 +70,13 @@ class VehicleType(IdentifiedObject, Colorable):
             raise ValueError(
                 "MaxLateralSpeed needs to be a number (int/float data type)."
             )
-        traci.vehicletype.setMaxSpeedLat(self.id, newVal)
+        self._connection.vehicletype.setMaxSpeedLat(self.id, newVal)
+        self._setCached("maxLateralSpeed", newVal)
 
     @property
     def maxAcceleration(self) -> float:
         """Returns the maximum acceleration of the vehicles of this type (m/s^2)."""
-        return traci.vehicletype.getAccel(self.id)  # type: ignore
+        return self._getCached("maxAcceleration", self._connection.vehicletype.getAccel)
 
     @maxAcceleration.setter
     def maxAcceleration(self, newVal: float) -> None:
@@ -68,12 +85,13 @@ class VehicleType(IdentifiedObject, Colorable):
             raise ValueError(
                 "MaxAcceleration needs to be a number (int/float data type)."
             )
-        traci.vehicletype.setAccel(self.id, newVal)
+        self._connection.vehicletype.setAccel(self.id, newVal)
+        self._setCached("maxAcceleration", newVal)
 
     @property
     def maxDeceleration(self) -> float:
         """Returns the maximum deceleration of the vehicles of this type (m/s^2)."""
-        return traci.vehicletype.getDecel(self.id)  # type: ignore
+        return self._getCached("maxDeceleration", self._connection.vehicletype.getDecel)
 
     @maxDeceleration.setter
     def maxDeceleration(self, newVal: float) -> None:
@@ -82,54 +100,61 @@ class VehicleType(IdentifiedObject, Colorable):
             raise ValueError(
                 "MaxDeceleration needs to be a number (int/float data type)."
             )
-        traci.vehicletype.setDecel(self.id, newVal)
+        self._connection.vehicletype.setDecel(self.id, newVal)
+        self._setCached("maxDeceleration", newVal)
 
     @property
     def vehicleClass(self) -> VehicleClass:
-        return VehicleClass(traci.vehicletype.getVehicleClass(self.id))
+        return VehicleClass(
+            self._getCached("vehicleClass", self._connection.vehicletype.getVehicleClass)
+        )
 
     @vehicleClass.setter
     def vehicleClass(self, newVal: VehicleClass) -> None:
         if not isinstance(newVal, VehicleClass):
             raise ValueError("MaxDeceleration needs to be an instance of VehicleClass.")
-        traci.vehicletype.setVehicleClass(self.id, newVal.value)
+        self._connection.vehicletype.setVehicleClass(self.id, newVal.value)
+        self._setCached("vehicleClass", newVal.value)
 
     @property
     def emissionClass(self) -> str:
-        return traci.vehicletype.getEmissionClass(self.id)  # type: ignore
+        return self._getCached("emissionClass", self._connection.vehicletype.getEmissionClass)
 
     @emissionClass.setter
     def emissionClass(self, newVal: str) -> None:
         if not isinstance(newVal, str):
             raise ValueError("EmissionClass needs to be a string.")
-        traci.vehicletype.setEmissionClass(self.id, newVal)
+        self._connection.vehicletype.setEmissionClass(self.id, newVal)
+        self._setCached("emissionClass", newVal)
 
     @property
     def shape(self) -> str:
-        return traci.vehicletype.getShapeClass(self.id)  # type: ignore
+        return self._getCached("shape", self._connection.vehicletype.getShapeClass)
 
     @shape.setter
     def shape(self, newVal: str) -> None:
         if not isinstance(newVal, str):
             raise ValueError("Shape needs to be a string.")
-        traci.vehicletype.setShapeClass(self.id, newVal)
+        self._connection.vehicletype.setShapeClass(self.id, newVal)
+        self._setCached("shape", newVal)
 
     @property
     def minGap(self) -> float:
         """Returns the offset (gap to front vehicle if halting) of vehicles of this type (m)."""
-        return traci.vehicletype.getMinGap(self.id)  # type: ignore
+        return self._getCached("minGap", self._connection.vehicletype.getMinGap)
 
     @minGap.setter
     def minGap(self, newVal: float) -> None:
         """Sets the offset (gap to front vehicle if halting) of vehicles of this type (m)."""
         if not (isinstance(newVal, float) or isinstance(newVal, int)):
             raise ValueError("MinGap needs to be a number (int/float data type).")
-        traci.vehicletype.setMinGap(self.id, newVal)
+        self._connection.vehicletype.setMinGap(self.id, newVal)
+        self._setCached("minGap", newVal)
 
     @property
     def minLateralGap(self) -> float:
         """Returns the desired lateral gap of vehicles of this type at 50 km/h (m)."""
-        return traci.vehicletype.getMinGapLat(self.id)  # type: ignore
+        return self._getCached("minLateralGap", self._connection.vehicletype.getMinGapLat)
 
     @minLateralGap.setter
     def minLateralGap(self, newVal: float) -> None:
@@ -138,62 +163,68 @@ class VehicleType(IdentifiedObject, Colorable):
             raise ValueError(
                 "MinLateralGap needs to be a number (int/float data type)."
             )
-        traci.vehicletype.setMinGapLat(self.id, newVal)
+        self._connection.vehicletype.setMinGapLat(self.id, newVal)
+        self._setCached("minLateralGap", newVal)
 
     @property
     def width(self) -> float:
         """Returns the width of vehicles of this type (m)."""
-        return traci.vehicletype.getWidth(self.id)  # type: ignore
+        return self._getCached("width", self._connection.vehicletype.getWidth)
 
     @width.setter
     def width(self, newVal: float) -> None:
         """Sets the width of vehicles of this type (m)."""
         if not (isinstance(newVal, float) or isinstance(newVal, int)):
             raise ValueError("Width needs to be a number (int/float data type).")
-        traci.vehicletype.setWidth(self.id, newVal)
+        self._connection.vehicletype.setWidth(self.id, newVal)
+        self._setCached("width", newVal)
 
     @property
     def height(self) -> float:
         """Returns the height of vehicles of this type (m)."""
-        return traci.vehicletype.getHeight(self.id)  # type: ignore
+        return self._getCached("height", self._connection.vehicletype.getHeight)
 
     @height.setter
     def height(self, newVal: float) -> None:
         """Sets the height of vehicles of this type (m)."""
         if not (isinstance(newVal, float) or isinstance(newVal, int)):
             raise ValueError("Height needs to be a number (int/float data type).")
-        traci.vehicletype.setHeight(self.id, newVal)
+        self._connection.vehicletype.setHeight(self.id, newVal)
+        self._setCached("height", newVal)
 
     @property
     def personCapacity(self) -> float:
         """Returns the total number of people that can ride in a vehicle of this type at the same time."""
-        return traci.vehicletype.getPersonCapacity(self.id)  # type: ignore
+        return self._getCached("personCapacity", self._connection.vehicletype.getPersonCapacity)
 
     @personCapacity.setter
     def personCapacity(self, newVal: int) -> None:
         """Sets the total number of people that can ride in a vehicle of this type at the same time."""
         if not isinstance(newVal, int):
             raise ValueError("PersonCapacity needs to be an int.")
-        traci.vehicletype.setPersonCapacity(self.id, newVal)  # type: ignore
+        self._connection.vehicletype.setPersonCapacity(self.id, newVal)  # type: ignore
+        self._setCached("personCapacity", newVal)
 
     @property
     def scale(self) -> float:
         """Returns the traffic scaling factor of vehicles of this type."""
-        return traci.vehicletype.getScale(self.id)  # type: ignore
+        return self._getCached("scale", self._connection.vehicletype.getScale)
 
     @scale.setter
     def scale(self, newVal: float) -> None:
         """Sets the traffic scaling factor of vehicles of this type."""
         if not (isinstance(newVal, float) or isinstance(newVal, int)):
             raise ValueError("Scale needs to be a number (int/float data type).")
-        traci.vehicletype.setScale(self.id, newVal)
+        self._connection.vehicletype.setScale(self.id, newVal)
+        self._setCached("scale", newVal)
 
     @property
     @override
     def color(self) -> Color:
-        return Color(*traci.vehicletype.getColor(self.id))
+        return Color(*self._getCached("color", self._connection.vehicletype.getColor))
 
     @color.setter
     @override
     def color(self, color: Color) -> None:
-        traci.vehicletype.setColor(self.id, color.colorTupleA)
+        self._connection.vehicletype.setColor(self.id, color.colorTupleA)
+        self._setCached("color", color.colorTupleA)
@@ -0,0 +1,131 @@
+import pytest
+
+from trasmapy._QueryOptimizer import IndexedLookup, QueryOptimizer, _predicateIds
+
+
+def _lookup(ids: list[str]) -> list[str]:
+    return [id for id in ids if id != "missing"]
+
+
+@pytest.fixture
+def optimizer() -> QueryOptimizer:
+    return QueryOptimizer(
+        {
+            ("network", "edges"): _lookup,
+            ("network", "lanes"): _lookup,
+            ("users", "vehicles"): _lookup,
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "predicate, ids",
+    [
+        ("self.id == 'a'", ["a"]),
+        ('self.id == "a"', ["a"]),
+        ("'a' == self.id", ["a"]),
+        ("  self.id=='a'  ", ["a"]),
+        ("self.id == 'a' and self.speed > 1", ["a"]),
+        ("self.id in ['a', 'b']", ["a", "b"]),
+        ("self.id in ('a', 'b')", ["a", "b"]),
+        ("self.id in {'a'}", ["a"]),
+        ("self.id in ['a', 'b', 'a']", ["a", "b"]),
+        ("self.id in ['a'] and self.speed > 1", ["a"]),
+        ("self.id in []", []),
+    ],
+)
+def test_predicateIds(predicate, ids):
+    assert _predicateIds(predicate) == ids
+
+
+@pytest.mark.parametrize(
+    "predicate",
+    [
+        # only the first conjunct can select the IDs
+        "self.speed > 1 and self.id == 'a'",
+        # an or anywhere in the rest may select other objects
+        "self.id == 'a' or self.id == 'b'",
+        "self.id == 'a' and self.speed > 1 or self.speed < 0",
+        "self.id in ['a'] and self.speed > 1 or True",
+        # not an ID equality/membership
+        "self.id != 'a'",
+        "self.name == 'a'",
+        "self.id == other",
+        "self.id in names",
+        "self.id in [1, 2]",
+        "self.id in ['a', b]",
+    ],
+)
+def test_predicateIdsUnsupported(predicate):
+    assert _predicateIds(predicate) is None
+
+
+def test_rewriteEquality(optimizer):
+    query, bindings = optimizer.rewrite("network/edges[self.id == '1to2']")
+    assert query == "trasmapyLookup0/edges[self.id == '1to2']"
+    assert list(bindings) == ["trasmapyLookup0"]
+    assert bindings["trasmapyLookup0"].edges == ["1to2"]
+
+
+def test_rewriteEachPath(optimizer):
+    query, bindings = optimizer.rewrite(
+        "{'e': network/edges[self.id == 'a'], 'v': users/vehicles[self.id in ['v0', 'missing']]}"
+    )
+    assert query == (
+        "{'e': trasmapyLookup0/edges[self.id == 'a'], "
+        "'v': trasmapyLookup1/vehicles[self.id in ['v0', 'missing']]}"
+    )
+    assert bindings["trasmapyLookup0"].edges == ["a"]
+    assert bindings["trasmapyLookup1"].vehicles == ["v0"]
+
+
+def test_rewriteKeepsQuotedBrackets(optimizer):
+    query, bindings = optimizer.rewrite("network/lanes[self.id == 'a]b[']/speed")
+    assert query == "trasmapyLookup0/lanes[self.id == 'a]b[']/speed"
+    assert bindings["trasmapyLookup0"].lanes == ["a]b["]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "network/edges",
+        "network/edges[self.speed > 1 and self.id == 'a']",
+        "network/edges[self.id == 'a' or self.id == 'b']",
+        # (root, collection) pairs without a lookup
+        "users/edges[self.id == 'a']",
+        "network/stops[self.id == 'a']",
+        # not a path root
+        "other/network/edges[self.id == 'a']",
+        "mynetwork/edges[self.id == 'a']",
+        # unterminated predicate
+        "network/edges[self.id == 'a'",
+    ],
+)
+def test_rewriteLeavesQueryUntouched(optimizer, query):
+    assert optimizer.rewrite(query) == (query, {})
+
+
+def test_compileBindsLookupsPerPlan(optimizer):
+    queryMap = {"network": object()}
+    plan = optimizer.compile(
+        "network/edges[self.id == 'a']", lambda query: lambda namespace: namespace
+    )
+    namespace = plan(queryMap)
+    assert namespace["network"] is queryMap["network"]
+    assert namespace["trasmapyLookup0"].edges == ["a"]
+    # the shared query map isn't modified
+    assert list(queryMap) == ["network"]
+
+
+def test_compileWithoutLookups(optimizer):
+    def compiler(query):
+        return compiler
+
+    assert optimizer.compile("network/edges", compiler) is compiler
+
+
+def test_indexedLookupOnlyServesItsCollection():
+    lookup = IndexedLookup("edges", _lookup, ["a"])
+    assert lookup.edges == ["a"]
+    with pytest.raises(AttributeError):
+        lookup.lanes
@@ -0,0 +1,62 @@
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("pyflwor")
+if "SUMO_HOME" not in os.environ:
+    pytest.skip("SUMO_HOME isn't set", allow_module_level=True)
+
+from trasmapy import TraSMAPy, TariffToll, Tariff, VehicleClass
+
+SIMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "examples", "simple")
+
+
+@pytest.fixture
+def endLoopScenario(tmp_path) -> str:
+    """The simple example with an induction loop at the end of the last edge of route0, so the
+    vehicles arrive (leave the simulation) on the step they are detected."""
+    for fileName in ("hello.net.xml", "hello.rou.xml"):
+        shutil.copy(os.path.join(SIMPLE_DIR, fileName), tmp_path)
+    (tmp_path / "loop.add.xml").write_text(
+        '<additional>\n'
+        '    <e1Detector id="end" lane="out_0" pos="0.10" file="NUL" friendlyPos="1"/>\n'
+        "</additional>\n"
+    )
+    sumoCfg = tmp_path / "end.sumocfg"
+    sumoCfg.write_text(
+        "<configuration>\n"
+        "    <input>\n"
+        '        <net-file value="hello.net.xml"/>\n'
+        '        <route-files value="hello.rou.xml"/>\n'
+        '        <additional-files value="loop.add.xml"/>\n'
+        "    </input>\n"
+        "</configuration>\n"
+    )
+    return str(sumoCfg)
+
+
+def test_chargesVehiclesDetectedOnTheirLastStep(endLoopScenario):
+    traSMAPy = TraSMAPy(endLoopScenario, useGui=False)
+    try:
+        users = traSMAPy.users
+        route = users.getRoute("route0")
+        users.createVehicle("c0", route, vehicleType=users.getVehicleType("Car"))
+        users.createVehicle(
+            "b0", route, vehicleType=users.getVehicleType("Bus"), departTime=3.0
+        )
+        toll = TariffToll(
+            "end", [traSMAPy.network.getDetector("end")], Tariff(2.0, {VehicleClass.BUS: 5.0})
+        )
+        traSMAPy.control.registerToll(toll)
+
+        for _ in range(80):
+            traSMAPy.doSimulationStep()
+
+        ledger = traSMAPy.control.ledger
+        assert len(ledger) == 2
+        assert ledger.vehicleTotal("c0") == 2.0
+        assert ledger.vehicleTotal("b0") == 5.0
+        assert ledger.classTotals == {VehicleClass.PASSENGER: 2.0, VehicleClass.BUS: 5.0}
+    finally:
+        traSMAPy.closeSimulation()